@@ -10,9 +10,14 @@ Modules: telegram.py (API), state.py (persistence), helpers.py (utilities).
 
 import os
 import sys
+import heapq
 import json
 import random
-from datetime import datetime, timezone, timedelta
+import time
+from bisect import bisect_left
+from collections import Counter
+from datetime import date, datetime, timezone, timedelta
+from functools import lru_cache
 from pathlib import Path
 
 import helpers
@@ -21,7 +26,7 @@ import state as state_store
 
 from helpers import (
     fmt_date, fmt_relative_date, html_escape,
-    posts_str, deduplicate_posts, calc_avg_gap_str, build_topic_maps,
+    posts_str, deduplicate_posts, build_topic_maps,
     timestamps_in_window,
 )
 
@@ -29,16 +34,21 @@ from helpers import (
 # ------------------------------------------------------------------ #
 #  Boon choice callback handler
 # ------------------------------------------------------------------ #
-def _format_boon_result(boons: list[str], chosen_idx: int, base_message: str, label: str) -> str:
-    """Format POTW boon result message with chosen boon highlighted in HTML."""
-    boon_lines = ""
+def _render_boon_block(boons: list[str], chosen_idx: int) -> str:
+    """Render the boon list with the chosen boon ticked and the rest struck through."""
+    parts = []
     for i, b in enumerate(boons):
         escaped = html_escape(b)
         if i == chosen_idx:
-            boon_lines += f"\n{i + 1}. {escaped} ✓\n"
+            parts.append(f"{i + 1}. {escaped} ✓")
         else:
-            boon_lines += f"\n<s>{i + 1}. {escaped}</s>\n"
-    return f"{html_escape(base_message)}\n\n{label}:{boon_lines}"
+            parts.append(f"<s>{i + 1}. {escaped}</s>")
+    return "\n" + "\n\n".join(parts) + "\n"
+
+
+def _format_boon_result(boons: list[str], chosen_idx: int, base_message: str, label: str) -> str:
+    """Format POTW boon result message with chosen boon highlighted in HTML."""
+    return f"{html_escape(base_message)}\n\n{label}:{_render_boon_block(boons, chosen_idx)}"
 
 
 def process_boon_callback(cb: dict, config: dict, state: dict) -> None:
@@ -218,9 +228,9 @@ def _build_status(pid: str, campaign_name: str, state: dict, gm_ids: set) -> str
     player_count = len(players)
 
     # Last post
-    topic_state = state.get("topics", {}).get(pid)
+    topic_state = state["topics"].get(pid)
     if topic_state:
-        last_time = datetime.fromisoformat(topic_state["last_message_time"])
+        last_time = helpers.parse_ts(topic_state["last_message_time"])
         elapsed = helpers.hours_since(now, last_time)
         if elapsed < 1:
             last_str = "just now"
@@ -235,7 +245,7 @@ def _build_status(pid: str, campaign_name: str, state: dict, gm_ids: set) -> str
     topic_ts = helpers.get_topic_timestamps(state, pid)
     gm_week = player_week = 0
     for uid, timestamps in topic_ts.items():
-        count = len(timestamps_in_window(timestamps, week_ago))
+        count = helpers.count_in_window(timestamps, week_ago)
         if uid in gm_ids:
             gm_week += count
         else:
@@ -244,7 +254,7 @@ def _build_status(pid: str, campaign_name: str, state: dict, gm_ids: set) -> str
     # At-risk players (1+ weeks inactive)
     at_risk = []
     for p in players:
-        last_post = datetime.fromisoformat(p["last_post_time"])
+        last_post = helpers.parse_ts(p["last_post_time"])
         days_inactive = helpers.days_since(now, last_post)
         if days_inactive >= 7:
             at_risk.append(f"{p['first_name']} ({int(days_inactive)}d)")
@@ -347,7 +357,7 @@ def _build_campaign_report(pid: str, config: dict, state: dict, gm_ids: set) ->
         p_val for p_val in state.get("players", {}).values()
         if p_val.get("pbp_topic_id") == pid
     ]
-    counts = state.get("message_counts", {}).get(pid, {})
+    counts = state["message_counts"].get(pid, {})
     topic_ts = helpers.get_topic_timestamps(state, pid)
     player_count = len(players)
 
@@ -390,7 +400,7 @@ def _build_campaign_report(pid: str, config: dict, state: dict, gm_ids: set) ->
     # At-risk players
     at_risk = []
     for p in players:
-        last_post = datetime.fromisoformat(p["last_post_time"])
+        last_post = helpers.parse_ts(p["last_post_time"])
         inactive_days = helpers.days_since(now, last_post)
         if inactive_days >= 7:
             week_num = int(inactive_days / 7)
@@ -430,7 +440,6 @@ def _build_mystats(pid: str, user_id: str, campaign_name: str,
                    state: dict, gm_ids: set, config: dict | None = None) -> str:
     """Build personal stats for a player's /mystats command."""
     now = datetime.now(timezone.utc)
-    week_ago = now - timedelta(days=7)
 
     is_gm = user_id in gm_ids
     role = "GM" if is_gm else "Player"
@@ -441,19 +450,14 @@ def _build_mystats(pid: str, user_id: str, campaign_name: str,
     # Get their data
     topic_ts = helpers.get_topic_timestamps(state, pid)
     raw_ts = topic_ts.get(user_id, [])
-    total_count = state.get("message_counts", {}).get(pid, {}).get(user_id, 0)
+    total_count = state["message_counts"].get(pid, {}).get(user_id, 0)
 
     if not raw_ts:
         return f"No posts tracked yet for you in {campaign_name}. Post something and check back!"
 
-    all_posts = sorted(datetime.fromisoformat(ts) for ts in raw_ts)
-    sessions = deduplicate_posts(all_posts)
-    week_posts = deduplicate_posts(timestamps_in_window(raw_ts, week_ago))
-    avg_gap = calc_avg_gap_str(raw_ts)
-    last_post_str = fmt_relative_date(now, all_posts[-1])
-
-    # Calculate posting streak (consecutive days with posts)
-    streak = _calc_streak(raw_ts, now)
+    # Same figures as the roster entry, including the posting streak
+    user_stats = _roster_user_stats(raw_ts, total_count, now)
+    streak = user_stats["streak"]
 
     header = f"Your stats in {campaign_name} ({role})"
     if char_name:
@@ -462,10 +466,10 @@ def _build_mystats(pid: str, user_id: str, campaign_name: str,
 
     lines = [
         header,
-        f"Total: {posts_str(total_count)} ({len(sessions)} sessions)",
-        f"This week: {posts_str(len(week_posts))}",
-        f"Avg gap: {avg_gap}",
-        f"Last post: {last_post_str}",
+        f"Total: {posts_str(total_count)} ({user_stats['sessions']} sessions)",
+        f"This week: {posts_str(user_stats['week_count'])}",
+        f"Avg gap: {user_stats['avg_gap_str']}",
+        f"Last post: {user_stats['last_post_str']}",
     ]
 
     # Word count stats
@@ -491,10 +495,10 @@ def _build_party(pid: str, campaign_name: str, config: dict, state: dict) -> str
                 f"Ask your GM to add a 'characters' mapping in the bot config.")
 
     now = datetime.now(timezone.utc)
-    players = [
-        p for p in state.get("players", {}).values()
+    players_by_uid = {
+        p.get("user_id"): p for p in state.get("players", {}).values()
         if p.get("pbp_topic_id") == pid
-    ]
+    }
 
     lines = [f"The party of {campaign_name}:", ""]
 
@@ -503,15 +507,11 @@ def _build_party(pid: str, campaign_name: str, config: dict, state: dict) -> str
     orphan_chars = []
 
     for uid, char_name in sorted(characters.items(), key=lambda x: x[1]):
-        player = None
-        for p in players:
-            if p.get("user_id") == uid:
-                player = p
-                break
+        player = players_by_uid.get(uid)
 
         if player:
             player_name = helpers.player_full_name(player)
-            last_post = datetime.fromisoformat(player["last_post_time"])
+            last_post = helpers.parse_ts(player["last_post_time"])
             days_ago = helpers.days_since(now, last_post)
             away_record = helpers.is_away(state, pid, uid, now)
             if away_record:
@@ -543,9 +543,9 @@ _SPARK_CHARS = " ▁▂▃▄▅▆▇█"
 
 def _sparkline(values: list[int]) -> str:
     """Convert a list of integers into a text sparkline using block characters."""
-    if not values or max(values) == 0:
+    peak = max(values, default=0)
+    if peak == 0:
         return "▁" * len(values)
-    peak = max(values)
     return "".join(
         _SPARK_CHARS[min(round(v / peak * 8), 8)] for v in values
     )
@@ -564,13 +564,9 @@ def _build_myhistory(pid: str, user_id: str, campaign_name: str,
     if not raw_ts:
         return f"No posting history yet in {campaign_name}."
 
-    # Calculate weekly post counts for last 8 weeks
-    weeks = []
-    for w in range(7, -1, -1):
-        start = now - timedelta(weeks=w + 1)
-        end = now - timedelta(weeks=w)
-        count = len(timestamps_in_window(raw_ts, start, end))
-        weeks.append(count)
+    # Calculate weekly post counts for last 8 weeks, oldest first
+    edges = [now - timedelta(weeks=w) for w in range(8, -1, -1)]
+    weeks = helpers.bucket_counts(raw_ts, edges)
 
     spark = _sparkline(weeks)
     total = sum(weeks)
@@ -614,7 +610,7 @@ def _build_catchup(pid: str, user_id: str, campaign_name: str,
     if not my_ts:
         return f"No posting history in {campaign_name}. Post something first!"
 
-    last_post = max(datetime.fromisoformat(ts) for ts in my_ts)
+    last_post = max(helpers.parse_ts(ts) for ts in my_ts)
     hours_ago = (now - last_post).total_seconds() / 3600
 
     if hours_ago < 1:
@@ -627,7 +623,7 @@ def _build_catchup(pid: str, user_id: str, campaign_name: str,
         if uid == user_id:
             continue
         is_gm = uid in gm_ids
-        count = len(timestamps_in_window(timestamps, last_post))
+        count = helpers.count_in_window(timestamps, last_post)
         if count > 0:
             player = helpers.get_player(state, pid, uid)
             if is_gm:
@@ -769,16 +765,22 @@ def _build_overview(config: dict, state: dict) -> str:
     total_posts_all = 0
     total_players_all = 0
     campaigns_data = []
+    all_campaigns = helpers.players_by_campaign(state)
+    # Per-campaign lookups below read these once rather than per iteration
+    post_ts = state.get("post_timestamps", {})
+    topics = state["topics"]
+    combats = state.get("combat", {})
+    paused_campaigns = state.get("paused_campaigns", {})
 
     for pid, name in maps.to_name.items():
         gm_ids = helpers.gm_ids_for_campaign(config, pid)
-        topic_ts = helpers.get_topic_timestamps(state, pid)
-        topic_state = state.get("topics", {}).get(pid)
+        topic_ts = post_ts.get(pid, {})
+        topic_state = topics.get(pid)
 
         # Weekly posts
         gm_week = player_week = 0
         for uid, timestamps in topic_ts.items():
-            count = len(timestamps_in_window(timestamps, week_ago))
+            count = helpers.count_in_window(timestamps, week_ago)
             if uid in gm_ids:
                 gm_week += count
             else:
@@ -788,7 +790,7 @@ def _build_overview(config: dict, state: dict) -> str:
 
         # Last post age
         if topic_state:
-            last_time = datetime.fromisoformat(topic_state["last_message_time"])
+            last_time = helpers.parse_ts(topic_state["last_message_time"])
             hours = helpers.hours_since(now, last_time)
             if hours < 1:
                 age = "<1h"
@@ -800,17 +802,15 @@ def _build_overview(config: dict, state: dict) -> str:
             age = "—"
 
         # Player count
-        players = [p for p in state.get("players", {}).values()
-                    if p.get("pbp_topic_id") == pid]
-        player_count = len(players)
+        player_count = len(all_campaigns.get(pid, []))
         total_players_all += player_count
 
         # Combat
-        combat = state.get("combat", {}).get(pid, {})
+        combat = combats.get(pid, {})
         combat_flag = " ⚔️" if combat.get("active") else ""
 
         # Paused
-        paused = state.get("paused_campaigns", {}).get(pid)
+        paused = paused_campaigns.get(pid)
         pause_flag = " ⏸️" if paused else ""
 
         # Health icon
@@ -1184,25 +1184,29 @@ def _build_gm_dashboard(config: dict, state: dict) -> str:
 
     total_posts = 0
     total_players = 0
+    all_campaigns = helpers.players_by_campaign(state)
+    post_ts = state.get("post_timestamps", {})
+    topics = state["topics"]
+    paused = state.get("paused_campaigns", {})
+    combats = state.get("combat", {})
 
     for pid, name in sorted(maps.to_name.items(), key=lambda x: x[1]):
         gm_ids = helpers.gm_ids_for_campaign(config, pid)
-        topic_ts = helpers.get_topic_timestamps(state, pid)
-        players = [p for p in state.get("players", {}).values()
-                   if p.get("pbp_topic_id") == pid]
+        topic_ts = post_ts.get(pid, {})
+        players = all_campaigns.get(pid, [])
         player_count = len(players)
         total_players += player_count
 
         # Posts this week
         week_posts = 0
         for uid, timestamps in topic_ts.items():
-            week_posts += len(timestamps_in_window(timestamps, week_ago))
+            week_posts += helpers.count_in_window(timestamps, week_ago)
         total_posts += week_posts
 
         # Last post
-        topic_state = state.get("topics", {}).get(pid)
+        topic_state = topics.get(pid)
         if topic_state:
-            last_dt = datetime.fromisoformat(topic_state["last_message_time"])
+            last_dt = helpers.parse_ts(topic_state["last_message_time"])
             last_str, _ = helpers.fmt_brief_relative(now, last_dt)
         else:
             last_str = "never"
@@ -1219,9 +1223,9 @@ def _build_gm_dashboard(config: dict, state: dict) -> str:
 
         # Flags
         flags = []
-        if state.get("paused_campaigns", {}).get(pid):
+        if paused.get(pid):
             flags.append("⏸️")
-        if state.get("combat", {}).get(pid, {}).get("active"):
+        if combats.get(pid, {}).get("active"):
             flags.append("⚔️")
         away_count = sum(1 for p in players
                          if helpers.is_away(state, pid, p.get("user_id", ""), now))
@@ -1230,12 +1234,12 @@ def _build_gm_dashboard(config: dict, state: dict) -> str:
 
         # At-risk count
         at_risk = sum(1 for p in players
-                      if helpers.days_since(now, datetime.fromisoformat(p["last_post_time"])) >= 7)
+                      if helpers.days_since(now, helpers.parse_ts(p["last_post_time"])) >= 7)
         if at_risk:
             flags.append(f"⚠️{at_risk}")
 
-        active_quests = len([q for q in state.get("quests", {}).get(pid, [])
-                             if q.get("status") == "active"])
+        active_quests = sum(1 for q in state.get("quests", {}).get(pid, [])
+                            if q.get("status") == "active")
         if active_quests:
             flags.append(f"📋{active_quests}")
 
@@ -1253,20 +1257,19 @@ def _write_scene_marker(campaign_name: str, scene_name: str) -> None:
     """Write a scene boundary marker to the campaign's transcript file."""
     dir_name = _sanitize_dirname(campaign_name)
     campaign_dir = _LOGS_DIR / dir_name
-    campaign_dir.mkdir(parents=True, exist_ok=True)
 
     now = datetime.now(timezone.utc)
     month_str = now.strftime("%Y-%m")
     log_file = campaign_dir / f"{month_str}.md"
 
-    is_new = not log_file.exists()
+    parts = []
+    if not _transcript_exists(log_file):
+        parts.append(f"# {campaign_name} — {month_str}\n\n")
+        parts.append("*PBP transcript archived by PathWarsNudge bot.*\n\n---\n\n")
+    ts = now.strftime("%Y-%m-%d %H:%M")
+    parts.append(f"\n---\n\n### 🎭 Scene: {scene_name}\n*({ts})*\n\n---\n\n")
 
-    with open(log_file, "a", encoding="utf-8") as f:
-        if is_new:
-            f.write(f"# {campaign_name} — {month_str}\n\n")
-            f.write("*PBP transcript archived by PathWarsNudge bot.*\n\n---\n\n")
-        ts = now.strftime("%Y-%m-%d %H:%M")
-        f.write(f"\n---\n\n### 🎭 Scene: {scene_name}\n*({ts})*\n\n---\n\n")
+    _write_transcript(log_file, "".join(parts))
 
 
 _DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
@@ -1287,14 +1290,19 @@ def _build_activity(pid: str, campaign_name: str, state: dict, gm_ids: set) -> s
         return f"No activity data for {campaign_name} yet.\nPost some messages and check back!"
 
     # Aggregate across all users (excluding GM optionally — include everyone)
-    hour_totals = {}
-    day_totals = {}
+    # Per-player totals fall out of the same pass over the hour buckets.
+    hour_totals = Counter()
+    day_totals = Counter()
+    player_totals = {}
     for uid, h in hours_data.items():
+        player_total = 0
         for hour, count in h.items():
-            hour_totals[int(hour)] = hour_totals.get(int(hour), 0) + count
-    for uid, d in days_data.items():
+            hour_totals[int(hour)] += count
+            player_total += count
+        player_totals[uid] = player_total
+    for d in days_data.values():
         for day, count in d.items():
-            day_totals[int(day)] = day_totals.get(int(day), 0) + count
+            day_totals[int(day)] += count
 
     total_posts = sum(hour_totals.values())
 
@@ -1312,9 +1320,10 @@ def _build_activity(pid: str, campaign_name: str, state: dict, gm_ids: set) -> s
     # Best time blocks
     lines.append("")
     lines.append("Busiest times (UTC):")
-    block_totals = {}
-    for block_name, hour_range in _HOUR_BLOCKS.items():
-        block_totals[block_name] = sum(hour_totals.get(h, 0) for h in hour_range)
+    block_totals = {
+        block_name: sum(hour_totals[h] for h in hour_range)
+        for block_name, hour_range in _HOUR_BLOCKS.items()
+    }
     sorted_blocks = sorted(block_totals.items(), key=lambda x: x[1], reverse=True)
     for block_name, count in sorted_blocks:
         pct = count / total_posts * 100 if total_posts else 0
@@ -1328,10 +1337,7 @@ def _build_activity(pid: str, campaign_name: str, state: dict, gm_ids: set) -> s
         lines.append(f"\nPeak hour: {peak_hour:02d}:00 UTC ({hour_totals[peak_hour]} posts)")
 
     # Top 3 most active players
-    player_totals = {}
-    for uid, h in hours_data.items():
-        player_totals[uid] = sum(h.values())
-    sorted_players = sorted(player_totals.items(), key=lambda x: x[1], reverse=True)[:3]
+    sorted_players = heapq.nlargest(3, player_totals.items(), key=lambda x: x[1])
     if sorted_players:
         lines.append("")
         lines.append("Most active posters:")
@@ -1350,14 +1356,12 @@ def _build_profile(target_name: str, config: dict, state: dict) -> str:
     target_name_lower = target_name.lower().lstrip("@")
     found_entries = []
 
+    # Cheapest tests first: the full name is only built when the exact
+    # username/first-name comparisons miss.
     for key, player in state.get("players", {}).items():
-        full_name = helpers.player_full_name(player).lower()
-        username = (player.get("username") or "").lower()
-        first_name = player.get("first_name", "").lower()
-
-        if (target_name_lower == username or
-                target_name_lower == first_name or
-                target_name_lower in full_name):
+        if (target_name_lower == (player.get("username") or "").lower() or
+                target_name_lower == player.get("first_name", "").lower() or
+                target_name_lower in helpers.player_full_name(player).lower()):
             found_entries.append((key, player))
 
     if not found_entries:
@@ -1372,11 +1376,15 @@ def _build_profile(target_name: str, config: dict, state: dict) -> str:
     total_posts = 0
     total_campaigns = 0
     total_words = 0
+    now = datetime.now(timezone.utc)
+    message_counts = state["message_counts"]
+    post_ts = state.get("post_timestamps", {})
+    word_counts = state.get("word_counts", {})
 
     for key, player in found_entries:
         pid = player["pbp_topic_id"]
         campaign_name = player["campaign_name"]
-        counts = state.get("message_counts", {}).get(pid, {})
+        counts = message_counts.get(pid, {})
         post_count = counts.get(user_id, 0)
         total_posts += post_count
         total_campaigns += 1
@@ -1384,8 +1392,8 @@ def _build_profile(target_name: str, config: dict, state: dict) -> str:
         # Last post
         last_post = player.get("last_post_time", "")
         if last_post:
-            last_dt = datetime.fromisoformat(last_post)
-            elapsed_h = helpers.hours_since(datetime.now(timezone.utc), last_dt)
+            last_dt = helpers.parse_ts(last_post)
+            elapsed_h = helpers.hours_since(now, last_dt)
             if elapsed_h < 24:
                 last_str = f"{int(elapsed_h)}h ago"
             else:
@@ -1398,13 +1406,12 @@ def _build_profile(target_name: str, config: dict, state: dict) -> str:
         char_tag = f" ({char_name})" if char_name else ""
 
         # Streak
-        topic_ts = helpers.get_topic_timestamps(state, pid)
-        raw_ts = topic_ts.get(user_id, [])
-        streak = _calc_streak(raw_ts, datetime.now(timezone.utc))
+        raw_ts = post_ts.get(pid, {}).get(user_id, [])
+        streak = _calc_streak(raw_ts, now)
         streak_str = f" | 🔥 {streak}d streak" if streak >= 3 else ""
 
         # Word count
-        words = state.get("word_counts", {}).get(pid, {}).get(user_id, 0)
+        words = word_counts.get(pid, {}).get(user_id, 0)
         words_str = f" | {words:,} words" if words > 0 else ""
         total_words += words
 
@@ -1563,25 +1570,31 @@ def _calc_streak(raw_timestamps: list[str], now: datetime) -> int:
     """
     if not raw_timestamps:
         return 0
+    return _streak_for(tuple(raw_timestamps), now.date().toordinal())
 
-    # Get unique posting dates
-    post_dates = sorted({datetime.fromisoformat(ts).date() for ts in raw_timestamps})
-    today = now.date()
+
+@lru_cache(maxsize=256)
+def _streak_for(raw_timestamps: tuple[str, ...], today: int) -> int:
+    """Memoised body of _calc_streak, keyed on the timestamps and today's ordinal.
+
+    The same player's streak is asked for by the milestone check, the
+    leaderboard and /mystats in one run; a new post changes the key.
+    """
+    # Post timestamps are stored as UTC ISO strings, so the first ten
+    # characters are the UTC date: only the distinct days get parsed, not
+    # every post. No sort is needed, the walk below only probes the set.
+    post_days = {date.fromisoformat(day).toordinal()
+                 for day in {ts[:10] for ts in raw_timestamps}}
+    latest = max(post_days)
 
     # Streak must include today or yesterday
-    if post_dates[-1] < today - timedelta(days=1):
+    if latest < today - 1:
         return 0
 
     # Count backward from the most recent post date
     streak = 1
-    for i in range(len(post_dates) - 1, 0, -1):
-        gap = (post_dates[i] - post_dates[i - 1]).days
-        if gap == 1:
-            streak += 1
-        elif gap == 0:
-            continue  # Same day, skip
-        else:
-            break
+    while latest - streak in post_days:
+        streak += 1
 
     return streak
 
@@ -1597,7 +1610,7 @@ def _build_whosturn(pid: str, campaign_name: str, state: dict) -> str:
     phase = combat.get("current_phase", "unknown")
     phase_label = "Players" if phase == "players" else "Enemies"
 
-    phase_start = datetime.fromisoformat(combat["phase_started_at"])
+    phase_start = helpers.parse_ts(combat["phase_started_at"])
     now = datetime.now(timezone.utc)
     elapsed = helpers.hours_since(now, phase_start)
 
@@ -1619,11 +1632,12 @@ def _build_whosturn(pid: str, campaign_name: str, state: dict) -> str:
         if isinstance(acted_dict, list):
             acted_dict = {uid: combat.get("phase_started_at", "") for uid in acted_dict}
 
-        acted_ids = set(acted_dict.keys())
         players = [
             p for p in state.get("players", {}).values()
             if p.get("pbp_topic_id") == pid
         ]
+        # Everyone still waiting has been waiting since the phase started
+        wait_str = f" — waiting {_format_elapsed(elapsed)}" if elapsed >= 1 else ""
 
         acted_list = []
         waiting_list = []
@@ -1631,18 +1645,15 @@ def _build_whosturn(pid: str, campaign_name: str, state: dict) -> str:
             uid = p["user_id"]
             if helpers.is_away(state, pid, uid, now):
                 continue  # Skip away players entirely
-            if uid in acted_ids:
+            if uid in acted_dict:
                 ts = acted_dict[uid]
                 if ts:
-                    acted_time = datetime.fromisoformat(ts)
+                    acted_time = helpers.parse_ts(ts)
                     ago = helpers.hours_since(now, acted_time)
                     acted_list.append(f"  ✅ {p['first_name']} ({_format_elapsed(ago)} ago)")
                 else:
                     acted_list.append(f"  ✅ {p['first_name']}")
             else:
-                # How long have they been holding things up?
-                wait_h = helpers.hours_since(now, phase_start)
-                wait_str = f" — waiting {_format_elapsed(wait_h)}" if wait_h >= 1 else ""
                 waiting_list.append(f"  ⏳ {p['first_name']}{wait_str}")
 
         if waiting_list:
@@ -1868,18 +1879,18 @@ def post_daily_tip(config: dict, state: dict, *, now: datetime | None = None, **
             return
 
     # Collect all chat topic IDs
-    chat_topics = []
-    for pair in config.get("topic_pairs", []):
-        pid = str(pair["pbp_topic_ids"][0])
-        if helpers.feature_enabled(config, pid, "alerts"):
-            chat_topics.append(pair["chat_topic_id"])
+    chat_topics = [
+        pair["chat_topic_id"] for pair in config.get("topic_pairs", [])
+        if helpers.feature_enabled(config, str(pair["pbp_topic_ids"][0]), "alerts")
+    ]
 
     if not chat_topics:
         return
 
     # Pick a tip we haven't used recently
     used_tips = state.get("used_tip_indices", [])
-    available = [i for i in range(len(_TIPS)) if i not in used_tips]
+    used_set = set(used_tips)
+    available = [i for i in range(len(_TIPS)) if i not in used_set]
     if not available:
         # Reset cycle
         available = list(range(len(_TIPS)))
@@ -1957,7 +1968,8 @@ def _handle_combat_message(
         started_at: ISO timestamp
         all_players_notified: bool  — have we pinged GM that everyone's done?
     """
-    if user_id in gm_ids:
+    # Every combat command starts with "/", so plain posts skip the chain
+    if user_id in gm_ids and text.startswith("/"):
         if text.startswith("/round"):
             _handle_round_command(text, pid, campaign_name, now_iso, group_id, thread_id, state)
 
@@ -1989,9 +2001,12 @@ def _handle_combat_message(
                 tg.send_message(group_id, thread_id,
                                 "Usage: /clog <event>\ne.g. /clog The ogre crits Cardigan for 28 damage!")
 
-    # Track player action during combat (with timestamp)
+    # Track player action during combat (with timestamp). Most campaigns
+    # have no combat running, so bail out before any further lookups.
     combat = state["combat"].get(pid)
-    if (combat and combat.get("active")
+    if not combat:
+        return
+    if (combat.get("active")
             and combat["current_phase"] == "players"
             and user_id not in gm_ids):
         acted = combat.get("players_acted", {})
@@ -2026,10 +2041,9 @@ def _check_all_acted(pid: str, campaign_name: str, group_id: int, thread_id: int
     if not waiting and len(acted) > 0:
         combat["all_players_notified"] = True
         # Mention all GMs
-        gm_mentions = []
-        for p in state.get("players", {}).values():
-            if p.get("user_id") in gm_ids and p.get("pbp_topic_id") == pid:
-                gm_mentions.append(helpers.player_mention(p))
+        # GMs registered in this campaign are already in ``players``
+        gm_mentions = [helpers.player_mention(p) for p in players
+                       if p.get("user_id") in gm_ids]
         gm_str = " ".join(gm_mentions) if gm_mentions else "GM"
         tg.send_message(group_id, thread_id,
                         f"✅ All players have posted their actions for Round {combat['round']}!\n"
@@ -2161,8 +2175,20 @@ def _handle_enemies_command(args: str, pid: str, campaign_name: str,
         tg.send_message(group_id, thread_id, "\n".join(lines))
 
 
-def _parse_message(msg: dict, group_id: int, maps) -> dict | None:
-    """Validate and extract fields from a Telegram message. Returns None if skipped."""
+# Telegram service-message fields that can appear inside a forum topic.
+# These are events (a pin, a topic rename), not posts, so they are skipped.
+_SERVICE_MESSAGE_KEYS = (
+    "pinned_message", "forum_topic_created", "forum_topic_edited",
+    "forum_topic_closed", "forum_topic_reopened", "new_chat_members",
+    "left_chat_member", "message_auto_delete_timer_changed",
+)
+
+
+def _parse_message(msg: dict, group_id: int, maps, now_iso: str | None = None) -> dict | None:
+    """Validate and extract fields from a Telegram message. Returns None if skipped.
+
+    ``now_iso`` lets a caller share one clock reading across a batch.
+    """
     chat_id = msg.get("chat", {}).get("id")
     if chat_id != group_id:
         return None
@@ -2179,7 +2205,11 @@ def _parse_message(msg: dict, group_id: int, maps) -> dict | None:
     if from_user.get("is_bot", False):
         return None
 
-    now_iso = datetime.now(timezone.utc).isoformat()
+    # Service messages never carry text, so ordinary posts skip this scan
+    if "text" not in msg and any(key in msg for key in _SERVICE_MESSAGE_KEYS):
+        return None
+
+    now_iso = now_iso or datetime.now(timezone.utc).isoformat()
     msg_date = msg.get("date")
     msg_time_iso = datetime.fromtimestamp(msg_date, tz=timezone.utc).isoformat() if msg_date else now_iso
 
@@ -2230,8 +2260,13 @@ def _parse_message(msg: dict, group_id: int, maps) -> dict | None:
 _LOGS_DIR = Path(__file__).parent.parent / "data" / "pbp_logs"
 
 
+@lru_cache(maxsize=None)
 def _sanitize_dirname(name: str) -> str:
-    """Convert a campaign name to a safe directory name."""
+    """Convert a campaign name to a safe directory name.
+
+    Memoised: there are only a handful of campaign names, and this runs on
+    every transcript append.
+    """
     return "".join(c if c.isalnum() or c in (" ", "-", "_") else "" for c in name).strip().replace(" ", "_")
 
 
@@ -2256,21 +2291,22 @@ def _format_log_entry(parsed: dict, gm_ids: set, char_name: str | None = None) -
     media = parsed.get("media_type")
     caption = parsed.get("caption", "")
 
-    # Build content
-    parts = []
-    if media:
-        if media.startswith("sticker:"):
-            parts.append(f"*[sticker {media[8:]}]*")
-        elif media.startswith("document:"):
-            parts.append(f"*[{media[9:]}]*")
-        else:
-            parts.append(f"*[{media}]*")
-    if raw:
-        parts.append(_format_transcript_content(raw))
-    elif caption:
-        parts.append(_format_transcript_content(caption))
+    # Build content: optional media tag, then the text (or caption)
+    if not media:
+        media_tag = ""
+    elif media.startswith("sticker:"):
+        media_tag = f"*[sticker {media[8:]}]*"
+    elif media.startswith("document:"):
+        media_tag = f"*[{media[9:]}]*"
+    else:
+        media_tag = f"*[{media}]*"
+    body = raw or caption
+    text = _format_transcript_content(body) if body else ""
 
-    content = " ".join(parts) if parts else "*[empty message]*"
+    if media_tag and text:
+        content = f"{media_tag} {text}"
+    else:
+        content = media_tag or text or "*[empty message]*"
 
     return f"**{name}**{char_tag}{role_tag} ({ts}):\n{content}\n"
 
@@ -2301,6 +2337,9 @@ def _format_transcript_content(text: str) -> str:
     out = []
     for line in lines:
         stripped = line.strip()
+        if not stripped:
+            out.append(line)
+            continue
 
         # PBP quote formatting: >> - becomes nested blockquote
         if stripped.startswith(">> -") or stripped.startswith(">>-"):
@@ -2321,6 +2360,48 @@ def _format_transcript_content(text: str) -> str:
     return "\n".join(out)
 
 
+def _open_log_append(log_file: Path):
+    """Open a transcript file for appending, creating its directory on first use.
+
+    The directory almost always exists, so try the open first rather than
+    calling mkdir on every message.
+    """
+    try:
+        return open(log_file, "a", encoding="utf-8")
+    except FileNotFoundError:
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        return open(log_file, "a", encoding="utf-8")
+
+
+# Transcript text waiting to be written, per file. Only set while
+# process_updates runs, so a batch of messages costs one write per file.
+_transcript_buffer: dict[Path, list[str]] | None = None
+
+
+def _transcript_exists(log_file: Path) -> bool:
+    """Return True if the transcript file exists on disk or has buffered text."""
+    return (_transcript_buffer is not None and log_file in _transcript_buffer) or log_file.exists()
+
+
+def _write_transcript(log_file: Path, text: str) -> None:
+    """Append text to a transcript file, buffering it while a batch is open."""
+    if _transcript_buffer is not None:
+        _transcript_buffer.setdefault(log_file, []).append(text)
+        return
+    with _open_log_append(log_file) as f:
+        f.write(text)
+
+
+def _flush_transcripts() -> None:
+    """Write all buffered transcript text, one append per file."""
+    if not _transcript_buffer:
+        return
+    for log_file, chunks in _transcript_buffer.items():
+        with _open_log_append(log_file) as f:
+            f.write("".join(chunks))
+    _transcript_buffer.clear()
+
+
 def _append_to_transcript(parsed: dict, gm_ids: set, config: dict | None = None) -> None:
     """Append a message to the campaign's monthly transcript file.
 
@@ -2335,7 +2416,6 @@ def _append_to_transcript(parsed: dict, gm_ids: set, config: dict | None = None)
     campaign_name = parsed["campaign_name"]
     dir_name = _sanitize_dirname(campaign_name)
     campaign_dir = _LOGS_DIR / dir_name
-    campaign_dir.mkdir(parents=True, exist_ok=True)
 
     # Month file from message timestamp
     msg_date = parsed["msg_time_iso"][:10]  # YYYY-MM-DD
@@ -2348,11 +2428,11 @@ def _append_to_transcript(parsed: dict, gm_ids: set, config: dict | None = None)
         char_name = helpers.character_name(config, parsed["pid"], parsed["user_id"])
 
     # Parse message datetime
-    msg_dt = datetime.fromisoformat(parsed["msg_time_iso"])
+    msg_dt = helpers.parse_ts(parsed["msg_time_iso"])
     msg_iso_year, msg_iso_week, _ = msg_dt.isocalendar()
 
     # Create header on first write
-    is_new = not log_file.exists()
+    is_new = not _transcript_exists(log_file)
 
     # Cache keys for this campaign+month
     cache_prefix = f"transcript:{dir_name}:{month_str}"
@@ -2369,31 +2449,30 @@ def _append_to_transcript(parsed: dict, gm_ids: set, config: dict | None = None)
         needs_week_header = True
         needs_day_header = True
     else:
-        # --- Week check ---
         last_week = _transcript_cache.get(week_key)
-        if last_week is None:
+        last_date = _transcript_cache.get(date_key)
+
+        # Cold cache: recover both markers from a single read of the file
+        if last_week is None or last_date is None:
             try:
                 content = log_file.read_text(encoding="utf-8")
+            except Exception:
+                content = ""
+            if last_week is None:
                 week_matches = _re.findall(r"## Week (\d+)", content)
                 last_week = int(week_matches[-1]) if week_matches else 0
-            except Exception:
-                last_week = 0
+            if last_date is None:
+                date_matches = _re.findall(
+                    r"\((\d{4}-\d{2}-\d{2}) \d{2}:\d{2}:\d{2}\):", content
+                )
+                last_date = date_matches[-1] if date_matches else ""
+
+        # --- Week check ---
         if msg_iso_week != last_week:
             needs_week_header = True
             needs_day_header = True  # New week always gets a day header too
 
         # --- Day check ---
-        last_date = _transcript_cache.get(date_key)
-        if last_date is None:
-            try:
-                if not is_new:
-                    content = log_file.read_text(encoding="utf-8") if "content" not in dir() else content
-                    date_matches = _re.findall(
-                        r"\((\d{4}-\d{2}-\d{2}) \d{2}:\d{2}:\d{2}\):", content
-                    )
-                    last_date = date_matches[-1] if date_matches else ""
-            except Exception:
-                last_date = ""
         if msg_date != last_date:
             needs_day_header = True
 
@@ -2408,41 +2487,43 @@ def _append_to_transcript(parsed: dict, gm_ids: set, config: dict | None = None)
 
     _SILENCE_THRESHOLD_HOURS = 12.0
 
-    with open(log_file, "a", encoding="utf-8") as f:
-        if is_new:
-            f.write(f"# {campaign_name} — {month_str}\n\n")
-            f.write("*PBP transcript archived by PathWarsNudge bot.*\n\n---\n\n")
-            # Finalize previous month's transcript with stats footer
-            _finalize_previous_month(campaign_dir, month_str, campaign_name)
-
-        if needs_week_header:
-            from datetime import date as _date
-            week_monday = _date.fromisocalendar(msg_iso_year, msg_iso_week, 1)
-            week_sunday = _date.fromisocalendar(msg_iso_year, msg_iso_week, 7)
-            mon_str = week_monday.strftime("%b %d")
-            sun_str = week_sunday.strftime("%b %d")
-            f.write(f"## Week {msg_iso_week} ({mon_str}–{sun_str})\n\n")
-
-        if needs_day_header and not needs_week_header:
-            # Day header within the same week (week header already implies the day)
-            day_label = msg_dt.strftime("%A, %b %d")
-            f.write(f"### 📅 {day_label}\n\n")
-        elif needs_day_header and needs_week_header:
-            # First day of a new week — add day header after week header
-            day_label = msg_dt.strftime("%A, %b %d")
-            f.write(f"### 📅 {day_label}\n\n")
-
-        # Silence gap marker (only if NOT already showing a day/week header)
-        if (silence_hours >= _SILENCE_THRESHOLD_HOURS
-                and not needs_day_header and not needs_week_header):
-            if silence_hours >= 48:
-                gap_str = f"{silence_hours / 24:.1f} days"
-            else:
-                gap_str = f"{silence_hours:.0f}h"
-            f.write(f"*— {gap_str} of silence —*\n\n")
+    parts = []
+    if is_new:
+        parts.append(f"# {campaign_name} — {month_str}\n\n")
+        parts.append("*PBP transcript archived by PathWarsNudge bot.*\n\n---\n\n")
+        # Finalize previous month's transcript with stats footer; it reads
+        # that file, so any buffered entries for it go to disk first.
+        _flush_transcripts()
+        _finalize_previous_month(campaign_dir, month_str, campaign_name)
+
+    if needs_week_header:
+        week_monday = date.fromisocalendar(msg_iso_year, msg_iso_week, 1)
+        week_sunday = date.fromisocalendar(msg_iso_year, msg_iso_week, 7)
+        mon_str = week_monday.strftime("%b %d")
+        sun_str = week_sunday.strftime("%b %d")
+        parts.append(f"## Week {msg_iso_week} ({mon_str}–{sun_str})\n\n")
+
+    if needs_day_header and not needs_week_header:
+        # Day header within the same week (week header already implies the day)
+        day_label = msg_dt.strftime("%A, %b %d")
+        parts.append(f"### 📅 {day_label}\n\n")
+    elif needs_day_header and needs_week_header:
+        # First day of a new week — add day header after week header
+        day_label = msg_dt.strftime("%A, %b %d")
+        parts.append(f"### 📅 {day_label}\n\n")
+
+    # Silence gap marker (only if NOT already showing a day/week header)
+    if (silence_hours >= _SILENCE_THRESHOLD_HOURS
+            and not needs_day_header and not needs_week_header):
+        if silence_hours >= 48:
+            gap_str = f"{silence_hours / 24:.1f} days"
+        else:
+            gap_str = f"{silence_hours:.0f}h"
+        parts.append(f"*— {gap_str} of silence —*\n\n")
 
-        entry = _format_log_entry(parsed, gm_ids, char_name)
-        f.write(entry + "\n")
+    entry = _format_log_entry(parsed, gm_ids, char_name)
+    parts.append(entry + "\n")
+    _write_transcript(log_file, "".join(parts))
 
     # Update caches
     _transcript_cache[week_key] = msg_iso_week
@@ -2454,6 +2535,10 @@ def _append_to_transcript(parsed: dict, gm_ids: set, config: dict | None = None)
 _transcript_cache: dict[str, int | str] = {}
 
 
+# Entry header line in a transcript: captures poster name and date
+_LOG_HEADER_RE = _re.compile(r"\*\*(.+?)\*\*(?:\s*\(.*?\))?\s*(?:\[GM\])?\s*\((\d{4}-\d{2}-\d{2})")
+
+
 def _finalize_previous_month(campaign_dir: Path, current_month: str,
                              campaign_name: str) -> None:
     """Append a stats footer to the previous month's transcript when a new month starts.
@@ -2488,37 +2573,31 @@ def _finalize_previous_month(campaign_dir: Path, current_month: str,
     active_dates = set()
     poster_counts: dict[str, int] = {}
 
-    for line in content.split("\n"):
-        if not line.startswith("**"):
-            continue
-        total_messages += 1
-
-        # Extract name and role
-        # Format: **Name** [GM] (2026-02-28 14:30:05):
-        # or:     **Name** (CharName) (2026-02-28 14:30:05):
-        name_match = _re.match(r"\*\*(.+?)\*\*(?:\s*\(.*?\))?\s*(?:\[GM\])?\s*\((\d{4}-\d{2}-\d{2})", line)
-        if name_match:
-            poster_name = name_match.group(1)
-            date_str = name_match.group(2)
-            active_dates.add(date_str)
-            unique_posters.add(poster_name)
-            poster_counts[poster_name] = poster_counts.get(poster_name, 0) + 1
-
-            if "[GM]" in line:
-                gm_messages += 1
-            else:
-                player_messages += 1
-
-        # Count words in the NEXT lines (content) — approximate from same line after :
-        colon_idx = line.find("):\n")
-        if colon_idx == -1:
-            colon_idx = line.find("):")
-
-    # Word count from non-header, non-structural lines
+    # One pass: "**" lines are entry headers (counted, and the words after
+    # their "):" tallied); following lines are entry content until a
+    # structural line.
     in_entry = False
     for line in content.split("\n"):
         if line.startswith("**"):
+            total_messages += 1
             in_entry = True
+
+            # Extract name and role
+            # Format: **Name** [GM] (2026-02-28 14:30:05):
+            # or:     **Name** (CharName) (2026-02-28 14:30:05):
+            name_match = _LOG_HEADER_RE.match(line)
+            if name_match:
+                poster_name = name_match.group(1)
+                date_str = name_match.group(2)
+                active_dates.add(date_str)
+                unique_posters.add(poster_name)
+                poster_counts[poster_name] = poster_counts.get(poster_name, 0) + 1
+
+                if "[GM]" in line:
+                    gm_messages += 1
+                else:
+                    player_messages += 1
+
             # Count words after the timestamp: part
             colon_pos = line.rfind("):")
             if colon_pos != -1:
@@ -2535,7 +2614,7 @@ def _finalize_previous_month(campaign_dir: Path, current_month: str,
         return
 
     # Top posters (top 5)
-    sorted_posters = sorted(poster_counts.items(), key=lambda x: x[1], reverse=True)
+    top_posters = heapq.nlargest(5, poster_counts.items(), key=lambda x: x[1])
 
     # Build footer
     footer_lines = [
@@ -2551,7 +2630,7 @@ def _finalize_previous_month(campaign_dir: Path, current_month: str,
         "",
         "**Most active:**",
     ]
-    for name, count in sorted_posters[:5]:
+    for name, count in top_posters:
         footer_lines.append(f"- {name}: {count} messages")
 
     footer_lines.append("")
@@ -2597,19 +2676,20 @@ def update_transcript_index(config: dict) -> None:
         if not log_files:
             continue
 
-        # Count total lines (rough message count)
-        total_entries = 0
+        # Count entries (rough message count): each entry starts a line
+        # with ** (bold name). One read per file, counted at C level.
+        entry_counts = []
         for lf in log_files:
-            # Each entry starts with ** (bold name)
-            total_entries += sum(1 for line in open(lf) if line.startswith("**"))
+            data = lf.read_bytes()
+            entry_counts.append(data.count(b"\n**") + data.startswith(b"**"))
+        total_entries = sum(entry_counts)
 
         lines.append(f"## {display_name}")
         lines.append(f"")
         lines.append(f"*{total_entries} messages across {len(log_files)} months*")
         lines.append(f"")
 
-        for lf in log_files:
-            entries = sum(1 for line in open(lf) if line.startswith("**"))
+        for lf, entries in zip(log_files, entry_counts):
             lines.append(f"- [{lf.stem}]({campaign_dir.name}/{lf.name}) ({entries} messages)")
 
         lines.append("")
@@ -2626,8 +2706,9 @@ def _handle_kick(pid: str, campaign_name: str, target: str,
     # Search for matching player in this campaign
     match_key = None
     match_player = None
+    prefix = f"{pid}:"
     for key, player in state["players"].items():
-        if not key.startswith(f"{pid}:"):
+        if not key.startswith(prefix):
             continue
         username = player.get("username", "").lower()
         first = player.get("first_name", "").lower()
@@ -2678,10 +2759,12 @@ def _handle_addplayer(pid: str, campaign_name: str, raw_args: str,
         return
 
     # Check if player already exists in this campaign
+    prefix = f"{pid}:"
+    username_lower = username.lower()
     for key, player in state["players"].items():
-        if not key.startswith(f"{pid}:"):
+        if not key.startswith(prefix):
             continue
-        if player.get("username", "").lower() == username.lower():
+        if player.get("username", "").lower() == username_lower:
             tg.send_message(group_id, thread_id,
                             f"{display_name} (@{username}) is already tracked in {campaign_name}.")
             return
@@ -2706,12 +2789,11 @@ def _handle_addplayer(pid: str, campaign_name: str, raw_args: str,
     }
 
     # Also clear from removed_players if they were previously removed
-    for rkey in list(state["removed_players"].keys()):
-        if rkey.startswith(f"{pid}:"):
-            removed = state["removed_players"][rkey]
-            if removed.get("username", "").lower() == username.lower():
-                del state["removed_players"][rkey]
-                break
+    removed_players = state["removed_players"]
+    for rkey, removed in removed_players.items():
+        if rkey.startswith(prefix) and removed.get("username", "").lower() == username_lower:
+            del removed_players[rkey]
+            break
 
     tg.send_message(group_id, thread_id,
                     f"✅ {display_name} (@{username}) added to {campaign_name} roster.\n"
@@ -2719,899 +2801,957 @@ def _handle_addplayer(pid: str, campaign_name: str, raw_args: str,
     print(f"Added {display_name} (@{username}) to {campaign_name}")
 
 
-def process_updates(updates: list, config: dict, state: dict) -> int:
-    """Process new Telegram updates, tracking posts and handling commands. Returns new offset."""
-    group_id = config["group_id"]
-
-    maps = build_topic_maps(config)
-
-    new_offset = state.get("offset", 0)
-
-    for update in updates:
-        update_id = update["update_id"]
-        new_offset = max(new_offset, update_id + 1)
+def _command_args(raw_text: str, command: str) -> str:
+    """Return the argument text after ``command`` in a command message."""
+    return raw_text[len(command):].strip()
 
-        msg = update.get("message")
-        cb = update.get("callback_query")
 
-        # ---- Handle boon choice callbacks ----
-        if cb:
-            process_boon_callback(cb, config, state)
-            continue
+def _handle_command(parsed: dict, config: dict, state: dict, gm_ids: frozenset) -> None:
+    """Run the slash command in ``parsed``, if any.
 
-        if not msg:
-            continue
-
-        parsed = _parse_message(msg, group_id, maps)
-        if not parsed:
-            continue
-
-        pid = parsed["pid"]
-        thread_id = parsed["thread_id"]
-        user_id = parsed["user_id"]
-        user_name = parsed["user_name"]
-        campaign_name = parsed["campaign_name"]
-        now_iso = parsed["now_iso"]
-        msg_time_iso = parsed["msg_time_iso"]
-        text = parsed["text"]
-
-        # Per-campaign GM IDs (supports per-campaign overrides)
-        gm_ids = helpers.gm_ids_for_campaign(config, pid)
-
-        # ---- /help command ----
-        if text in ("/help", "/pbphelp"):
-            tg.send_message(group_id, thread_id, _HELP_TEXT)
+    Only called for messages starting with "/", so ordinary posts skip the
+    whole command chain.
+    """
+    group_id = config["group_id"]
+    pid = parsed["pid"]
+    thread_id = parsed["thread_id"]
+    user_id = parsed["user_id"]
+    user_name = parsed["user_name"]
+    campaign_name = parsed["campaign_name"]
+    now_iso = parsed["now_iso"]
+    text = parsed["text"]
+
+    # ---- /help command ----
+    if text in ("/help", "/pbphelp"):
+        tg.send_message(group_id, thread_id, _HELP_TEXT)
+
+    # ---- /status command ----
+    if text == "/status":
+        status = _build_status(pid, campaign_name, state, gm_ids)
+        tg.send_message(group_id, thread_id, status)
+
+    # ---- /overview command ----
+    if text == "/overview":
+        overview = _build_overview(config, state)
+        tg.send_message(group_id, thread_id, overview)
+
+    # ---- /campaign command ----
+    if text == "/campaign":
+        report = _build_campaign_report(pid, config, state, gm_ids)
+        tg.send_message(group_id, thread_id, report)
+
+    # ---- /mystats command ----
+    if text in ("/mystats", "/me"):
+        my_report = _build_mystats(pid, user_id, campaign_name, state, gm_ids, config)
+        tg.send_message(group_id, thread_id, my_report)
+
+    # ---- /whosturn command ----
+    if text == "/whosturn":
+        turn_report = _build_whosturn(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, turn_report)
+
+    # ---- /combatlog command (everyone) ----
+    if text == "/combatlog":
+        log_report = _build_combatlog(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, log_report)
+
+    # ---- /party command ----
+    if text == "/party":
+        party_report = _build_party(pid, campaign_name, config, state)
+        tg.send_message(group_id, thread_id, party_report)
+
+    # ---- /myhistory command ----
+    if text == "/myhistory":
+        history = _build_myhistory(pid, user_id, campaign_name, state, gm_ids)
+        tg.send_message(group_id, thread_id, history)
+
+    # ---- /catchup command ----
+    if text == "/catchup":
+        catchup = _build_catchup(pid, user_id, campaign_name, state, gm_ids, config)
+        tg.send_message(group_id, thread_id, catchup)
+
+    # ---- /pause command (GM only) ----
+    if text.startswith("/pause") and user_id in gm_ids:
+        reason = _command_args(parsed["raw_text"], "/pause") or "No reason given"
+        state.setdefault("paused_campaigns", {})[pid] = {
+            "paused_at": now_iso,
+            "reason": reason,
+        }
+        tg.send_message(group_id, thread_id,
+                        f"⏸️ {campaign_name} paused. Inactivity tracking disabled.\nReason: {reason}")
+        print(f"Paused {campaign_name}: {reason}")
+
+    # ---- /resume command (GM only) ----
+    if text == "/resume" and user_id in gm_ids:
+        paused = state.get("paused_campaigns", {})
+        if pid in paused:
+            del paused[pid]
+            tg.send_message(group_id, thread_id,
+                            f"▶️ {campaign_name} resumed. Inactivity tracking re-enabled.")
+            print(f"Resumed {campaign_name}")
+        else:
+            tg.send_message(group_id, thread_id, f"{campaign_name} is not paused.")
 
-        # ---- /status command ----
-        if text == "/status":
-            status = _build_status(pid, campaign_name, state, gm_ids)
-            tg.send_message(group_id, thread_id, status)
+    # ---- /kick command (GM only) ----
+    if text.startswith("/kick") and user_id in gm_ids:
+        target = _command_args(parsed["raw_text"], "/kick").lstrip("@")
+        if not target:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /kick @username or /kick PlayerName")
+        else:
+            _handle_kick(pid, campaign_name, target, state, group_id, thread_id)
 
-        # ---- /overview command ----
-        if text == "/overview":
-            overview = _build_overview(config, state)
-            tg.send_message(group_id, thread_id, overview)
+    # ---- /addplayer command (GM only) ----
+    if text.startswith("/addplayer") and user_id in gm_ids:
+        raw_args = _command_args(parsed["raw_text"], "/addplayer")
+        if not raw_args:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /addplayer @username PlayerName\n"
+                            "e.g. /addplayer @alice Alice Smith")
+        else:
+            _handle_addplayer(pid, campaign_name, raw_args, now_iso, state, group_id, thread_id)
 
-        # ---- /campaign command ----
-        if text == "/campaign":
-            report = _build_campaign_report(pid, config, state, gm_ids)
-            tg.send_message(group_id, thread_id, report)
+    # ---- /scene command (GM only) ----
+    if text.startswith("/scene") and user_id in gm_ids:
+        scene_name = _command_args(parsed["raw_text"], "/scene")
+        if not scene_name:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /scene <name>\ne.g. /scene The Docks at Midnight")
+        else:
+            state.setdefault("current_scenes", {})[pid] = scene_name
+            _write_scene_marker(campaign_name, scene_name)
+            tg.send_message(group_id, thread_id,
+                            f"🎭 Scene: {scene_name}\nMarked in transcript.")
+            print(f"Scene marker in {campaign_name}: {scene_name}")
 
-        # ---- /mystats command ----
-        if text in ("/mystats", "/me"):
-            my_report = _build_mystats(pid, user_id, campaign_name, state, gm_ids, config)
-            tg.send_message(group_id, thread_id, my_report)
-
-        # ---- /whosturn command ----
-        if text == "/whosturn":
-            turn_report = _build_whosturn(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, turn_report)
-
-        # ---- /combatlog command (everyone) ----
-        if text == "/combatlog":
-            log_report = _build_combatlog(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, log_report)
-
-        # ---- /party command ----
-        if text == "/party":
-            party_report = _build_party(pid, campaign_name, config, state)
-            tg.send_message(group_id, thread_id, party_report)
-
-        # ---- /myhistory command ----
-        if text == "/myhistory":
-            history = _build_myhistory(pid, user_id, campaign_name, state, gm_ids)
-            tg.send_message(group_id, thread_id, history)
-
-        # ---- /catchup command ----
-        if text == "/catchup":
-            catchup = _build_catchup(pid, user_id, campaign_name, state, gm_ids, config)
-            tg.send_message(group_id, thread_id, catchup)
-
-        # ---- /pause command (GM only) ----
-        if text.startswith("/pause") and user_id in gm_ids:
-            reason = parsed["raw_text"][6:].strip() or "No reason given"
-            state.setdefault("paused_campaigns", {})[pid] = {
-                "paused_at": now_iso,
-                "reason": reason,
-            }
+    # ---- /note command (GM only) ----
+    if text.startswith("/note") and not text.startswith("/notes") and user_id in gm_ids:
+        note_text = _command_args(parsed["raw_text"], "/note")
+        if not note_text:
             tg.send_message(group_id, thread_id,
-                            f"⏸️ {campaign_name} paused. Inactivity tracking disabled.\nReason: {reason}")
-            print(f"Paused {campaign_name}: {reason}")
-
-        # ---- /resume command (GM only) ----
-        if text == "/resume" and user_id in gm_ids:
-            paused = state.get("paused_campaigns", {})
-            if pid in paused:
-                del paused[pid]
+                            "Usage: /note <text>\ne.g. /note Party agreed to meet the informant at dawn")
+        else:
+            notes = state.setdefault("campaign_notes", {}).setdefault(pid, [])
+            if len(notes) >= _MAX_NOTES_PER_CAMPAIGN:
                 tg.send_message(group_id, thread_id,
-                                f"▶️ {campaign_name} resumed. Inactivity tracking re-enabled.")
-                print(f"Resumed {campaign_name}")
+                                f"Maximum {_MAX_NOTES_PER_CAMPAIGN} notes reached. Use /delnote <N> to remove old ones.")
             else:
-                tg.send_message(group_id, thread_id, f"{campaign_name} is not paused.")
+                notes.append({"text": note_text, "created_at": now_iso})
+                tg.send_message(group_id, thread_id,
+                                f"📝 Note #{len(notes)} saved.")
+                print(f"Note added to {campaign_name}: {note_text[:50]}")
+
+    # ---- /notes command (everyone) ----
+    if text == "/notes":
+        notes_report = _build_notes(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, notes_report)
+
+    # ---- /activity command (everyone) ----
+    if text == "/activity":
+        activity_report = _build_activity(pid, campaign_name, state, gm_ids)
+        tg.send_message(group_id, thread_id, activity_report)
+
+    # ---- /profile command (everyone) ----
+    if text.startswith("/profile"):
+        target = _command_args(parsed["raw_text"], "/profile")
+        if not target:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /profile @username or /profile PlayerName")
+        else:
+            profile = _build_profile(target, config, state)
+            tg.send_message(group_id, thread_id, profile)
 
-        # ---- /kick command (GM only) ----
-        if text.startswith("/kick") and user_id in gm_ids:
-            target = parsed["raw_text"][5:].strip().lstrip("@")
-            if not target:
+    # ---- /delnote command (GM only) ----
+    if text.startswith("/delnote") and user_id in gm_ids:
+        num_str = _command_args(parsed["raw_text"], "/delnote")
+        notes = state.get("campaign_notes", {}).get(pid, [])
+        try:
+            idx = int(num_str) - 1
+            if 0 <= idx < len(notes):
+                removed = notes.pop(idx)
                 tg.send_message(group_id, thread_id,
-                                "Usage: /kick @username or /kick PlayerName")
+                                f"🗑️ Deleted note #{idx + 1}: {removed['text'][:60]}")
+                print(f"Note deleted from {campaign_name}: {removed['text'][:50]}")
             else:
-                _handle_kick(pid, campaign_name, target, state, group_id, thread_id)
+                tg.send_message(group_id, thread_id,
+                                f"Note #{num_str} not found. Use /notes to see current notes.")
+        except (ValueError, TypeError):
+            tg.send_message(group_id, thread_id,
+                            "Usage: /delnote <number>\ne.g. /delnote 3")
 
-        # ---- /addplayer command (GM only) ----
-        if text.startswith("/addplayer") and user_id in gm_ids:
-            raw_args = parsed["raw_text"][10:].strip()
-            if not raw_args:
+    # ---- /quest command (GM only) ----
+    if text.startswith("/quest") and not text.startswith("/quests") and user_id in gm_ids:
+        quest_text = _command_args(parsed["raw_text"], "/quest")
+        if not quest_text:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /quest <text>\ne.g. /quest Find the missing merchant")
+        else:
+            quests = state.setdefault("quests", {}).setdefault(pid, [])
+            if len(quests) >= _MAX_QUESTS_PER_CAMPAIGN:
                 tg.send_message(group_id, thread_id,
-                                "Usage: /addplayer @username PlayerName\n"
-                                "e.g. /addplayer @alice Alice Smith")
+                                f"Maximum {_MAX_QUESTS_PER_CAMPAIGN} quests reached. Use /delquest <N> to remove old ones.")
             else:
-                _handle_addplayer(pid, campaign_name, raw_args, now_iso, state, group_id, thread_id)
-
-        # ---- /scene command (GM only) ----
-        if text.startswith("/scene") and user_id in gm_ids:
-            scene_name = parsed["raw_text"][6:].strip()
-            if not scene_name:
+                quests.append({"text": quest_text, "status": "active", "created_at": now_iso, "completed_at": None})
+                tg.send_message(group_id, thread_id,
+                                f"📋 Quest #{len(quests)} added: {quest_text}")
+                print(f"Quest added to {campaign_name}: {quest_text[:50]}")
+
+    # ---- /quests command (everyone) ----
+    if text == "/quests":
+        quests_report = _build_quests(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, quests_report)
+
+    # ---- /done command (GM only) ----
+    if text.startswith("/done") and user_id in gm_ids:
+        num_str = _command_args(parsed["raw_text"], "/done")
+        quests = state.get("quests", {}).get(pid, [])
+        try:
+            idx = int(num_str) - 1
+            if 0 <= idx < len(quests):
+                quests[idx]["status"] = "completed"
+                quests[idx]["completed_at"] = now_iso
                 tg.send_message(group_id, thread_id,
-                                "Usage: /scene <name>\ne.g. /scene The Docks at Midnight")
+                                f"✅ Quest #{idx + 1} completed: {quests[idx]['text']}")
+                print(f"Quest completed in {campaign_name}: {quests[idx]['text'][:50]}")
             else:
-                state.setdefault("current_scenes", {})[pid] = scene_name
-                _write_scene_marker(campaign_name, scene_name)
                 tg.send_message(group_id, thread_id,
-                                f"🎭 Scene: {scene_name}\nMarked in transcript.")
-                print(f"Scene marker in {campaign_name}: {scene_name}")
+                                f"Quest #{num_str} not found. Use /quests to see current quests.")
+        except (ValueError, TypeError):
+            tg.send_message(group_id, thread_id,
+                            "Usage: /done <number>\ne.g. /done 2")
 
-        # ---- /note command (GM only) ----
-        if text.startswith("/note") and not text.startswith("/notes") and user_id in gm_ids:
-            note_text = parsed["raw_text"][5:].strip()
-            if not note_text:
+    # ---- /delquest command (GM only) ----
+    if text.startswith("/delquest") and user_id in gm_ids:
+        num_str = _command_args(parsed["raw_text"], "/delquest")
+        quests = state.get("quests", {}).get(pid, [])
+        try:
+            idx = int(num_str) - 1
+            if 0 <= idx < len(quests):
+                removed = quests.pop(idx)
                 tg.send_message(group_id, thread_id,
-                                "Usage: /note <text>\ne.g. /note Party agreed to meet the informant at dawn")
+                                f"🗑️ Deleted quest #{idx + 1}: {removed['text'][:60]}")
+                print(f"Quest deleted from {campaign_name}: {removed['text'][:50]}")
             else:
-                notes = state.setdefault("campaign_notes", {}).setdefault(pid, [])
-                if len(notes) >= _MAX_NOTES_PER_CAMPAIGN:
-                    tg.send_message(group_id, thread_id,
-                                    f"Maximum {_MAX_NOTES_PER_CAMPAIGN} notes reached. Use /delnote <N> to remove old ones.")
-                else:
-                    notes.append({"text": note_text, "created_at": now_iso})
-                    tg.send_message(group_id, thread_id,
-                                    f"📝 Note #{len(notes)} saved.")
-                    print(f"Note added to {campaign_name}: {note_text[:50]}")
-
-        # ---- /notes command (everyone) ----
-        if text == "/notes":
-            notes_report = _build_notes(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, notes_report)
-
-        # ---- /activity command (everyone) ----
-        if text == "/activity":
-            activity_report = _build_activity(pid, campaign_name, state, gm_ids)
-            tg.send_message(group_id, thread_id, activity_report)
-
-        # ---- /profile command (everyone) ----
-        if text.startswith("/profile"):
-            target = parsed["raw_text"][8:].strip()
-            if not target:
                 tg.send_message(group_id, thread_id,
-                                "Usage: /profile @username or /profile PlayerName")
-            else:
-                profile = _build_profile(target, config, state)
-                tg.send_message(group_id, thread_id, profile)
+                                f"Quest #{num_str} not found. Use /quests to see current quests.")
+        except (ValueError, TypeError):
+            tg.send_message(group_id, thread_id,
+                            "Usage: /delquest <number>\ne.g. /delquest 3")
 
-        # ---- /delnote command (GM only) ----
-        if text.startswith("/delnote") and user_id in gm_ids:
-            num_str = parsed["raw_text"][8:].strip()
-            notes = state.get("campaign_notes", {}).get(pid, [])
-            try:
-                idx = int(num_str) - 1
-                if 0 <= idx < len(notes):
-                    removed = notes.pop(idx)
-                    tg.send_message(group_id, thread_id,
-                                    f"🗑️ Deleted note #{idx + 1}: {removed['text'][:60]}")
-                    print(f"Note deleted from {campaign_name}: {removed['text'][:50]}")
-                else:
-                    tg.send_message(group_id, thread_id,
-                                    f"Note #{num_str} not found. Use /notes to see current notes.")
-            except (ValueError, TypeError):
-                tg.send_message(group_id, thread_id,
-                                "Usage: /delnote <number>\ne.g. /delnote 3")
+    # ---- /gm command (GM only) ----
+    if text == "/gm" and user_id in gm_ids:
+        dashboard = _build_gm_dashboard(config, state)
+        tg.send_message(group_id, thread_id, dashboard)
 
-        # ---- /quest command (GM only) ----
-        if text.startswith("/quest") and not text.startswith("/quests") and user_id in gm_ids:
-            quest_text = parsed["raw_text"][6:].strip()
-            if not quest_text:
+    # ---- /pin command (GM only) ----
+    if text.startswith("/pin") and not text.startswith("/pins") and user_id in gm_ids:
+        pin_text = _command_args(parsed["raw_text"], "/pin")
+        if not pin_text:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /pin <text>\ne.g. /pin The party discovered the hidden temple entrance")
+        else:
+            pins = state.setdefault("pins", {}).setdefault(pid, [])
+            if len(pins) >= _MAX_PINS_PER_CAMPAIGN:
                 tg.send_message(group_id, thread_id,
-                                "Usage: /quest <text>\ne.g. /quest Find the missing merchant")
+                                f"Maximum {_MAX_PINS_PER_CAMPAIGN} pins reached. Use /delpin <N> to remove old ones.")
             else:
-                quests = state.setdefault("quests", {}).setdefault(pid, [])
-                if len(quests) >= _MAX_QUESTS_PER_CAMPAIGN:
-                    tg.send_message(group_id, thread_id,
-                                    f"Maximum {_MAX_QUESTS_PER_CAMPAIGN} quests reached. Use /delquest <N> to remove old ones.")
-                else:
-                    quests.append({"text": quest_text, "status": "active", "created_at": now_iso, "completed_at": None})
-                    tg.send_message(group_id, thread_id,
-                                    f"📋 Quest #{len(quests)} added: {quest_text}")
-                    print(f"Quest added to {campaign_name}: {quest_text[:50]}")
-
-        # ---- /quests command (everyone) ----
-        if text == "/quests":
-            quests_report = _build_quests(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, quests_report)
-
-        # ---- /done command (GM only) ----
-        if text.startswith("/done") and user_id in gm_ids:
-            num_str = parsed["raw_text"][5:].strip()
-            quests = state.get("quests", {}).get(pid, [])
-            try:
-                idx = int(num_str) - 1
-                if 0 <= idx < len(quests):
-                    quests[idx]["status"] = "completed"
-                    quests[idx]["completed_at"] = now_iso
-                    tg.send_message(group_id, thread_id,
-                                    f"✅ Quest #{idx + 1} completed: {quests[idx]['text']}")
-                    print(f"Quest completed in {campaign_name}: {quests[idx]['text'][:50]}")
-                else:
-                    tg.send_message(group_id, thread_id,
-                                    f"Quest #{num_str} not found. Use /quests to see current quests.")
-            except (ValueError, TypeError):
+                pins.append({"text": pin_text, "created_at": now_iso, "author": user_name})
                 tg.send_message(group_id, thread_id,
-                                "Usage: /done <number>\ne.g. /done 2")
-
-        # ---- /delquest command (GM only) ----
-        if text.startswith("/delquest") and user_id in gm_ids:
-            num_str = parsed["raw_text"][9:].strip()
-            quests = state.get("quests", {}).get(pid, [])
-            try:
-                idx = int(num_str) - 1
-                if 0 <= idx < len(quests):
-                    removed = quests.pop(idx)
-                    tg.send_message(group_id, thread_id,
-                                    f"🗑️ Deleted quest #{idx + 1}: {removed['text'][:60]}")
-                    print(f"Quest deleted from {campaign_name}: {removed['text'][:50]}")
-                else:
-                    tg.send_message(group_id, thread_id,
-                                    f"Quest #{num_str} not found. Use /quests to see current quests.")
-            except (ValueError, TypeError):
-                tg.send_message(group_id, thread_id,
-                                "Usage: /delquest <number>\ne.g. /delquest 3")
-
-        # ---- /gm command (GM only) ----
-        if text == "/gm" and user_id in gm_ids:
-            dashboard = _build_gm_dashboard(config, state)
-            tg.send_message(group_id, thread_id, dashboard)
-
-        # ---- /pin command (GM only) ----
-        if text.startswith("/pin") and not text.startswith("/pins") and user_id in gm_ids:
-            pin_text = parsed["raw_text"][4:].strip()
-            if not pin_text:
+                                f"📌 Pin #{len(pins)} saved: {pin_text}")
+                print(f"Pin added to {campaign_name}: {pin_text[:50]}")
+
+    # ---- /pins command (everyone) ----
+    if text == "/pins":
+        pins_report = _build_pins(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, pins_report)
+
+    # ---- /delpin command (GM only) ----
+    if text.startswith("/delpin") and user_id in gm_ids:
+        num_str = _command_args(parsed["raw_text"], "/delpin")
+        pins = state.get("pins", {}).get(pid, [])
+        try:
+            idx = int(num_str) - 1
+            if 0 <= idx < len(pins):
+                removed = pins.pop(idx)
                 tg.send_message(group_id, thread_id,
-                                "Usage: /pin <text>\ne.g. /pin The party discovered the hidden temple entrance")
+                                f"🗑️ Deleted pin #{idx + 1}: {removed['text'][:60]}")
             else:
-                pins = state.setdefault("pins", {}).setdefault(pid, [])
-                if len(pins) >= _MAX_PINS_PER_CAMPAIGN:
-                    tg.send_message(group_id, thread_id,
-                                    f"Maximum {_MAX_PINS_PER_CAMPAIGN} pins reached. Use /delpin <N> to remove old ones.")
-                else:
-                    pins.append({"text": pin_text, "created_at": now_iso, "author": user_name})
-                    tg.send_message(group_id, thread_id,
-                                    f"📌 Pin #{len(pins)} saved: {pin_text}")
-                    print(f"Pin added to {campaign_name}: {pin_text[:50]}")
-
-        # ---- /pins command (everyone) ----
-        if text == "/pins":
-            pins_report = _build_pins(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, pins_report)
-
-        # ---- /delpin command (GM only) ----
-        if text.startswith("/delpin") and user_id in gm_ids:
-            num_str = parsed["raw_text"][7:].strip()
-            pins = state.get("pins", {}).get(pid, [])
-            try:
-                idx = int(num_str) - 1
-                if 0 <= idx < len(pins):
-                    removed = pins.pop(idx)
-                    tg.send_message(group_id, thread_id,
-                                    f"🗑️ Deleted pin #{idx + 1}: {removed['text'][:60]}")
-                else:
-                    tg.send_message(group_id, thread_id,
-                                    f"Pin #{num_str} not found. Use /pins to see current pins.")
-            except (ValueError, TypeError):
                 tg.send_message(group_id, thread_id,
-                                "Usage: /delpin <number>\ne.g. /delpin 3")
+                                f"Pin #{num_str} not found. Use /pins to see current pins.")
+        except (ValueError, TypeError):
+            tg.send_message(group_id, thread_id,
+                            "Usage: /delpin <number>\ne.g. /delpin 3")
 
-        # ---- /loot command (GM only) ----
-        if text.startswith("/loot") and not text.startswith("/lootlist") and user_id in gm_ids:
-            loot_text = parsed["raw_text"][5:].strip()
-            if not loot_text:
+    # ---- /loot command (GM only) ----
+    if text.startswith("/loot") and not text.startswith("/lootlist") and user_id in gm_ids:
+        loot_text = _command_args(parsed["raw_text"], "/loot")
+        if not loot_text:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /loot <item>\ne.g. /loot +1 striking longsword")
+        else:
+            loot = state.setdefault("loot", {}).setdefault(pid, [])
+            if len(loot) >= _MAX_LOOT_PER_CAMPAIGN:
                 tg.send_message(group_id, thread_id,
-                                "Usage: /loot <item>\ne.g. /loot +1 striking longsword")
+                                f"Maximum {_MAX_LOOT_PER_CAMPAIGN} items. Use /delloot <N> to remove.")
             else:
-                loot = state.setdefault("loot", {}).setdefault(pid, [])
-                if len(loot) >= _MAX_LOOT_PER_CAMPAIGN:
-                    tg.send_message(group_id, thread_id,
-                                    f"Maximum {_MAX_LOOT_PER_CAMPAIGN} items. Use /delloot <N> to remove.")
-                else:
-                    loot.append({"text": loot_text, "added_at": now_iso})
-                    tg.send_message(group_id, thread_id,
-                                    f"💰 Loot #{len(loot)}: {loot_text}")
-                    print(f"Loot added to {campaign_name}: {loot_text[:50]}")
-
-        # ---- /lootlist command (everyone) ----
-        if text == "/lootlist":
-            loot_report = _build_lootlist(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, loot_report)
-
-        # ---- /delloot command (GM only) ----
-        if text.startswith("/delloot") and user_id in gm_ids:
-            num_str = parsed["raw_text"][8:].strip()
-            loot = state.get("loot", {}).get(pid, [])
-            try:
-                idx = int(num_str) - 1
-                if 0 <= idx < len(loot):
-                    removed = loot.pop(idx)
-                    tg.send_message(group_id, thread_id,
-                                    f"🗑️ Removed loot #{idx + 1}: {removed['text'][:60]}")
-                else:
-                    tg.send_message(group_id, thread_id,
-                                    f"Loot #{num_str} not found. Use /lootlist to see items.")
-            except (ValueError, TypeError):
+                loot.append({"text": loot_text, "added_at": now_iso})
                 tg.send_message(group_id, thread_id,
-                                "Usage: /delloot <number>\ne.g. /delloot 3")
-
-        # ---- /npc command (GM only) ----
-        if text.startswith("/npc") and not text.startswith("/npcs") and user_id in gm_ids:
-            raw_args = parsed["raw_text"][4:].strip()
-            if not raw_args:
+                                f"💰 Loot #{len(loot)}: {loot_text}")
+                print(f"Loot added to {campaign_name}: {loot_text[:50]}")
+
+    # ---- /lootlist command (everyone) ----
+    if text == "/lootlist":
+        loot_report = _build_lootlist(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, loot_report)
+
+    # ---- /delloot command (GM only) ----
+    if text.startswith("/delloot") and user_id in gm_ids:
+        num_str = _command_args(parsed["raw_text"], "/delloot")
+        loot = state.get("loot", {}).get(pid, [])
+        try:
+            idx = int(num_str) - 1
+            if 0 <= idx < len(loot):
+                removed = loot.pop(idx)
                 tg.send_message(group_id, thread_id,
-                                "Usage: /npc <name> — <description>\n"
-                                "e.g. /npc Gorund — Dwarven blacksmith, owes party a favour")
+                                f"🗑️ Removed loot #{idx + 1}: {removed['text'][:60]}")
             else:
-                npcs = state.setdefault("npcs", {}).setdefault(pid, [])
-                if len(npcs) >= _MAX_NPCS_PER_CAMPAIGN:
-                    tg.send_message(group_id, thread_id,
-                                    f"Maximum {_MAX_NPCS_PER_CAMPAIGN} NPCs. Use /delnpc <N> to remove.")
-                else:
-                    # Split on em-dash or double-hyphen
-                    if " — " in raw_args:
-                        name, desc = raw_args.split(" — ", 1)
-                    elif " -- " in raw_args:
-                        name, desc = raw_args.split(" -- ", 1)
-                    elif " - " in raw_args:
-                        name, desc = raw_args.split(" - ", 1)
-                    else:
-                        name, desc = raw_args, ""
-                    npcs.append({"name": name.strip(), "desc": desc.strip(), "added_at": now_iso})
-                    tg.send_message(group_id, thread_id,
-                                    f"🎭 NPC #{len(npcs)}: {name.strip()}")
-                    print(f"NPC added to {campaign_name}: {name.strip()[:50]}")
-
-        # ---- /npcs command (everyone) ----
-        if text == "/npcs":
-            npcs_report = _build_npcs(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, npcs_report)
-
-        # ---- /delnpc command (GM only) ----
-        if text.startswith("/delnpc") and user_id in gm_ids:
-            num_str = parsed["raw_text"][7:].strip()
-            npcs = state.get("npcs", {}).get(pid, [])
-            try:
-                idx = int(num_str) - 1
-                if 0 <= idx < len(npcs):
-                    removed = npcs.pop(idx)
-                    tg.send_message(group_id, thread_id,
-                                    f"🗑️ Removed NPC #{idx + 1}: {removed['name']}")
-                else:
-                    tg.send_message(group_id, thread_id,
-                                    f"NPC #{num_str} not found. Use /npcs to see the list.")
-            except (ValueError, TypeError):
                 tg.send_message(group_id, thread_id,
-                                "Usage: /delnpc <number>\ne.g. /delnpc 3")
+                                f"Loot #{num_str} not found. Use /lootlist to see items.")
+        except (ValueError, TypeError):
+            tg.send_message(group_id, thread_id,
+                            "Usage: /delloot <number>\ne.g. /delloot 3")
 
-        # ---- /condition command (GM only) ----
-        if text.startswith("/condition") and not text.startswith("/conditions") and user_id in gm_ids:
-            raw_args = parsed["raw_text"][10:].strip()
-            if not raw_args:
+    # ---- /npc command (GM only) ----
+    if text.startswith("/npc") and not text.startswith("/npcs") and user_id in gm_ids:
+        raw_args = _command_args(parsed["raw_text"], "/npc")
+        if not raw_args:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /npc <name> — <description>\n"
+                            "e.g. /npc Gorund — Dwarven blacksmith, owes party a favour")
+        else:
+            npcs = state.setdefault("npcs", {}).setdefault(pid, [])
+            if len(npcs) >= _MAX_NPCS_PER_CAMPAIGN:
                 tg.send_message(group_id, thread_id,
-                                "Usage: /condition <target> — <effect> [| duration]\n"
-                                "e.g. /condition Cardigan — Frightened 2 | until end of next turn\n"
-                                "e.g. /condition All — Inspired +1")
+                                f"Maximum {_MAX_NPCS_PER_CAMPAIGN} NPCs. Use /delnpc <N> to remove.")
             else:
-                # Parse: target — effect [| duration]
+                # Split on em-dash or double-hyphen
                 if " — " in raw_args:
-                    target, rest = raw_args.split(" — ", 1)
+                    name, desc = raw_args.split(" — ", 1)
                 elif " -- " in raw_args:
-                    target, rest = raw_args.split(" -- ", 1)
+                    name, desc = raw_args.split(" -- ", 1)
                 elif " - " in raw_args:
-                    target, rest = raw_args.split(" - ", 1)
-                else:
-                    target, rest = raw_args, ""
-
-                if "|" in rest:
-                    effect, duration = rest.split("|", 1)
+                    name, desc = raw_args.split(" - ", 1)
                 else:
-                    effect, duration = rest, ""
-
-                conds = state.setdefault("conditions", {}).setdefault(pid, [])
-                conds.append({
-                    "target": target.strip(),
-                    "effect": effect.strip(),
-                    "duration": duration.strip(),
-                    "added_at": now_iso,
-                })
+                    name, desc = raw_args, ""
+                npcs.append({"name": name.strip(), "desc": desc.strip(), "added_at": now_iso})
                 tg.send_message(group_id, thread_id,
-                                f"⚡ Condition on {target.strip()}: {effect.strip()}")
-                print(f"Condition in {campaign_name}: {target.strip()} — {effect.strip()[:50]}")
-
-        # ---- /conditions command (everyone) ----
-        if text == "/conditions":
-            conds_report = _build_conditions(pid, campaign_name, state, config)
-            tg.send_message(group_id, thread_id, conds_report)
-
-        # ---- /endcondition command (GM only) ----
-        if text.startswith("/endcondition") and user_id in gm_ids:
-            num_str = parsed["raw_text"][13:].strip()
-            conds = state.get("conditions", {}).get(pid, [])
-            try:
-                idx = int(num_str) - 1
-                if 0 <= idx < len(conds):
-                    removed = conds.pop(idx)
-                    tg.send_message(group_id, thread_id,
-                                    f"✅ Ended: {removed['target']} — {removed['effect']}")
-                else:
-                    tg.send_message(group_id, thread_id,
-                                    f"Condition #{num_str} not found. Use /conditions to see list.")
-            except (ValueError, TypeError):
+                                f"🎭 NPC #{len(npcs)}: {name.strip()}")
+                print(f"NPC added to {campaign_name}: {name.strip()[:50]}")
+
+    # ---- /npcs command (everyone) ----
+    if text == "/npcs":
+        npcs_report = _build_npcs(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, npcs_report)
+
+    # ---- /delnpc command (GM only) ----
+    if text.startswith("/delnpc") and user_id in gm_ids:
+        num_str = _command_args(parsed["raw_text"], "/delnpc")
+        npcs = state.get("npcs", {}).get(pid, [])
+        try:
+            idx = int(num_str) - 1
+            if 0 <= idx < len(npcs):
+                removed = npcs.pop(idx)
+                tg.send_message(group_id, thread_id,
+                                f"🗑️ Removed NPC #{idx + 1}: {removed['name']}")
+            else:
                 tg.send_message(group_id, thread_id,
-                                "Usage: /endcondition <number>\ne.g. /endcondition 2")
+                                f"NPC #{num_str} not found. Use /npcs to see the list.")
+        except (ValueError, TypeError):
+            tg.send_message(group_id, thread_id,
+                            "Usage: /delnpc <number>\ne.g. /delnpc 3")
 
-        # ---- /clearconditions command (GM only) ----
-        if text == "/clearconditions" and user_id in gm_ids:
-            old = state.get("conditions", {}).get(pid, [])
-            count = len(old)
-            state.setdefault("conditions", {})[pid] = []
+    # ---- /condition command (GM only) ----
+    if text.startswith("/condition") and not text.startswith("/conditions") and user_id in gm_ids:
+        raw_args = _command_args(parsed["raw_text"], "/condition")
+        if not raw_args:
             tg.send_message(group_id, thread_id,
-                            f"✅ Cleared {count} condition{'s' if count != 1 else ''} from {campaign_name}.")
-
-        # ---- /hp command (GM set/damage/heal/remove/clear, everyone view) ----
-        if text.startswith("/hp"):
-            hp_args = parsed["raw_text"][3:].strip()
-            hp_tracker = state.setdefault("hp_tracker", {}).setdefault(pid, {})
-
-            if not hp_args or hp_args == "show":
-                # View HP tracker
-                report = _build_hp_tracker(pid, campaign_name, state)
-                tg.send_message(group_id, thread_id, report)
-
-            elif user_id in gm_ids:
-                parts = hp_args.split(None, 1)
-                sub = parts[0].lower()
-                rest = parts[1] if len(parts) > 1 else ""
-
-                if sub == "set":
-                    # /hp set <name> <current>/<max>
-                    set_parts = rest.rsplit(None, 1)
-                    if len(set_parts) == 2 and "/" in set_parts[1]:
-                        name = set_parts[0].strip()
-                        try:
-                            cur, mx = set_parts[1].split("/", 1)
-                            cur, mx = int(cur), int(mx)
-                            if mx <= 0 or mx > 9999:
-                                tg.send_message(group_id, thread_id, "Max HP must be 1–9999.")
-                            elif len(hp_tracker) >= _MAX_HP_ENTRIES and name not in hp_tracker:
-                                tg.send_message(group_id, thread_id,
-                                                f"Max {_MAX_HP_ENTRIES} entries. Use /hp remove <name> first.")
-                            else:
-                                hp_tracker[name] = {"current": min(cur, mx), "max": mx}
-                                icon = helpers.hp_status_icon(min(cur, mx), mx)
-                                bar = helpers.hp_bar(min(cur, mx), mx)
-                                tg.send_message(group_id, thread_id,
-                                                f"{icon} {name}: {bar}")
-                        except ValueError:
-                            tg.send_message(group_id, thread_id,
-                                            "Usage: /hp set <name> <current>/<max>\ne.g. /hp set Ogre 45/45")
-                    else:
-                        tg.send_message(group_id, thread_id,
-                                        "Usage: /hp set <name> <current>/<max>\ne.g. /hp set Ogre 45/45")
+                            "Usage: /condition <target> — <effect> [| duration]\n"
+                            "e.g. /condition Cardigan — Frightened 2 | until end of next turn\n"
+                            "e.g. /condition All — Inspired +1")
+        else:
+            # Parse: target — effect [| duration]
+            if " — " in raw_args:
+                target, rest = raw_args.split(" — ", 1)
+            elif " -- " in raw_args:
+                target, rest = raw_args.split(" -- ", 1)
+            elif " - " in raw_args:
+                target, rest = raw_args.split(" - ", 1)
+            else:
+                target, rest = raw_args, ""
 
-                elif sub in ("d", "damage"):
-                    # /hp d <name> <amount>
-                    dmg_parts = rest.rsplit(None, 1)
-                    if len(dmg_parts) == 2:
-                        name = dmg_parts[0].strip()
-                        try:
-                            amount = int(dmg_parts[1])
-                            if name in hp_tracker:
-                                hp = hp_tracker[name]
-                                hp["current"] = max(0, hp["current"] - amount)
-                                icon = helpers.hp_status_icon(hp["current"], hp["max"])
-                                bar = helpers.hp_bar(hp["current"], hp["max"])
-                                status = " 💀 DOWN!" if hp["current"] == 0 else ""
-                                tg.send_message(group_id, thread_id,
-                                                f"{icon} {name} takes {amount} damage!\n{bar}{status}")
-                            else:
-                                tg.send_message(group_id, thread_id,
-                                                f"No HP entry for '{name}'. Use /hp set {name} <hp>/<max> first.")
-                        except ValueError:
-                            tg.send_message(group_id, thread_id,
-                                            "Usage: /hp d <name> <amount>\ne.g. /hp d Ogre 12")
-                    else:
-                        tg.send_message(group_id, thread_id,
-                                        "Usage: /hp d <name> <amount>\ne.g. /hp d Ogre 12")
+            if "|" in rest:
+                effect, duration = rest.split("|", 1)
+            else:
+                effect, duration = rest, ""
+
+            conds = state.setdefault("conditions", {}).setdefault(pid, [])
+            conds.append({
+                "target": target.strip(),
+                "effect": effect.strip(),
+                "duration": duration.strip(),
+                "added_at": now_iso,
+            })
+            tg.send_message(group_id, thread_id,
+                            f"⚡ Condition on {target.strip()}: {effect.strip()}")
+            print(f"Condition in {campaign_name}: {target.strip()} — {effect.strip()[:50]}")
+
+    # ---- /conditions command (everyone) ----
+    if text == "/conditions":
+        conds_report = _build_conditions(pid, campaign_name, state, config)
+        tg.send_message(group_id, thread_id, conds_report)
+
+    # ---- /endcondition command (GM only) ----
+    if text.startswith("/endcondition") and user_id in gm_ids:
+        num_str = _command_args(parsed["raw_text"], "/endcondition")
+        conds = state.get("conditions", {}).get(pid, [])
+        try:
+            idx = int(num_str) - 1
+            if 0 <= idx < len(conds):
+                removed = conds.pop(idx)
+                tg.send_message(group_id, thread_id,
+                                f"✅ Ended: {removed['target']} — {removed['effect']}")
+            else:
+                tg.send_message(group_id, thread_id,
+                                f"Condition #{num_str} not found. Use /conditions to see list.")
+        except (ValueError, TypeError):
+            tg.send_message(group_id, thread_id,
+                            "Usage: /endcondition <number>\ne.g. /endcondition 2")
 
-                elif sub in ("h", "heal"):
-                    # /hp h <name> <amount>
-                    heal_parts = rest.rsplit(None, 1)
-                    if len(heal_parts) == 2:
-                        name = heal_parts[0].strip()
-                        try:
-                            amount = int(heal_parts[1])
-                            if name in hp_tracker:
-                                hp = hp_tracker[name]
-                                hp["current"] = min(hp["max"], hp["current"] + amount)
-                                icon = helpers.hp_status_icon(hp["current"], hp["max"])
-                                bar = helpers.hp_bar(hp["current"], hp["max"])
-                                tg.send_message(group_id, thread_id,
-                                                f"{icon} {name} healed {amount}!\n{bar}")
-                            else:
-                                tg.send_message(group_id, thread_id,
-                                                f"No HP entry for '{name}'. Use /hp set {name} <hp>/<max> first.")
-                        except ValueError:
-                            tg.send_message(group_id, thread_id,
-                                            "Usage: /hp h <name> <amount>\ne.g. /hp h Ogre 10")
-                    else:
-                        tg.send_message(group_id, thread_id,
-                                        "Usage: /hp h <name> <amount>\ne.g. /hp h Ogre 10")
+    # ---- /clearconditions command (GM only) ----
+    if text == "/clearconditions" and user_id in gm_ids:
+        old = state.get("conditions", {}).get(pid, [])
+        count = len(old)
+        state.setdefault("conditions", {})[pid] = []
+        tg.send_message(group_id, thread_id,
+                        f"✅ Cleared {count} condition{'s' if count != 1 else ''} from {campaign_name}.")
 
-                elif sub == "remove":
-                    name = rest.strip()
-                    if name in hp_tracker:
-                        del hp_tracker[name]
-                        tg.send_message(group_id, thread_id, f"🗑️ Removed {name} from HP tracker.")
-                    else:
-                        tg.send_message(group_id, thread_id,
-                                        f"No HP entry for '{name}'. Use /hp to see entries.")
+    # ---- /hp command (GM set/damage/heal/remove/clear, everyone view) ----
+    if text.startswith("/hp"):
+        hp_args = _command_args(parsed["raw_text"], "/hp")
+        hp_tracker = state.setdefault("hp_tracker", {}).setdefault(pid, {})
 
-                elif sub == "clear":
-                    count = len(hp_tracker)
-                    state["hp_tracker"][pid] = {}
-                    tg.send_message(group_id, thread_id,
-                                    f"✅ Cleared {count} HP entr{'ies' if count != 1 else 'y'}.")
+        if not hp_args or hp_args == "show":
+            # View HP tracker
+            report = _build_hp_tracker(pid, campaign_name, state)
+            tg.send_message(group_id, thread_id, report)
+
+        elif user_id in gm_ids:
+            parts = hp_args.split(None, 1)
+            sub = parts[0].lower()
+            rest = parts[1] if len(parts) > 1 else ""
 
+            if sub == "set":
+                # /hp set <name> <current>/<max>
+                set_parts = rest.rsplit(None, 1)
+                if len(set_parts) == 2 and "/" in set_parts[1]:
+                    name = set_parts[0].strip()
+                    try:
+                        cur, mx = set_parts[1].split("/", 1)
+                        cur, mx = int(cur), int(mx)
+                        if mx <= 0 or mx > 9999:
+                            tg.send_message(group_id, thread_id, "Max HP must be 1–9999.")
+                        elif len(hp_tracker) >= _MAX_HP_ENTRIES and name not in hp_tracker:
+                            tg.send_message(group_id, thread_id,
+                                            f"Max {_MAX_HP_ENTRIES} entries. Use /hp remove <name> first.")
+                        else:
+                            hp_tracker[name] = {"current": min(cur, mx), "max": mx}
+                            icon = helpers.hp_status_icon(min(cur, mx), mx)
+                            bar = helpers.hp_bar(min(cur, mx), mx)
+                            tg.send_message(group_id, thread_id,
+                                            f"{icon} {name}: {bar}")
+                    except ValueError:
+                        tg.send_message(group_id, thread_id,
+                                        "Usage: /hp set <name> <current>/<max>\ne.g. /hp set Ogre 45/45")
                 else:
                     tg.send_message(group_id, thread_id,
-                                    "Usage: /hp set <n> <cur>/<max> | /hp d <n> <amt> | "
-                                    "/hp h <n> <amt> | /hp remove <n> | /hp clear")
+                                    "Usage: /hp set <name> <current>/<max>\ne.g. /hp set Ogre 45/45")
 
-        # ---- /clock command (GM only) ----
-        if text.startswith("/clock") and not text.startswith("/clocks") and user_id in gm_ids:
-            clock_args = parsed["raw_text"][6:].strip()
-            if not clock_args:
-                tg.send_message(group_id, thread_id,
-                                "Usage: /clock <name> <segments>\ne.g. /clock Investigation 6\ne.g. /clock Ritual 4")
-            else:
-                clock_parts = clock_args.rsplit(None, 1)
-                if len(clock_parts) == 2:
-                    name = clock_parts[0].strip()
+            elif sub in ("d", "damage"):
+                # /hp d <name> <amount>
+                dmg_parts = rest.rsplit(None, 1)
+                if len(dmg_parts) == 2:
+                    name = dmg_parts[0].strip()
                     try:
-                        segments = int(clock_parts[1])
-                        if segments < 2 or segments > 12:
-                            tg.send_message(group_id, thread_id, "Segments must be 2–12.")
+                        amount = int(dmg_parts[1])
+                        if name in hp_tracker:
+                            hp = hp_tracker[name]
+                            hp["current"] = max(0, hp["current"] - amount)
+                            icon = helpers.hp_status_icon(hp["current"], hp["max"])
+                            bar = helpers.hp_bar(hp["current"], hp["max"])
+                            status = " 💀 DOWN!" if hp["current"] == 0 else ""
+                            tg.send_message(group_id, thread_id,
+                                            f"{icon} {name} takes {amount} damage!\n{bar}{status}")
                         else:
-                            clocks = state.setdefault("clocks", {}).setdefault(pid, {})
-                            if len(clocks) >= _MAX_CLOCKS and name not in clocks:
-                                tg.send_message(group_id, thread_id,
-                                                f"Max {_MAX_CLOCKS} clocks. Use /delclock <name> first.")
-                            else:
-                                clocks[name] = {"filled": 0, "segments": segments}
-                                display = helpers.clock_display(0, segments)
-                                tg.send_message(group_id, thread_id,
-                                                f"⏱️ Clock: {name}\n{display}")
+                            tg.send_message(group_id, thread_id,
+                                            f"No HP entry for '{name}'. Use /hp set {name} <hp>/<max> first.")
                     except ValueError:
                         tg.send_message(group_id, thread_id,
-                                        "Usage: /clock <name> <segments>\ne.g. /clock Investigation 6")
+                                        "Usage: /hp d <name> <amount>\ne.g. /hp d Ogre 12")
                 else:
                     tg.send_message(group_id, thread_id,
-                                    "Usage: /clock <name> <segments>\ne.g. /clock Investigation 6")
-
-        # ---- /clocks command (everyone) ----
-        if text == "/clocks":
-            clocks_report = _build_clocks(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, clocks_report)
+                                    "Usage: /hp d <name> <amount>\ne.g. /hp d Ogre 12")
 
-        # ---- /tick command (GM only) ----
-        if text.startswith("/tick") and not text.startswith("/ticker") and user_id in gm_ids:
-            tick_args = parsed["raw_text"][5:].strip()
-            clocks = state.get("clocks", {}).get(pid, {})
-            if not tick_args:
-                tg.send_message(group_id, thread_id,
-                                "Usage: /tick <name> [N]\ne.g. /tick Investigation 2")
-            else:
-                tick_parts = tick_args.rsplit(None, 1)
-                amount = 1
-                name = tick_args
-                if len(tick_parts) == 2:
+            elif sub in ("h", "heal"):
+                # /hp h <name> <amount>
+                heal_parts = rest.rsplit(None, 1)
+                if len(heal_parts) == 2:
+                    name = heal_parts[0].strip()
                     try:
-                        amount = int(tick_parts[1])
-                        name = tick_parts[0]
+                        amount = int(heal_parts[1])
+                        if name in hp_tracker:
+                            hp = hp_tracker[name]
+                            hp["current"] = min(hp["max"], hp["current"] + amount)
+                            icon = helpers.hp_status_icon(hp["current"], hp["max"])
+                            bar = helpers.hp_bar(hp["current"], hp["max"])
+                            tg.send_message(group_id, thread_id,
+                                            f"{icon} {name} healed {amount}!\n{bar}")
+                        else:
+                            tg.send_message(group_id, thread_id,
+                                            f"No HP entry for '{name}'. Use /hp set {name} <hp>/<max> first.")
                     except ValueError:
-                        name = tick_args
-                        amount = 1
-                name = name.strip()
-                if name in clocks:
-                    clock = clocks[name]
-                    clock["filled"] = min(clock["segments"], clock["filled"] + amount)
-                    display = helpers.clock_display(clock["filled"], clock["segments"])
-                    complete = " ✅ COMPLETE!" if clock["filled"] >= clock["segments"] else ""
+                        tg.send_message(group_id, thread_id,
+                                        "Usage: /hp h <name> <amount>\ne.g. /hp h Ogre 10")
+                else:
                     tg.send_message(group_id, thread_id,
-                                    f"⏱️ {name}\n{display}{complete}")
+                                    "Usage: /hp h <name> <amount>\ne.g. /hp h Ogre 10")
+
+            elif sub == "remove":
+                name = rest.strip()
+                if name in hp_tracker:
+                    del hp_tracker[name]
+                    tg.send_message(group_id, thread_id, f"🗑️ Removed {name} from HP tracker.")
                 else:
                     tg.send_message(group_id, thread_id,
-                                    f"No clock named '{name}'. Use /clocks to see all.")
+                                    f"No HP entry for '{name}'. Use /hp to see entries.")
 
-        # ---- /untick command (GM only) ----
-        if text.startswith("/untick") and user_id in gm_ids:
-            tick_args = parsed["raw_text"][7:].strip()
-            clocks = state.get("clocks", {}).get(pid, {})
-            if not tick_args:
+            elif sub == "clear":
+                count = len(hp_tracker)
+                state["hp_tracker"][pid] = {}
                 tg.send_message(group_id, thread_id,
-                                "Usage: /untick <name> [N]\ne.g. /untick Investigation 1")
+                                f"✅ Cleared {count} HP entr{'ies' if count != 1 else 'y'}.")
+
             else:
-                tick_parts = tick_args.rsplit(None, 1)
-                amount = 1
-                name = tick_args
-                if len(tick_parts) == 2:
-                    try:
-                        amount = int(tick_parts[1])
-                        name = tick_parts[0]
-                    except ValueError:
-                        name = tick_args
-                        amount = 1
-                name = name.strip()
-                if name in clocks:
-                    clock = clocks[name]
-                    clock["filled"] = max(0, clock["filled"] - amount)
-                    display = helpers.clock_display(clock["filled"], clock["segments"])
-                    tg.send_message(group_id, thread_id, f"⏱️ {name}\n{display}")
-                else:
-                    tg.send_message(group_id, thread_id,
-                                    f"No clock named '{name}'. Use /clocks to see all.")
+                tg.send_message(group_id, thread_id,
+                                "Usage: /hp set <n> <cur>/<max> | /hp d <n> <amt> | "
+                                "/hp h <n> <amt> | /hp remove <n> | /hp clear")
 
-        # ---- /delclock command (GM only) ----
-        if text.startswith("/delclock") and user_id in gm_ids:
-            name = parsed["raw_text"][9:].strip()
-            clocks = state.get("clocks", {}).get(pid, {})
+    # ---- /clock command (GM only) ----
+    if text.startswith("/clock") and not text.startswith("/clocks") and user_id in gm_ids:
+        clock_args = _command_args(parsed["raw_text"], "/clock")
+        if not clock_args:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /clock <name> <segments>\ne.g. /clock Investigation 6\ne.g. /clock Ritual 4")
+        else:
+            clock_parts = clock_args.rsplit(None, 1)
+            if len(clock_parts) == 2:
+                name = clock_parts[0].strip()
+                try:
+                    segments = int(clock_parts[1])
+                    if segments < 2 or segments > 12:
+                        tg.send_message(group_id, thread_id, "Segments must be 2–12.")
+                    else:
+                        clocks = state.setdefault("clocks", {}).setdefault(pid, {})
+                        if len(clocks) >= _MAX_CLOCKS and name not in clocks:
+                            tg.send_message(group_id, thread_id,
+                                            f"Max {_MAX_CLOCKS} clocks. Use /delclock <name> first.")
+                        else:
+                            clocks[name] = {"filled": 0, "segments": segments}
+                            display = helpers.clock_display(0, segments)
+                            tg.send_message(group_id, thread_id,
+                                            f"⏱️ Clock: {name}\n{display}")
+                except ValueError:
+                    tg.send_message(group_id, thread_id,
+                                    "Usage: /clock <name> <segments>\ne.g. /clock Investigation 6")
+            else:
+                tg.send_message(group_id, thread_id,
+                                "Usage: /clock <name> <segments>\ne.g. /clock Investigation 6")
+
+    # ---- /clocks command (everyone) ----
+    if text == "/clocks":
+        clocks_report = _build_clocks(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, clocks_report)
+
+    # ---- /tick command (GM only) ----
+    if text.startswith("/tick") and not text.startswith("/ticker") and user_id in gm_ids:
+        tick_args = _command_args(parsed["raw_text"], "/tick")
+        clocks = state.get("clocks", {}).get(pid, {})
+        if not tick_args:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /tick <name> [N]\ne.g. /tick Investigation 2")
+        else:
+            tick_parts = tick_args.rsplit(None, 1)
+            amount = 1
+            name = tick_args
+            if len(tick_parts) == 2:
+                try:
+                    amount = int(tick_parts[1])
+                    name = tick_parts[0]
+                except ValueError:
+                    name = tick_args
+                    amount = 1
+            name = name.strip()
             if name in clocks:
-                del clocks[name]
-                tg.send_message(group_id, thread_id, f"🗑️ Removed clock: {name}")
+                clock = clocks[name]
+                clock["filled"] = min(clock["segments"], clock["filled"] + amount)
+                display = helpers.clock_display(clock["filled"], clock["segments"])
+                complete = " ✅ COMPLETE!" if clock["filled"] >= clock["segments"] else ""
+                tg.send_message(group_id, thread_id,
+                                f"⏱️ {name}\n{display}{complete}")
             else:
                 tg.send_message(group_id, thread_id,
                                 f"No clock named '{name}'. Use /clocks to see all.")
 
-        # ---- /vote command (GM only) ----
-        if text.startswith("/vote") and not text.startswith("/votes") and user_id in gm_ids:
-            raw_args = parsed["raw_text"][5:].strip()
-            if not raw_args:
-                tg.send_message(group_id, thread_id,
-                                "Usage: /vote <question> | <option1> | <option2> [| ...]\n"
-                                "e.g. /vote Where do we go? | North gate | Sewers | Stay and rest")
-            else:
-                parts = [p.strip() for p in raw_args.split("|")]
-                if len(parts) < 3:
-                    tg.send_message(group_id, thread_id,
-                                    "Need a question and at least 2 options, separated by |\n"
-                                    "e.g. /vote Left or right? | Left | Right")
-                else:
-                    question = parts[0]
-                    options = parts[1:]
-                    if len(options) > 6:
-                        tg.send_message(group_id, thread_id, "Maximum 6 options per vote.")
-                    else:
-                        state.setdefault("votes", {})[pid] = {
-                            "question": question,
-                            "options": options,
-                            "results": {str(i): [] for i in range(1, len(options) + 1)},
-                            "closed": False,
-                            "created_at": now_iso,
-                        }
-                        # Build display
-                        option_lines = "\n".join(f"  {i}. {opt}" for i, opt in enumerate(options, 1))
-                        tg.send_message(group_id, thread_id,
-                                        f"🗳️ Vote started!\n\n❓ {question}\n\n{option_lines}\n\n"
-                                        f"Use /pick <N> to cast your vote.")
-                        print(f"Vote started in {campaign_name}: {question}")
-
-        # ---- /pick command (everyone) ----
-        if text.startswith("/pick"):
-            pick_str = parsed["raw_text"][5:].strip()
-            vote = state.get("votes", {}).get(pid)
-            if not vote or vote.get("closed"):
-                tg.send_message(group_id, thread_id, "No active vote. GMs can start one with /vote")
-            else:
+    # ---- /untick command (GM only) ----
+    if text.startswith("/untick") and user_id in gm_ids:
+        tick_args = _command_args(parsed["raw_text"], "/untick")
+        clocks = state.get("clocks", {}).get(pid, {})
+        if not tick_args:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /untick <name> [N]\ne.g. /untick Investigation 1")
+        else:
+            tick_parts = tick_args.rsplit(None, 1)
+            amount = 1
+            name = tick_args
+            if len(tick_parts) == 2:
                 try:
-                    choice = int(pick_str)
-                    if 1 <= choice <= len(vote["options"]):
-                        # Remove previous vote by this user
-                        for key in vote["results"]:
-                            vote["results"][key] = [n for n in vote["results"][key] if n != user_name]
-                        # Add new vote
-                        vote["results"][str(choice)].append(user_name)
-                        tg.send_message(group_id, thread_id,
-                                        f"✅ {user_name} voted for: {vote['options'][choice - 1]}")
-                    else:
-                        tg.send_message(group_id, thread_id,
-                                        f"Pick a number 1–{len(vote['options'])}.")
-                except (ValueError, TypeError):
-                    tg.send_message(group_id, thread_id,
-                                    f"Usage: /pick <number>\ne.g. /pick 2")
-
-        # ---- /showvote command (everyone) ----
-        if text == "/showvote":
-            vote_report = _build_vote(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, vote_report)
-
-        # ---- /endvote command (GM only) ----
-        if text == "/endvote" and user_id in gm_ids:
-            vote = state.get("votes", {}).get(pid)
-            if not vote or vote.get("closed"):
-                tg.send_message(group_id, thread_id, "No active vote to close.")
+                    amount = int(tick_parts[1])
+                    name = tick_parts[0]
+                except ValueError:
+                    name = tick_args
+                    amount = 1
+            name = name.strip()
+            if name in clocks:
+                clock = clocks[name]
+                clock["filled"] = max(0, clock["filled"] - amount)
+                display = helpers.clock_display(clock["filled"], clock["segments"])
+                tg.send_message(group_id, thread_id, f"⏱️ {name}\n{display}")
             else:
-                vote["closed"] = True
-                # Find winner
-                results = vote["results"]
-                best_count = max(len(v) for v in results.values())
-                total = sum(len(v) for v in results.values())
-                winners = [vote["options"][int(k) - 1] for k, v in results.items() if len(v) == best_count]
-
-                lines = [f"🗳️ Vote closed — {vote['question']}", ""]
-                for i, option in enumerate(vote["options"], 1):
-                    voters = results.get(str(i), [])
-                    count = len(voters)
-                    marker = " 👑" if count == best_count and count > 0 else ""
-                    voter_names = ", ".join(voters) if voters else "—"
-                    lines.append(f"  {i}. {option}: {count} ({voter_names}){marker}")
-                lines.append("")
-                if len(winners) == 1:
-                    lines.append(f"Winner: {winners[0]} ({best_count}/{total} votes)")
-                elif best_count > 0:
-                    lines.append(f"Tied: {', '.join(winners)} ({best_count} each)")
-                else:
-                    lines.append("No votes were cast.")
-                tg.send_message(group_id, thread_id, "\n".join(lines))
+                tg.send_message(group_id, thread_id,
+                                f"No clock named '{name}'. Use /clocks to see all.")
 
-        # ---- /timer command (GM only) ----
-        if text.startswith("/timer") and not text.startswith("/timers") and user_id in gm_ids:
-            raw_args = parsed["raw_text"][6:].strip()
-            if not raw_args:
+    # ---- /delclock command (GM only) ----
+    if text.startswith("/delclock") and user_id in gm_ids:
+        name = _command_args(parsed["raw_text"], "/delclock")
+        clocks = state.get("clocks", {}).get(pid, {})
+        if name in clocks:
+            del clocks[name]
+            tg.send_message(group_id, thread_id, f"🗑️ Removed clock: {name}")
+        else:
+            tg.send_message(group_id, thread_id,
+                            f"No clock named '{name}'. Use /clocks to see all.")
+
+    # ---- /vote command (GM only) ----
+    if text.startswith("/vote") and not text.startswith("/votes") and user_id in gm_ids:
+        raw_args = _command_args(parsed["raw_text"], "/vote")
+        if not raw_args:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /vote <question> | <option1> | <option2> [| ...]\n"
+                            "e.g. /vote Where do we go? | North gate | Sewers | Stay and rest")
+        else:
+            parts = [p.strip() for p in raw_args.split("|")]
+            if len(parts) < 3:
                 tg.send_message(group_id, thread_id,
-                                "Usage: /timer <duration> [reason]\n"
-                                "e.g. /timer 24h Post your combat actions\n"
-                                "e.g. /timer 2d\n"
-                                "Durations: Nh (hours), Nm (minutes), Nd (days)")
+                                "Need a question and at least 2 options, separated by |\n"
+                                "e.g. /vote Left or right? | Left | Right")
             else:
-                now_dt = datetime.fromisoformat(now_iso)
-                deadline, reason = helpers.parse_timer_duration(raw_args, now_dt)
-                if deadline is None:
-                    tg.send_message(group_id, thread_id,
-                                    "Couldn't parse duration. Use Nh, Nm, or Nd.\n"
-                                    "e.g. /timer 24h Post your actions")
+                question = parts[0]
+                options = parts[1:]
+                if len(options) > 6:
+                    tg.send_message(group_id, thread_id, "Maximum 6 options per vote.")
                 else:
-                    state.setdefault("timers", {})[pid] = {
-                        "deadline": deadline.isoformat(),
-                        "reason": reason,
-                        "set_at": now_iso,
-                        "set_by": user_name,
+                    state.setdefault("votes", {})[pid] = {
+                        "question": question,
+                        "options": options,
+                        "results": {str(i): [] for i in range(1, len(options) + 1)},
+                        "closed": False,
+                        "created_at": now_iso,
                     }
-                    time_fmt = deadline.strftime("%b %d %H:%M UTC")
-                    reason_str = f"\n📝 {reason}" if reason else ""
+                    # Build display
+                    option_lines = "\n".join(f"  {i}. {opt}" for i, opt in enumerate(options, 1))
+                    tg.send_message(group_id, thread_id,
+                                    f"🗳️ Vote started!\n\n❓ {question}\n\n{option_lines}\n\n"
+                                    f"Use /pick <N> to cast your vote.")
+                    print(f"Vote started in {campaign_name}: {question}")
+
+    # ---- /pick command (everyone) ----
+    if text.startswith("/pick"):
+        pick_str = _command_args(parsed["raw_text"], "/pick")
+        vote = state.get("votes", {}).get(pid)
+        if not vote or vote.get("closed"):
+            tg.send_message(group_id, thread_id, "No active vote. GMs can start one with /vote")
+        else:
+            try:
+                choice = int(pick_str)
+                if 1 <= choice <= len(vote["options"]):
+                    # Remove previous vote by this user
+                    for key in vote["results"]:
+                        vote["results"][key] = [n for n in vote["results"][key] if n != user_name]
+                    # Add new vote
+                    vote["results"][str(choice)].append(user_name)
+                    tg.send_message(group_id, thread_id,
+                                    f"✅ {user_name} voted for: {vote['options'][choice - 1]}")
+                else:
                     tg.send_message(group_id, thread_id,
-                                    f"⏳ Timer set! Deadline: {time_fmt}{reason_str}\n"
-                                    f"Use /showtimer to check remaining time.")
-                    print(f"Timer set in {campaign_name}: deadline {time_fmt}")
-
-        # ---- /showtimer command (everyone) ----
-        if text == "/showtimer":
-            timer_report = _build_timer(pid, campaign_name, state)
-            tg.send_message(group_id, thread_id, timer_report)
-
-        # ---- /canceltimer command (GM only) ----
-        if text == "/canceltimer" and user_id in gm_ids:
-            if state.get("timers", {}).get(pid):
-                del state["timers"][pid]
-                tg.send_message(group_id, thread_id, f"⏳ Timer cancelled for {campaign_name}.")
+                                    f"Pick a number 1–{len(vote['options'])}.")
+            except (ValueError, TypeError):
+                tg.send_message(group_id, thread_id,
+                                f"Usage: /pick <number>\ne.g. /pick 2")
+
+    # ---- /showvote command (everyone) ----
+    if text == "/showvote":
+        vote_report = _build_vote(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, vote_report)
+
+    # ---- /endvote command (GM only) ----
+    if text == "/endvote" and user_id in gm_ids:
+        vote = state.get("votes", {}).get(pid)
+        if not vote or vote.get("closed"):
+            tg.send_message(group_id, thread_id, "No active vote to close.")
+        else:
+            vote["closed"] = True
+            # Find winner
+            results = vote["results"]
+            best_count = max(len(v) for v in results.values())
+            total = sum(len(v) for v in results.values())
+            winners = [vote["options"][int(k) - 1] for k, v in results.items() if len(v) == best_count]
+
+            lines = [f"🗳️ Vote closed — {vote['question']}", ""]
+            for i, option in enumerate(vote["options"], 1):
+                voters = results.get(str(i), [])
+                count = len(voters)
+                marker = " 👑" if count == best_count and count > 0 else ""
+                voter_names = ", ".join(voters) if voters else "—"
+                lines.append(f"  {i}. {option}: {count} ({voter_names}){marker}")
+            lines.append("")
+            if len(winners) == 1:
+                lines.append(f"Winner: {winners[0]} ({best_count}/{total} votes)")
+            elif best_count > 0:
+                lines.append(f"Tied: {', '.join(winners)} ({best_count} each)")
             else:
-                tg.send_message(group_id, thread_id, "No active timer to cancel.")
-
-        # ---- /summary command (everyone) ----
-        if text == "/summary":
-            summary = _build_summary(pid, campaign_name, state, config)
-            tg.send_message(group_id, thread_id, summary)
-
-        # ---- /dc command (everyone) ----
-        if text.startswith("/dc"):
-            dc_query = parsed["raw_text"][3:].strip()
-            result = helpers.dc_lookup(dc_query)
-            tg.send_message(group_id, thread_id, result)
-
-        # ---- /away command (everyone) ----
-        if text.startswith("/away"):
-            args = parsed["raw_text"][5:].strip()
+                lines.append("No votes were cast.")
+            tg.send_message(group_id, thread_id, "\n".join(lines))
+
+    # ---- /timer command (GM only) ----
+    if text.startswith("/timer") and not text.startswith("/timers") and user_id in gm_ids:
+        raw_args = _command_args(parsed["raw_text"], "/timer")
+        if not raw_args:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /timer <duration> [reason]\n"
+                            "e.g. /timer 24h Post your combat actions\n"
+                            "e.g. /timer 2d\n"
+                            "Durations: Nh (hours), Nm (minutes), Nd (days)")
+        else:
             now_dt = datetime.fromisoformat(now_iso)
-            until_dt, reason = helpers.parse_away_duration(args, now_dt)
-            away_key = f"{pid}:{user_id}"
-            state.setdefault("away", {})[away_key] = {
-                "until": until_dt.isoformat() if until_dt else None,
-                "reason": reason,
-                "set_at": now_iso,
-            }
-            if until_dt:
-                until_str = f"{until_dt.strftime('%b %d')} (W{until_dt.isocalendar()[1]})"
-                msg = f"✈️ {user_name} marked as away until {until_str}.\nReason: {reason}"
-            else:
-                msg = f"✈️ {user_name} marked as away (indefinite).\nReason: {reason}"
-            msg += "\nUse /back when you return."
-            print(f"Away: {user_name} in {campaign_name} — {reason}")
-            tg.send_message(group_id, thread_id, msg)
-
-        # ---- /back command (everyone) ----
-        if text == "/back":
-            away_key = f"{pid}:{user_id}"
-            if away_key in state.get("away", {}):
-                del state["away"][away_key]
-                char_name = helpers.character_name(config, pid, user_id)
-                char_tag = f" ({char_name})" if char_name else ""
+            deadline, reason = helpers.parse_timer_duration(raw_args, now_dt)
+            if deadline is None:
                 tg.send_message(group_id, thread_id,
-                                f"👋 {user_name}{char_tag} is back!")
-                print(f"Back: {user_name} in {campaign_name}")
+                                "Couldn't parse duration. Use Nh, Nm, or Nd.\n"
+                                "e.g. /timer 24h Post your actions")
             else:
+                state.setdefault("timers", {})[pid] = {
+                    "deadline": deadline.isoformat(),
+                    "reason": reason,
+                    "set_at": now_iso,
+                    "set_by": user_name,
+                }
+                time_fmt = deadline.strftime("%b %d %H:%M UTC")
+                reason_str = f"\n📝 {reason}" if reason else ""
                 tg.send_message(group_id, thread_id,
-                                f"You're not currently marked as away.")
+                                f"⏳ Timer set! Deadline: {time_fmt}{reason_str}\n"
+                                f"Use /showtimer to check remaining time.")
+                print(f"Timer set in {campaign_name}: deadline {time_fmt}")
+
+    # ---- /showtimer command (everyone) ----
+    if text == "/showtimer":
+        timer_report = _build_timer(pid, campaign_name, state)
+        tg.send_message(group_id, thread_id, timer_report)
+
+    # ---- /canceltimer command (GM only) ----
+    if text == "/canceltimer" and user_id in gm_ids:
+        if state.get("timers", {}).get(pid):
+            del state["timers"][pid]
+            tg.send_message(group_id, thread_id, f"⏳ Timer cancelled for {campaign_name}.")
+        else:
+            tg.send_message(group_id, thread_id, "No active timer to cancel.")
+
+    # ---- /summary command (everyone) ----
+    if text == "/summary":
+        summary = _build_summary(pid, campaign_name, state, config)
+        tg.send_message(group_id, thread_id, summary)
+
+    # ---- /dc command (everyone) ----
+    if text.startswith("/dc"):
+        dc_query = _command_args(parsed["raw_text"], "/dc")
+        result = helpers.dc_lookup(dc_query)
+        tg.send_message(group_id, thread_id, result)
+
+    # ---- /away command (everyone) ----
+    if text.startswith("/away"):
+        args = _command_args(parsed["raw_text"], "/away")
+        now_dt = datetime.fromisoformat(now_iso)
+        until_dt, reason = helpers.parse_away_duration(args, now_dt)
+        away_key = f"{pid}:{user_id}"
+        state.setdefault("away", {})[away_key] = {
+            "until": until_dt.isoformat() if until_dt else None,
+            "reason": reason,
+            "set_at": now_iso,
+        }
+        if until_dt:
+            until_str = f"{until_dt.strftime('%b %d')} (W{until_dt.isocalendar()[1]})"
+            msg = f"✈️ {user_name} marked as away until {until_str}.\nReason: {reason}"
+        else:
+            msg = f"✈️ {user_name} marked as away (indefinite).\nReason: {reason}"
+        msg += "\nUse /back when you return."
+        print(f"Away: {user_name} in {campaign_name} — {reason}")
+        tg.send_message(group_id, thread_id, msg)
+
+    # ---- /back command (everyone) ----
+    if text == "/back":
+        away_key = f"{pid}:{user_id}"
+        if away_key in state.get("away", {}):
+            del state["away"][away_key]
+            char_name = helpers.character_name(config, pid, user_id)
+            char_tag = f" ({char_name})" if char_name else ""
+            tg.send_message(group_id, thread_id,
+                            f"👋 {user_name}{char_tag} is back!")
+            print(f"Back: {user_name} in {campaign_name}")
+        else:
+            tg.send_message(group_id, thread_id,
+                            f"You're not currently marked as away.")
 
-        # ---- /recap command (everyone) ----
-        if text.startswith("/recap"):
-            args = parsed["raw_text"][6:].strip()
-            try:
-                count = int(args) if args else 10
-            except ValueError:
-                count = 10
-            recap = _build_recap(pid, campaign_name, config, count)
-            tg.send_message(group_id, thread_id, recap)
-
-        # ---- /roll command (everyone) ----
-        if text.startswith("/roll"):
-            dice_expr = parsed["raw_text"][5:].strip()
-            if not dice_expr:
-                tg.send_message(group_id, thread_id,
-                                "Usage: /roll <dice> [label]\n"
-                                "e.g. /roll 1d20+5 Stealth\n"
-                                "e.g. /roll 2d6+3\n"
-                                "e.g. /roll 4d6kh3 (keep highest 3)")
+    # ---- /recap command (everyone) ----
+    if text.startswith("/recap"):
+        args = _command_args(parsed["raw_text"], "/recap")
+        try:
+            count = int(args) if args else 10
+        except ValueError:
+            count = 10
+        recap = _build_recap(pid, campaign_name, config, count)
+        tg.send_message(group_id, thread_id, recap)
+
+    # ---- /roll command (everyone) ----
+    if text.startswith("/roll"):
+        dice_expr = _command_args(parsed["raw_text"], "/roll")
+        if not dice_expr:
+            tg.send_message(group_id, thread_id,
+                            "Usage: /roll <dice> [label]\n"
+                            "e.g. /roll 1d20+5 Stealth\n"
+                            "e.g. /roll 2d6+3\n"
+                            "e.g. /roll 4d6kh3 (keep highest 3)")
+        else:
+            result = helpers.roll_dice(dice_expr)
+            if result.get("error"):
+                tg.send_message(group_id, thread_id, result["error"])
             else:
-                result = helpers.roll_dice(dice_expr)
-                if result.get("error"):
-                    tg.send_message(group_id, thread_id, result["error"])
+                char_name = helpers.character_name(config, pid, user_id)
+                roller = char_name or user_name
+                label = result["label"]
+
+                lines = []
+                grand_total = 0
+                for r in result["results"]:
+                    grand_total += r["total"]
+                    lines.append(f"  {r['expr']}: {r['detail']} = {r['total']}")
+
+                header = f"🎲 {roller}"
+                if label:
+                    header += f" — {label}"
+                header += ":"
+
+                if len(result["results"]) == 1:
+                    r = result["results"][0]
+                    msg = f"{header}\n  {r['detail']} = {r['total']}"
                 else:
-                    char_name = helpers.character_name(config, pid, user_id)
-                    roller = char_name or user_name
-                    label = result["label"]
-
-                    lines = []
-                    grand_total = 0
-                    for r in result["results"]:
-                        grand_total += r["total"]
-                        lines.append(f"  {r['expr']}: {r['detail']} = {r['total']}")
-
-                    header = f"🎲 {roller}"
-                    if label:
-                        header += f" — {label}"
-                    header += ":"
-
-                    if len(result["results"]) == 1:
-                        r = result["results"][0]
-                        msg = f"{header}\n  {r['detail']} = {r['total']}"
-                    else:
-                        msg = header + "\n" + "\n".join(lines) + f"\n  Total: {grand_total}"
+                    msg = header + "\n" + "\n".join(lines) + f"\n  Total: {grand_total}"
+
+                tg.send_message(group_id, thread_id, msg)
+
+
+def process_updates(updates: list, config: dict, state: dict) -> int:
+    """Process new Telegram updates, tracking posts and handling commands. Returns new offset.
 
-                    tg.send_message(group_id, thread_id, msg)
+    Transcript appends are buffered for the batch and written once per file
+    at the end (and before any command, since some commands read them).
+    """
+    global _transcript_buffer
+    _transcript_buffer = {}
+    try:
+        return _process_update_batch(updates, config, state)
+    finally:
+        # Stop buffering even if a write fails, or later appends would
+        # sit in the buffer and never reach disk.
+        try:
+            _flush_transcripts()
+        finally:
+            _transcript_buffer = None
+
+
+def _process_update_batch(updates: list, config: dict, state: dict) -> int:
+    """Body of process_updates: track each post and run its commands."""
+    group_id = config["group_id"]
+
+    maps = build_topic_maps(config)
+    # One clock reading for the whole batch; updates arrive together
+    batch_now_iso = datetime.now(timezone.utc).isoformat()
+
+    start_offset = new_offset = state.get("offset", 0)
+
+    # Per-message counters, fetched once per batch rather than per post
+    message_counts = state["message_counts"]
+    word_counts = state.setdefault("word_counts", {})
+    post_timestamps = state["post_timestamps"]
+    activity_hours = state.setdefault("activity_hours", {})
+    activity_days = state.setdefault("activity_days", {})
+
+    for update in updates:
+        update_id = update["update_id"]
+        # Anything below the stored offset was handled by an earlier fetch
+        if update_id < start_offset:
+            continue
+        new_offset = max(new_offset, update_id + 1)
+
+        msg = update.get("message")
+        cb = update.get("callback_query")
+
+        # ---- Handle boon choice callbacks ----
+        if cb:
+            process_boon_callback(cb, config, state)
+            continue
+
+        if not msg:
+            continue
+
+        parsed = _parse_message(msg, group_id, maps, batch_now_iso)
+        if not parsed:
+            continue
+
+        pid = parsed["pid"]
+        thread_id = parsed["thread_id"]
+        user_id = parsed["user_id"]
+        user_name = parsed["user_name"]
+        campaign_name = parsed["campaign_name"]
+        now_iso = parsed["now_iso"]
+        msg_time_iso = parsed["msg_time_iso"]
+        text = parsed["text"]
+        # Most PBP posts aren't commands; decide once and skip the command chain
+        is_command = text.startswith("/")
+
+        # Per-campaign GM IDs (supports per-campaign overrides)
+        gm_ids = helpers.gm_ids_for_campaign(config, pid)
+
+        if is_command:
+            _flush_transcripts()
+            _handle_command(parsed, config, state, gm_ids)
 
         # ---- Combat commands and tracking ----
         _handle_combat_message(
@@ -3628,31 +3768,31 @@ def process_updates(updates: list, config: dict, state: dict) -> int:
         }
 
         # Increment message count for this user in this topic
-        user_counts = state["message_counts"].setdefault(pid, {})
+        user_counts = message_counts.setdefault(pid, {})
         user_counts[user_id] = user_counts.get(user_id, 0) + 1
 
         # Track word count (measures RP engagement depth, not just frequency)
         raw_text = parsed["raw_text"] or ""
-        word_count = len(raw_text.split()) if raw_text.strip() else 0
-        user_words = state.setdefault("word_counts", {}).setdefault(pid, {})
+        word_count = len(raw_text.split())
+        user_words = word_counts.setdefault(pid, {})
         user_words[user_id] = user_words.get(user_id, 0) + word_count
 
         # Track post timestamps for Player of the Week gap calculation
-        state["post_timestamps"].setdefault(pid, {}).setdefault(user_id, []).append(msg_time_iso)
+        post_timestamps.setdefault(pid, {}).setdefault(user_id, []).append(msg_time_iso)
 
         # Track activity patterns (persistent hour/day counters)
-        msg_dt = datetime.fromisoformat(msg_time_iso)
+        msg_dt = helpers.parse_ts(msg_time_iso)
         hour_key = str(msg_dt.hour)
         day_key = str(msg_dt.weekday())  # 0=Mon, 6=Sun
-        user_hours = state.setdefault("activity_hours", {}).setdefault(pid, {}).setdefault(user_id, {})
+        user_hours = activity_hours.setdefault(pid, {}).setdefault(user_id, {})
         user_hours[hour_key] = user_hours.get(hour_key, 0) + 1
-        user_days = state.setdefault("activity_days", {}).setdefault(pid, {}).setdefault(user_id, {})
+        user_days = activity_days.setdefault(pid, {}).setdefault(user_id, {})
         user_days[day_key] = user_days.get(day_key, 0) + 1
 
         # Update player-level tracking (skip GM)
         if user_id and user_id not in gm_ids:
             # Auto-clear away status when player posts (non-command only)
-            if not text.startswith("/"):
+            if not is_command:
                 away_key = f"{pid}:{user_id}"
                 if away_key in state.get("away", {}):
                     del state["away"][away_key]
@@ -3699,7 +3839,7 @@ def process_updates(updates: list, config: dict, state: dict) -> int:
                 )
 
         # Log to persistent PBP transcript
-        if not text.startswith("/"):
+        if not is_command:
             _append_to_transcript(parsed, gm_ids, config)
 
         print(f"Tracked message in {campaign_name} from {user_name}")
@@ -3710,39 +3850,40 @@ def process_updates(updates: list, config: dict, state: dict) -> int:
 # ------------------------------------------------------------------ #
 #  Topic inactivity alerts (4-hour)
 # ------------------------------------------------------------------ #
-def check_and_alert(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def check_and_alert(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                    stats=None) -> None:
     """Send alerts to campaigns inactive beyond alert_after_hours."""
     group_id = config["group_id"]
     alert_hours = config.get("alert_after_hours", 4)
     now = now or datetime.now(timezone.utc)
 
     maps = maps or build_topic_maps(config)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
+    alert_cutoff = now - timedelta(hours=alert_hours)
+    paused = state.get("paused_campaigns", {})
 
     for pid, chat_topic_id in maps.to_chat.items():
+        # Most topics are recently active (or untracked) on any given run,
+        # so rule those out before the config and state lookups below.
+        last_time = stats[pid].last_message_time
+        if last_time is None or last_time > alert_cutoff:
+            continue
+
         name = maps.to_name[pid]
 
         if not helpers.feature_enabled(config, pid, "alerts"):
             continue
 
-        if pid in state.get("paused_campaigns", {}):
-            continue
-
-        if pid not in state.get("topics", {}):
-            continue
-            print(f"No messages tracked yet for {name}, skipping")
+        if pid in paused:
             continue
 
         topic_state = state["topics"][pid]
-        last_time = datetime.fromisoformat(topic_state["last_message_time"])
         elapsed_hours = helpers.hours_since(now, last_time)
 
-        if elapsed_hours < alert_hours:
-            continue
-
         # Don't re-alert within alert_hours
         last_alert_str = state["last_alerts"].get(pid)
         if last_alert_str:
-            since_last = helpers.hours_since(now, datetime.fromisoformat(last_alert_str))
+            since_last = helpers.hours_since(now, helpers.parse_ts(last_alert_str))
             if since_last < alert_hours:
                 print(f"{name}: Already alerted {since_last:.1f}h ago, skipping")
                 continue
@@ -3756,7 +3897,7 @@ def check_and_alert(config: dict, state: dict, *, now: datetime | None = None, m
         time_str = f"{days}d {remaining_hours}h" if days > 0 else f"{hours_int}h"
 
         # Look up total message count for last poster
-        count = state.get("message_counts", {}).get(pid, {}).get(last_user_id, 0)
+        count = state["message_counts"].get(pid, {}).get(last_user_id, 0)
         count_str = f" ({count} total posts)" if count > 0 else ""
 
         last_date = fmt_date(last_time)
@@ -3774,77 +3915,88 @@ def check_and_alert(config: dict, state: dict, *, now: datetime | None = None, m
 # ------------------------------------------------------------------ #
 #  Player inactivity tracking (weekly)
 # ------------------------------------------------------------------ #
+# %-style templates: filled with a dict, which is cheaper than str.format
 _INACTIVITY_TEMPLATES = {
-    1: "{mention} hasn't posted in {campaign} PBP for {days} days (last: {date}). Everything okay?",
-    2: "{mention} still no post in {campaign} PBP. It's been {days} days now (last: {date}).",
-    3: "{mention} it's been {days} days without a post in {campaign} PBP (last: {date}). 1 week until auto-removal from the campaign.",
+    1: "%(mention)s hasn't posted in %(campaign)s PBP for %(days)d days (last: %(date)s). Everything okay?",
+    2: "%(mention)s still no post in %(campaign)s PBP. It's been %(days)d days now (last: %(date)s).",
+    3: "%(mention)s it's been %(days)d days without a post in %(campaign)s PBP (last: %(date)s). 1 week until auto-removal from the campaign.",
 }
 
 
-def check_player_activity(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
-    """Warn inactive players at 1/2/3 weeks, remove at 4 weeks."""
+def check_player_activity(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                          stats=None) -> None:
+    """Warn inactive players at 1/2/3 weeks, remove at 4 weeks.
+
+    Removed players are also dropped from ``stats`` so later checks in the
+    same run see the updated roster.
+    """
     group_id = config["group_id"]
     now = now or datetime.now(timezone.utc)
 
     # Build lookup: canonical pbp_topic_id -> chat_topic_id
     maps = maps or build_topic_maps(config)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
+    paused = state.get("paused_campaigns", {})
 
     players_to_remove = []
 
-    for player_key, player in state["players"].items():
-        pbp_topic_id = player["pbp_topic_id"]
-        chat_topic_id = maps.to_chat.get(pbp_topic_id)
-        if not chat_topic_id:
-            continue
+    # Walk campaign by campaign so the per-campaign checks run once each
+    for pbp_topic_id, chat_topic_id in maps.to_chat.items():
         if not helpers.feature_enabled(config, pbp_topic_id, "warnings"):
             continue
-        if pbp_topic_id in state.get("paused_campaigns", {}):
+        if pbp_topic_id in paused:
             continue
-        # Skip players who are marked as away
-        user_id = player.get("user_id", "")
-        if helpers.is_away(state, pbp_topic_id, user_id, now):
-            continue
-
-        last_post = datetime.fromisoformat(player["last_post_time"])
-        elapsed_days = helpers.days_since(now, last_post)
-        current_week = int(elapsed_days / 7)
-        last_warned = player.get("last_warned_week", 0)
-
-        first_name = player["first_name"]
-        campaign = player["campaign_name"]
-        mention = helpers.player_mention(player)
-        days_inactive = int(elapsed_days)
-        last_date = fmt_date(last_post)
+        topic = stats.get(pbp_topic_id)
+        for uid, player in (topic.by_uid.items() if topic else ()):
+            # Skip players who are marked as away
+            user_id = player.get("user_id", "")
+            if helpers.is_away(state, pbp_topic_id, user_id, now):
+                continue
 
-        # 4+ weeks: remove
-        if current_week >= helpers.PLAYER_REMOVE_WEEKS:
-            if last_warned < helpers.PLAYER_REMOVE_WEEKS:
-                message = (
-                    f"{mention} has not posted in {campaign} PBP for "
-                    f"{days_inactive} days (last: {last_date}). They are no longer tracked "
-                    f"as an active player in this campaign."
-                )
-                print(f"Removing {first_name} from {campaign} ({days_inactive}d)")
-                tg.send_message(group_id, chat_topic_id, message)
-                players_to_remove.append(player_key)
-            continue
+            last_post = helpers.parse_ts(player["last_post_time"])
+            elapsed_days = helpers.days_since(now, last_post)
+            current_week = int(elapsed_days / 7)
+            last_warned = player.get("last_warned_week", 0)
+
+            first_name = player["first_name"]
+            campaign = player["campaign_name"]
+            mention = helpers.player_mention(player)
+            days_inactive = int(elapsed_days)
+            last_date = fmt_date(last_post)
+
+            # 4+ weeks: remove
+            if current_week >= helpers.PLAYER_REMOVE_WEEKS:
+                if last_warned < helpers.PLAYER_REMOVE_WEEKS:
+                    message = (
+                        f"{mention} has not posted in {campaign} PBP for "
+                        f"{days_inactive} days (last: {last_date}). They are no longer tracked "
+                        f"as an active player in this campaign."
+                    )
+                    print(f"Removing {first_name} from {campaign} ({days_inactive}d)")
+                    tg.send_message(group_id, chat_topic_id, message)
+                    players_to_remove.append(f"{pbp_topic_id}:{uid}")
+                continue
 
-        # 1, 2, 3 week warnings
-        for week_mark in helpers.PLAYER_WARN_WEEKS:
-            if current_week >= week_mark and last_warned < week_mark:
-                template = _INACTIVITY_TEMPLATES.get(week_mark, _INACTIVITY_TEMPLATES[3])
-                message = template.format(
-                    mention=mention, campaign=campaign,
-                    days=days_inactive, date=last_date,
-                )
-                print(f"Warning {first_name} in {campaign}: week {week_mark}")
-                if tg.send_message(group_id, chat_topic_id, message):
-                    player["last_warned_week"] = week_mark
-                break  # One warning per player per run
+            # 1, 2, 3 week warnings
+            for week_mark in helpers.PLAYER_WARN_WEEKS:
+                if current_week >= week_mark and last_warned < week_mark:
+                    template = _INACTIVITY_TEMPLATES.get(week_mark, _INACTIVITY_TEMPLATES[3])
+                    message = template % {
+                        "mention": mention, "campaign": campaign,
+                        "days": days_inactive, "date": last_date,
+                    }
+                    print(f"Warning {first_name} in {campaign}: week {week_mark}")
+                    if tg.send_message(group_id, chat_topic_id, message):
+                        player["last_warned_week"] = week_mark
+                    break  # One warning per player per run
 
     # Move removed players out
     for key in players_to_remove:
         removed = state["players"].pop(key)
+        if removed["pbp_topic_id"] in stats:
+            topic = stats[removed["pbp_topic_id"]]
+            topic.players[:] = [p for p in topic.players if p is not removed]
+            topic.by_uid.pop(key.partition(":")[2], None)
         state["removed_players"][key] = {
             "removed_at": now.isoformat(),
             "first_name": removed["first_name"],
@@ -3862,10 +4014,13 @@ def _roster_user_stats(raw_timestamps: list[str], total_count: int, now: datetim
     Returns dict with: total, sessions, week_count, avg_gap_str, last_post_str, streak.
     """
     week_ago = now - timedelta(days=7)
-    all_posts = sorted(datetime.fromisoformat(ts) for ts in raw_timestamps)
+    all_posts = sorted(helpers.parse_ts(ts) for ts in raw_timestamps)
     sessions = deduplicate_posts(all_posts)
-    week_count = len(deduplicate_posts(timestamps_in_window(raw_timestamps, week_ago)))
-    avg_gap_str = calc_avg_gap_str(raw_timestamps)
+    # Posts are sorted, so the last week is a suffix; dormant players have
+    # nothing in it and skip the dedup pass.
+    week_posts = all_posts[bisect_left(all_posts, week_ago):]
+    week_count = len(deduplicate_posts(week_posts)) if week_posts else 0
+    avg_gap_str = helpers.fmt_avg_gap(sessions)
     last_post_str = fmt_relative_date(now, all_posts[-1]) if all_posts else "N/A"
     streak = _calc_streak(raw_timestamps, now)
     return {
@@ -3897,26 +4052,30 @@ def _roster_block(label: str, username: str, stats: dict) -> str:
     return block
 
 
-def post_roster_summary(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def post_roster_summary(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                        stats=None) -> None:
     """Post a summary of all tracked players per campaign to CHAT topics."""
     group_id = config["group_id"]
     now = now or datetime.now(timezone.utc)
 
     maps = maps or build_topic_maps(config)
-    campaigns = helpers.players_by_campaign(state)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
+    message_counts = state["message_counts"]
 
+    # Cheapest guards first: most campaigns aren't due on a given run
     for pid, chat_topic_id in maps.to_chat.items():
         if not helpers.feature_enabled(config, pid, "roster"):
             continue
         if not helpers.interval_elapsed(state["last_roster"].get(pid), helpers.ROSTER_INTERVAL_DAYS, now):
             continue
 
-        gm_ids = helpers.gm_ids_for_campaign(config, pid)
+        topic = stats[pid]
+        gm_ids = topic.gm_ids
 
         name = maps.to_name.get(pid, "Unknown")
-        players = campaigns.get(pid, [])
-        counts = state.get("message_counts", {}).get(pid, {})
-        topic_timestamps = helpers.get_topic_timestamps(state, pid)
+        players = topic.players
+        counts = message_counts.get(pid, {})
+        topic_timestamps = topic.timestamps
 
         if not players and not counts:
             continue
@@ -3932,16 +4091,16 @@ def post_roster_summary(config: dict, state: dict, *, now: datetime | None = Non
             full = helpers.player_full_name(player)
             char_name = characters.get(uid)
             label = f"{full} ({char_name})" if char_name else full
-            stats = _roster_user_stats(raw_ts, counts.get(uid, 0), now)
-            lines.append(_roster_block(label, player.get("username", ""), stats))
+            user_stats = _roster_user_stats(raw_ts, counts.get(uid, 0), now)
+            lines.append(_roster_block(label, player.get("username", ""), user_stats))
 
         # Add GM stats if present
         for gm_id in gm_ids:
             gm_count = counts.get(gm_id, 0)
             raw_ts = topic_timestamps.get(gm_id, [])
             if gm_count > 0 and raw_ts:
-                stats = _roster_user_stats(raw_ts, gm_count, now)
-                lines.insert(0, _roster_block("GM", "", stats))
+                gm_stats = _roster_user_stats(raw_ts, gm_count, now)
+                lines.insert(0, _roster_block("GM", "", gm_stats))
 
         if not lines:
             continue
@@ -3963,11 +4122,11 @@ def post_roster_summary(config: dict, state: dict, *, now: datetime | None = Non
 # ------------------------------------------------------------------ #
 #  Player of the Week (weekly, consistency-based)
 # ------------------------------------------------------------------ #
-def _gather_potw_candidates(
+def _pick_potw_winner(
     topic_timestamps: dict, gm_ids: set, week_ago: datetime, pid: str, state: dict,
-) -> list[dict]:
-    """Find POTW candidates: players with enough posts, ranked by avg gap."""
-    candidates = []
+) -> dict | None:
+    """Return the POTW winner: the eligible player with the smallest avg gap, or None."""
+    best = None  # (avg_gap, post_count, user_id)
     for user_id, timestamps in topic_timestamps.items():
         if user_id in gm_ids:
             continue
@@ -3976,35 +4135,34 @@ def _gather_potw_candidates(
         if len(sessions) < helpers.POTW_MIN_POSTS:
             continue
 
-        sessions.sort()
         avg_gap = helpers.avg_gap_hours(sessions) or float("inf")
+        if best is None or avg_gap < best[0]:
+            best = (avg_gap, len(sessions), user_id)
 
-        player = helpers.get_player(state, pid, user_id)
-        candidates.append({
-            "user_id": user_id,
-            "first_name": player.get("first_name", "Unknown"),
-            "last_name": player.get("last_name", ""),
-            "username": player.get("username", ""),
-            "avg_gap_hours": avg_gap,
-            "post_count": len(sessions),
-        })
-    return candidates
+    if best is None:
+        return None
+    avg_gap, post_count, user_id = best
+    player = helpers.get_player(state, pid, user_id)
+    return {
+        "user_id": user_id,
+        "first_name": player.get("first_name", "Unknown"),
+        "last_name": player.get("last_name", ""),
+        "username": player.get("username", ""),
+        "avg_gap_hours": avg_gap,
+        "post_count": post_count,
+    }
 
 
-def player_of_the_week(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def player_of_the_week(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                       stats=None) -> None:
     """Award Player of the Week based on smallest average gap between posts."""
     group_id = config["group_id"]
     now = now or datetime.now(timezone.utc)
 
-    try:
-        with open(helpers.BOONS_PATH) as f:
-            boons = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Warning: Could not load boons: {e}")
-        boons = ["Something mildly beneficial happens to you today."]
-
     maps = maps or build_topic_maps(config)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
     week_ago = now - timedelta(days=7)
+    date_range = f"({fmt_date(week_ago)} to {fmt_date(now)})"
 
     for pid, chat_topic_id in maps.to_chat.items():
         if not helpers.feature_enabled(config, pid, "potw"):
@@ -4013,33 +4171,39 @@ def player_of_the_week(config: dict, state: dict, *, now: datetime | None = None
             continue
 
         name = maps.to_name.get(pid, "Unknown")
-        topic_timestamps = helpers.get_topic_timestamps(state, pid)
-        gm_ids = helpers.gm_ids_for_campaign(config, pid)
+        topic_timestamps = stats[pid].timestamps
+        gm_ids = stats[pid].gm_ids
 
-        candidates = _gather_potw_candidates(topic_timestamps, gm_ids, week_ago, pid, state)
-        if not candidates:
+        winner = _pick_potw_winner(topic_timestamps, gm_ids, week_ago, pid, state)
+        if not winner:
             print(f"No POTW candidates for {name} (need {helpers.POTW_MIN_POSTS}+ posts)")
             continue
 
-        winner = min(candidates, key=lambda c: c["avg_gap_hours"])
         mention = helpers.player_mention(winner)
         avg_gap_str = f"{winner['avg_gap_hours']:.1f}h"
 
-        # Pick 3 random flavour boons + 1 mechanical boon
-        chosen_boons = random.sample(boons, min(3, len(boons)))
-        chosen_boons.append(random.choice(helpers.MECHANICAL_BOONS))
+        # The boons file is only read once a campaign actually has a winner
+        boons = helpers.load_boons()
+
+        # Pick 3 random flavour boons + 1 mechanical boon. Seeded per campaign
+        # and day so a double-fired cron run offers the same boons.
+        rng = random.Random(f"{pid}:{week_ago.date().isoformat()}")
+        chosen_boons = [
+            *rng.sample(boons, min(3, len(boons))),
+            rng.choice(helpers.MECHANICAL_BOONS),
+        ]
 
         base_message = (
             f"Player of the Week for {name}: {mention}!\n"
-            f"({fmt_date(week_ago)} to {fmt_date(now)})\n\n"
+            f"{date_range}\n\n"
             f"{posts_str(winner['post_count'])} this week with an average "
             f"gap of {avg_gap_str} between posts. The most consistent "
             f"driver of the story."
         )
 
-        boon_text = "\n\nChoose your boon:\n"
-        for i, b in enumerate(chosen_boons):
-            boon_text += f"\n{i + 1}. {b}\n"
+        boon_text = "\n\nChoose your boon:\n" + "".join(
+            f"\n{i + 1}. {b}\n" for i, b in enumerate(chosen_boons)
+        )
 
         buttons = [
             {"text": f"Boon #{i + 1}", "callback_data": f"boon:{pid}:{i}"}
@@ -4062,14 +4226,15 @@ def player_of_the_week(config: dict, state: dict, *, now: datetime | None = None
 # ------------------------------------------------------------------ #
 #  Combat turn pinger (side-based initiative)
 # ------------------------------------------------------------------ #
-def check_combat_turns(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def check_combat_turns(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                       stats=None) -> None:
     """During players' phase, ping players who haven't acted yet."""
     group_id = config["group_id"]
     now = now or datetime.now(timezone.utc)
 
     # Build lookup: canonical pbp_topic_id -> chat_topic_id
     maps = maps or build_topic_maps(config)
-    all_campaigns = helpers.players_by_campaign(state)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
 
     for pid, combat in list(state["combat"].items()):
         if not combat.get("active"):
@@ -4091,16 +4256,17 @@ def check_combat_turns(config: dict, state: dict, *, now: datetime | None = None
         # Don't re-ping within helpers.COMBAT_PING_HOURS
         last_ping_str = combat.get("last_ping_at")
         if last_ping_str:
-            since_ping = helpers.hours_since(now, datetime.fromisoformat(last_ping_str))
+            since_ping = helpers.hours_since(now, helpers.parse_ts(last_ping_str))
             if since_ping < helpers.COMBAT_PING_HOURS:
                 continue
 
         # Find all known players in this campaign who haven't acted
         acted_raw = combat.get("players_acted", {})
-        acted = set(acted_raw.keys()) if isinstance(acted_raw, dict) else set(acted_raw)
+        acted = acted_raw if isinstance(acted_raw, dict) else set(acted_raw)
+        topic = stats.get(pid)
         missing = [
             helpers.player_mention(p)
-            for p in all_campaigns.get(pid, [])
+            for p in (topic.players if topic else [])
             if p["user_id"] not in acted
             and not helpers.is_away(state, pid, p["user_id"], now)
         ]
@@ -4131,7 +4297,8 @@ def check_combat_turns(config: dict, state: dict, *, now: datetime | None = None
 # ------------------------------------------------------------------ #
 #  Weekly data archive (preserves long-term trends)
 # ------------------------------------------------------------------ #
-def archive_weekly_data(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def archive_weekly_data(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                        stats=None) -> None:
     """Archive weekly summaries to a JSON file in the repo.
 
     Stores compact per-campaign stats keyed by ISO week (e.g. '2026-W07').
@@ -4152,30 +4319,33 @@ def archive_weekly_data(config: dict, state: dict, *, now: datetime | None = Non
     # Load existing archive from repo file
     helpers.ARCHIVE_PATH.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with open(helpers.ARCHIVE_PATH) as f:
-            archive = json.load(f)
+        archive = json.loads(helpers.ARCHIVE_PATH.read_text())
     except (FileNotFoundError, json.JSONDecodeError):
         archive = {}
 
     week_start = now - timedelta(days=now.weekday() + 7)  # Start of last week (Monday)
     week_end = week_start + timedelta(days=7)
 
-    maps = build_topic_maps(config)
-    all_campaigns = helpers.players_by_campaign(state)
+    maps = maps or build_topic_maps(config)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
+    word_counts = state.get("word_counts", {})
+    changed = False
 
     for pid, name in maps.to_name.items():
-        topic_timestamps = helpers.get_topic_timestamps(state, pid)
-        gm_ids = helpers.gm_ids_for_campaign(config, pid)
+        topic = stats[pid]
+        topic_timestamps = topic.timestamps
+        gm_ids = topic.gm_ids
+        campaign_words = word_counts.get(pid, {})
 
         gm_posts = 0
         player_posts = 0
-        player_counts = {}
+        player_counts = Counter()
         player_post_times = []
         player_details = {}  # name -> {posts, sessions (unique days), timestamps}
 
         for uid, timestamps in topic_timestamps.items():
             is_gm = uid in gm_ids
-            player_info = helpers.get_player(state, pid, uid)
+            player_info = topic.by_uid.get(uid, {})
 
             user_sessions = deduplicate_posts(
                 timestamps_in_window(timestamps, week_start, week_end)
@@ -4189,25 +4359,25 @@ def archive_weekly_data(config: dict, state: dict, *, now: datetime | None = Non
                 player_post_times.extend(user_sessions)
                 if session_count > 0:
                     p_name = helpers.player_mention(player_info)
-                    player_counts[p_name] = player_counts.get(p_name, 0) + session_count
+                    player_counts[p_name] += session_count
                     # Collect per-player detail
                     unique_days = len({ts.date() for ts in user_sessions})
-                    p_gap = helpers.avg_gap_hours(sorted(user_sessions))
+                    p_gap = helpers.avg_gap_hours(user_sessions)
                     player_details[p_name] = {
                         "posts": session_count,
                         "sessions": unique_days,
                         "avg_gap_h": round(p_gap, 1) if p_gap is not None else None,
-                        "words": state.get("word_counts", {}).get(pid, {}).get(uid, 0),
+                        "words": campaign_words.get(uid, 0),
                     }
 
         # Calculate player avg gap
-        raw_gap = helpers.avg_gap_hours(sorted(player_post_times))
+        raw_gap = helpers.avg_gap_hours(player_post_times)
         player_avg_gap = round(raw_gap, 1) if raw_gap is not None else None
 
-        active_players = len(all_campaigns.get(pid, []))
+        active_players = len(topic.players)
 
         archive_key = f"{pid}:{week_key}"
-        archive[archive_key] = {
+        record = {
             "campaign": name,
             "week": week_key,
             "gm_posts": gm_posts,
@@ -4215,55 +4385,79 @@ def archive_weekly_data(config: dict, state: dict, *, now: datetime | None = Non
             "total_posts": gm_posts + player_posts,
             "player_avg_gap_h": player_avg_gap,
             "active_players": active_players,
-            "total_words": sum(state.get("word_counts", {}).get(pid, {}).values()),
-            "top_players": dict(sorted(
-                player_counts.items(), key=lambda x: x[1], reverse=True
-            )[:5]),
+            "total_words": sum(campaign_words.values()),
+            "top_players": dict(heapq.nlargest(5, player_counts.items(), key=lambda x: x[1])),
             "player_breakdown": player_details,
         }
+        if archive.get(archive_key) != record:
+            archive[archive_key] = record
+            changed = True
 
-    # Write archive to repo file
-    with open(helpers.ARCHIVE_PATH, "w") as f:
-        json.dump(archive, f, indent=2)
+    # Write archive to repo file (serialise first: one write, not one per
+    # token). A re-run for an already archived week leaves the file alone.
+    if changed:
+        helpers.ARCHIVE_PATH.write_text(json.dumps(archive, indent=2))
+        print(f"Archived weekly data for {week_key} to {helpers.ARCHIVE_PATH}")
 
     state["last_archived_week"] = week_key
-    print(f"Archived weekly data for {week_key} to {helpers.ARCHIVE_PATH}")
 
 
 # ------------------------------------------------------------------ #
 #  Timestamp cleanup (keep only last 15 days)
 # ------------------------------------------------------------------ #
+# Upper bound on stored timestamps per user, so one very chatty poster
+# can't grow the gist without limit inside the 15-day window.
+_MAX_TIMESTAMPS_PER_USER = 1024
+
+
 def cleanup_timestamps(state: dict) -> None:
-    """Prune old timestamps to prevent gist from growing."""
+    """Prune old timestamps to prevent gist from growing.
+
+    Keeps the last 15 days, and at most the newest _MAX_TIMESTAMPS_PER_USER
+    per user.
+    """
     cutoff = (datetime.now(timezone.utc) - timedelta(days=15)).isoformat()
 
-    for pid in list(state.get("post_timestamps", {}).keys()):
-        for uid in list(state["post_timestamps"][pid].keys()):
-            filtered = [
-                ts for ts in state["post_timestamps"][pid][uid]
-                if ts >= cutoff
-            ]
-            if filtered:
-                state["post_timestamps"][pid][uid] = filtered
-            else:
-                del state["post_timestamps"][pid][uid]
-        if not state["post_timestamps"][pid]:
-            del state["post_timestamps"][pid]
+    post_timestamps = state.get("post_timestamps", {})
+    for pid, users in list(post_timestamps.items()):
+        for uid, timestamps in list(users.items()):
+            # Lists are appended in arrival order, so the sort is a cheap
+            # already-sorted pass; then one bisect finds everything to drop.
+            timestamps.sort()
+            if len(timestamps) > _MAX_TIMESTAMPS_PER_USER:
+                del timestamps[:-_MAX_TIMESTAMPS_PER_USER]
+            if timestamps and timestamps[0] >= cutoff:
+                continue  # nothing old enough to prune
+            del timestamps[:bisect_left(timestamps, cutoff)]
+            if not timestamps:
+                del users[uid]
+        if not users:
+            del post_timestamps[pid]
 
 
 # ------------------------------------------------------------------ #
 #  Weekly pace report
 # ------------------------------------------------------------------ #
-def post_pace_report(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def post_pace_report(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                     stats=None) -> None:
     """Post weekly pace comparison: posts/day this week vs last week, split GM/players."""
     group_id = config["group_id"]
     now = now or datetime.now(timezone.utc)
 
     maps = maps or build_topic_maps(config)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
 
     week_ago = now - timedelta(days=7)
     two_weeks_ago = now - timedelta(days=14)
 
+    # Week boundaries are the same for every campaign
+    this_week_start = fmt_date(week_ago)
+    this_week_end = fmt_date(now)
+    last_week_start = fmt_date(two_weeks_ago)
+    last_week_end = fmt_date(week_ago)
+    this_week_num = f"W{now.isocalendar()[1]:02d}"
+    last_week_num = f"W{week_ago.isocalendar()[1]:02d}"
+
     for pid, chat_topic_id in maps.to_chat.items():
         if not helpers.feature_enabled(config, pid, "pace"):
             continue
@@ -4271,8 +4465,8 @@ def post_pace_report(config: dict, state: dict, *, now: datetime | None = None,
             continue
 
         name = maps.to_name.get(pid, "Unknown")
-        topic_timestamps = helpers.get_topic_timestamps(state, pid)
-        gm_ids = helpers.gm_ids_for_campaign(config, pid)
+        topic_timestamps = stats[pid].timestamps
+        gm_ids = stats[pid].gm_ids
 
         if not topic_timestamps:
             continue
@@ -4293,14 +4487,6 @@ def post_pace_report(config: dict, state: dict, *, now: datetime | None = None,
             continue  # No data
         icon = helpers.trend_icon(int(this_avg * 100), int(last_avg * 100))
 
-        this_week_start = fmt_date(week_ago)
-        this_week_end = fmt_date(now)
-        last_week_start = fmt_date(two_weeks_ago)
-        last_week_end = fmt_date(week_ago)
-
-        this_week_num = f"W{now.isocalendar()[1]:02d}"
-        last_week_num = f"W{week_ago.isocalendar()[1]:02d}"
-
         message = (
             f"{icon} Weekly pace for {name}:\n"
             f"\n"
@@ -4336,21 +4522,26 @@ _STREAK_MESSAGES = {
 }
 
 
-def check_streak_milestones(config: dict, state: dict, *, now: datetime | None = None, maps=None, **_kw) -> None:
+def check_streak_milestones(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                            stats=None) -> None:
     """Celebrate when a player crosses a streak milestone (7, 14, 30, 60, 90 days)."""
     group_id = config["group_id"]
     now = now or datetime.now(timezone.utc)
 
     maps = maps or build_topic_maps(config)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
     celebrated = state.setdefault("celebrated_streaks", {})
+    players = state.get("players", {})
 
     for pid, chat_topic_id in maps.to_chat.items():
         name = maps.to_name.get(pid, "Unknown")
-        topic_ts = helpers.get_topic_timestamps(state, pid)
-        gm_ids = helpers.gm_ids_for_campaign(config, pid)
+        topic_ts = stats[pid].timestamps
+        gm_ids = stats[pid].gm_ids
 
         for uid, raw_ts in topic_ts.items():
-            if uid in gm_ids:
+            # A streak of N days needs at least N posts, so most players
+            # are ruled out without computing their streak at all.
+            if len(raw_ts) < _STREAK_MILESTONES[0] or uid in gm_ids:
                 continue
 
             streak = _calc_streak(raw_ts, now)
@@ -4369,7 +4560,7 @@ def check_streak_milestones(config: dict, state: dict, *, now: datetime | None =
             if milestone <= last_celebrated:
                 continue
 
-            player = helpers.get_player(state, pid, uid)
+            player = players.get(key, {})
             player_name = player.get("first_name", "Someone") if player else "Someone"
 
             message = _STREAK_MESSAGES.get(milestone, "🔥 {name} is on a {streak}-day streak in {campaign}!")
@@ -4456,7 +4647,7 @@ def check_message_milestones(config: dict, state: dict, *, now: datetime | None
 
     for pid, name in maps.to_name.items():
         # Count total messages for this campaign
-        counts = state.get("message_counts", {}).get(pid, {})
+        counts = state["message_counts"].get(pid, {})
         campaign_total = sum(counts.values())
         global_total += campaign_total
 
@@ -4504,7 +4695,13 @@ def check_message_milestones(config: dict, state: dict, *, now: datetime | None
 # ------------------------------------------------------------------ #
 #  Campaign Leaderboard (cross-campaign dashboard)
 # ------------------------------------------------------------------ #
-def _gather_leaderboard_stats(config: dict, state: dict, now: datetime) -> tuple[list, dict, list]:
+def _fmt_gap_hours(hours: float | None) -> str:
+    """Format an average gap as '4.2h', or 'N/A' when there is none."""
+    return f"{hours:.1f}h" if hours is not None else "N/A"
+
+
+def _gather_leaderboard_stats(config: dict, state: dict, now: datetime,
+                              maps=None, stats=None) -> tuple[list, dict, list]:
     """Collect per-campaign stats, global player rankings, and top streaks for the leaderboard."""
     seven_days_ago = now - timedelta(days=7)
     three_days_ago = now - timedelta(days=3)
@@ -4514,11 +4711,13 @@ def _gather_leaderboard_stats(config: dict, state: dict, now: datetime) -> tuple
     global_player_posts = {}
     all_streaks = []
 
-    maps = build_topic_maps(config)
+    maps = maps or build_topic_maps(config)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
 
     for pid, name in maps.to_name.items():
-        topic_timestamps = helpers.get_topic_timestamps(state, pid)
-        gm_ids = helpers.gm_ids_for_campaign(config, pid)
+        topic = stats[pid]
+        topic_timestamps = topic.timestamps
+        gm_ids = topic.gm_ids
 
         gm_7d = 0
         player_7d = 0
@@ -4527,14 +4726,27 @@ def _gather_leaderboard_stats(config: dict, state: dict, now: datetime) -> tuple
         player_post_counts = {}
         all_post_times_7d = []
         player_post_times_7d = []
+        last_post_time = None
 
         for uid, timestamps in topic_timestamps.items():
+            if not timestamps:
+                continue
             is_gm = uid in gm_ids
-            player_info = helpers.get_player(state, pid, uid)
+            player_info = topic.by_uid.get(uid, {})
 
-            user_7d_posts = timestamps_in_window(timestamps, seven_days_ago)
-            posts_recent_3d += len(timestamps_in_window(timestamps, three_days_ago))
-            posts_prev_3d += len(timestamps_in_window(timestamps, six_days_ago, three_days_ago))
+            # One pass per user: 7-day window, 3-day trend buckets, latest post
+            user_7d_posts = []
+            for ts in timestamps:
+                dt = helpers.parse_ts(ts)
+                if last_post_time is None or dt > last_post_time:
+                    last_post_time = dt
+                if dt < seven_days_ago:
+                    continue
+                user_7d_posts.append(dt)
+                if dt >= three_days_ago:
+                    posts_recent_3d += 1
+                elif dt >= six_days_ago:
+                    posts_prev_3d += 1
 
             user_sessions = deduplicate_posts(user_7d_posts)
             session_count = len(user_sessions)
@@ -4542,43 +4754,34 @@ def _gather_leaderboard_stats(config: dict, state: dict, now: datetime) -> tuple
             all_post_times_7d.extend(user_sessions)
             if is_gm:
                 gm_7d += session_count
-            else:
-                player_7d += session_count
-                player_post_times_7d.extend(user_sessions)
-                if session_count > 0:
-                    full = helpers.player_full_name(player_info)
-                    player_post_counts.setdefault(uid, {
-                        "full_name": full,
-                        "username": player_info.get("username", ""),
-                        "count": 0,
-                    })
-                    player_post_counts[uid]["count"] += session_count
+                continue
+
+            player_7d += session_count
+            player_post_times_7d.extend(user_sessions)
+            full = helpers.player_full_name(player_info)
+            if session_count > 0:
+                # Each uid appears once per campaign, so no accumulation needed
+                player_post_counts[uid] = {
+                    "full_name": full,
+                    "username": player_info.get("username", ""),
+                    "count": session_count,
+                }
 
             # Collect streak data (players only)
-            if not is_gm:
-                streak = _calc_streak(timestamps, now)
-                if streak >= 2 and player_info:
-                    all_streaks.append({
-                        "name": helpers.player_full_name(player_info),
-                        "streak": streak,
-                        "campaign": name,
-                    })
+            streak = _calc_streak(timestamps, now)
+            if streak >= 2 and player_info:
+                all_streaks.append({
+                    "name": full,
+                    "streak": streak,
+                    "campaign": name,
+                })
 
         total_7d = gm_7d + player_7d
 
-        # Average response gap (all posts)
-        all_post_times_7d.sort()
-        all_avg = helpers.avg_gap_hours(all_post_times_7d)
-        avg_gap_str = f"{all_avg:.1f}h" if all_avg is not None else "N/A"
-
-        # Player-only average gap
-        player_post_times_7d.sort()
+        # Average response gap, all posts and players only
+        avg_gap_str = _fmt_gap_hours(helpers.avg_gap_hours(all_post_times_7d))
         player_avg_gap = helpers.avg_gap_hours(player_post_times_7d)
-        player_avg_gap_str = f"{player_avg_gap:.1f}h" if player_avg_gap is not None else "N/A"
-
-        # Last post across all users
-        all_ts = [ts for tss in topic_timestamps.values() for ts in tss]
-        last_post_time = max((datetime.fromisoformat(ts) for ts in all_ts), default=None) if all_ts else None
+        player_avg_gap_str = _fmt_gap_hours(player_avg_gap)
 
         last_post_str, days_since_last = helpers.fmt_brief_relative(now, last_post_time)
         trend = helpers.trend_icon(posts_recent_3d, posts_prev_3d)
@@ -4590,12 +4793,14 @@ def _gather_leaderboard_stats(config: dict, state: dict, now: datetime) -> tuple
         )
 
         for uid, pdata in player_post_counts.items():
-            entry = global_player_posts.setdefault(uid, {
-                "full_name": pdata["full_name"],
-                "username": pdata.get("username", ""),
-                "count": 0,
-                "campaigns": 0,
-            })
+            entry = global_player_posts.get(uid)
+            if entry is None:
+                entry = global_player_posts[uid] = {
+                    "full_name": pdata["full_name"],
+                    "username": pdata.get("username", ""),
+                    "count": 0,
+                    "campaigns": 0,
+                }
             entry["count"] += pdata["count"]
             entry["campaigns"] += 1
 
@@ -4708,7 +4913,7 @@ def _format_leaderboard(campaign_stats: list, global_player_posts: dict,
 
     # Streak leaderboard
     if streaks:
-        top_streaks = sorted(streaks, key=lambda s: s["streak"], reverse=True)[:5]
+        top_streaks = heapq.nlargest(5, streaks, key=lambda s: s["streak"])
         streak_lines = []
         for i, s in enumerate(top_streaks):
             icon = helpers.rank_icon(i)
@@ -4718,7 +4923,8 @@ def _format_leaderboard(campaign_stats: list, global_player_posts: dict,
     return "\n".join(lines)
 
 
-def post_campaign_leaderboard(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def post_campaign_leaderboard(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                              stats=None) -> None:
     """Post a cross-campaign activity leaderboard to the ISSUES topic."""
     group_id = config["group_id"]
     leaderboard_topic = config.get("leaderboard_topic_id")
@@ -4730,7 +4936,7 @@ def post_campaign_leaderboard(config: dict, state: dict, *, now: datetime | None
     if not helpers.interval_elapsed(state.get("last_leaderboard"), helpers.LEADERBOARD_INTERVAL_DAYS, now):
         return
 
-    campaign_stats, global_player_posts, all_streaks = _gather_leaderboard_stats(config, state, now)
+    campaign_stats, global_player_posts, all_streaks = _gather_leaderboard_stats(config, state, now, maps, stats)
 
     if not campaign_stats:
         print("No campaign data for leaderboard")
@@ -4746,13 +4952,14 @@ def post_campaign_leaderboard(config: dict, state: dict, *, now: datetime | None
 # ------------------------------------------------------------------ #
 #  Recruitment check (campaigns needing players)
 # ------------------------------------------------------------------ #
-def check_recruitment_needs(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def check_recruitment_needs(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                            stats=None) -> None:
     """If a campaign has fewer than helpers.REQUIRED_PLAYERS, post a notice."""
     group_id = config["group_id"]
     now = now or datetime.now(timezone.utc)
 
     maps = maps or build_topic_maps(config)
-    all_campaigns = helpers.players_by_campaign(state)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
 
     for pid, chat_topic_id in maps.to_chat.items():
         name = maps.to_name[pid]
@@ -4765,13 +4972,8 @@ def check_recruitment_needs(config: dict, state: dict, *, now: datetime | None =
             continue
 
         # Count active players (excluding GM)
-        campaign_players = all_campaigns.get(pid, [])
-        active = [
-            helpers.player_mention(p)
-            for p in campaign_players
-        ]
-
-        player_count = len(active)
+        campaign_players = stats[pid].players
+        player_count = len(campaign_players)
         needed = helpers.REQUIRED_PLAYERS - player_count
 
         if needed <= 0:
@@ -4779,7 +4981,8 @@ def check_recruitment_needs(config: dict, state: dict, *, now: datetime | None =
             state["last_recruitment_check"][pid] = now.isoformat()
             continue
 
-        # Build roster display
+        # Build roster display (names only needed when posting)
+        active = [helpers.player_mention(p) for p in campaign_players]
         if active:
             roster_lines = "\n".join(f"- {p}" for p in active)
             roster_section = f"Current roster ({player_count}/{helpers.REQUIRED_PLAYERS}):\n{roster_lines}"
@@ -4811,17 +5014,20 @@ def _health_icon(total_posts_7d: int) -> str:
     return "🔴"
 
 
-def _build_weekly_digest(config: dict, state: dict, now: datetime) -> str:
+def _build_weekly_digest(config: dict, state: dict, now: datetime, maps=None,
+                         stats=None) -> str:
     """Build a compact one-line-per-campaign weekly digest."""
-    maps = build_topic_maps(config)
+    maps = maps or build_topic_maps(config)
+    stats = stats or helpers.build_topic_stats(config, state, maps)
     week_ago = now - timedelta(days=7)
 
     campaign_lines = []
-    all_campaigns = helpers.players_by_campaign(state)
+    combats = state.get("combat", {})
 
     for pid, name in maps.to_name.items():
-        topic_ts = helpers.get_topic_timestamps(state, pid)
-        gm_ids = helpers.gm_ids_for_campaign(config, pid)
+        topic = stats[pid]
+        topic_ts = topic.timestamps
+        gm_ids = topic.gm_ids
         pace = helpers.pace_split(topic_ts, gm_ids, now)
         total = pace["gm_this"] + pace["player_this"]
         total_last = pace["gm_last"] + pace["player_last"]
@@ -4833,9 +5039,9 @@ def _build_weekly_digest(config: dict, state: dict, now: datetime) -> str:
         for uid, timestamps in topic_ts.items():
             if uid in gm_ids:
                 continue
-            count = len(timestamps_in_window(timestamps, week_ago))
+            count = helpers.count_in_window(timestamps, week_ago)
             if count > 0:
-                player = helpers.get_player(state, pid, uid)
+                player = topic.by_uid.get(uid)
                 name_str = player.get("first_name", "?") if player else "?"
                 player_week_counts[name_str] = count
 
@@ -4844,11 +5050,10 @@ def _build_weekly_digest(config: dict, state: dict, now: datetime) -> str:
             top_name = max(player_week_counts, key=player_week_counts.get)
 
         # Party size
-        players = all_campaigns.get(pid, [])
-        party = f"{len(players)}/{helpers.REQUIRED_PLAYERS}"
+        party = f"{len(topic.players)}/{helpers.REQUIRED_PLAYERS}"
 
         # Combat?
-        combat = state.get("combat", {}).get(pid, {})
+        combat = combats.get(pid, {})
         combat_str = " ⚔️" if combat.get("active") else ""
 
         line = f"{health} {name}: {posts_str(total)} {trend} ({party}){combat_str}"
@@ -4869,7 +5074,8 @@ def _build_weekly_digest(config: dict, state: dict, now: datetime) -> str:
     return f"{header}\n\n{body}{legend}"
 
 
-def post_weekly_digest(config: dict, state: dict, *, now: datetime | None = None, **_kw) -> None:
+def post_weekly_digest(config: dict, state: dict, *, now: datetime | None = None, maps=None,
+                       stats=None) -> None:
     """Post a compact weekly digest to the leaderboard topic."""
     group_id = config["group_id"]
     leaderboard_topic = config.get("leaderboard_topic_id")
@@ -4882,7 +5088,7 @@ def post_weekly_digest(config: dict, state: dict, *, now: datetime | None = None
     if not helpers.interval_elapsed(state.get("last_weekly_digest"), 7, now):
         return
 
-    message = _build_weekly_digest(config, state, now)
+    message = _build_weekly_digest(config, state, now, maps, stats)
 
     print(f"Posting weekly digest")
     if tg.send_message(group_id, leaderboard_topic, message):
@@ -4892,7 +5098,7 @@ def post_weekly_digest(config: dict, state: dict, *, now: datetime | None = None
 # ------------------------------------------------------------------ #
 #  Smart alerts: pace drop & conversation dying
 # ------------------------------------------------------------------ #
-def check_pace_drop(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def check_pace_drop(config: dict, state: dict, *, now: datetime | None = None, maps=None, **_kw) -> None:
     """Alert when a campaign's weekly posts drop >40% vs the previous week.
 
     Checks once per week (tied to archive cadence). Sends a gentle nudge
@@ -4955,7 +5161,7 @@ def check_pace_drop(config: dict, state: dict, *, now: datetime | None = None, m
         print("Pace drop check: no significant drops detected")
 
 
-def check_conversation_dying(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def check_conversation_dying(config: dict, state: dict, *, now: datetime | None = None, maps=None, **_kw) -> None:
     """Warn when ALL participants (including GM) are silent for 48h+.
 
     Distinct from the 4-hour nudge (which just prompts the next post) — this
@@ -5021,7 +5227,7 @@ def check_conversation_dying(config: dict, state: dict, *, now: datetime | None
                 del state["dying_alerts_sent"][pid]
 
 
-def check_expired_timers(config: dict, state: dict, *, now: datetime | None = None, maps=None) -> None:
+def check_expired_timers(config: dict, state: dict, *, now: datetime | None = None, maps=None, **_kw) -> None:
     """Check for expired timers and post notifications."""
     if not maps:
         maps = build_topic_maps(config)
@@ -5057,6 +5263,7 @@ def _run_checks(config: dict, bot_state: dict) -> None:
     """Run all scheduled checks, isolating failures so one crash doesn't block others."""
     now = datetime.now(timezone.utc)
     maps = build_topic_maps(config)
+    stats = helpers.build_topic_stats(config, bot_state, maps)
 
     checks = [
         ("Topic alerts", check_and_alert),
@@ -5080,11 +5287,53 @@ def _run_checks(config: dict, bot_state: dict) -> None:
     ]
     for label, func in checks:
         try:
-            func(config, bot_state, now=now, maps=maps)
+            func(config, bot_state, now=now, maps=maps, stats=stats)
         except Exception as e:
             print(f"Error in {label}: {e}")
 
 
+_UPDATES_BATCH_SIZE = 100  # Telegram's getUpdates limit
+_LONG_POLL_SECONDS = 50
+
+
+def _drain_updates(config: dict, state: dict) -> None:
+    """Fetch and process queued updates until the backlog is empty.
+
+    getUpdates returns at most 100 updates per call, so after an outage the
+    queue is worked through in full batches within this run.
+    """
+    total = 0
+    while True:
+        updates = tg.get_updates(state.get("offset", 0))
+        if not updates:
+            break
+        state["offset"] = process_updates(updates, config, state)
+        total += len(updates)
+        if len(updates) < _UPDATES_BATCH_SIZE:
+            break
+    print(f"Received {total} new updates")
+
+
+def _listen_for_updates(config: dict, state: dict, deadline: datetime) -> None:
+    """Long-poll for updates until deadline, saving state after each batch.
+
+    Lets the hourly job answer commands and boon picks within seconds instead
+    of at the next cron tick. Scheduled checks still only run once per job.
+    """
+    print(f"Listening for updates until {deadline.strftime('%H:%M')} UTC")
+    while True:
+        remaining = int((deadline - datetime.now(timezone.utc)).total_seconds())
+        if remaining <= 0:
+            break
+        updates = tg.get_updates(state.get("offset", 0), timeout=min(_LONG_POLL_SECONDS, remaining))
+        if not updates:
+            time.sleep(1)  # Don't spin if getUpdates is failing fast
+            continue
+        print(f"Received {len(updates)} new updates")
+        state["offset"] = process_updates(updates, config, state)
+        state_store.save(state)
+
+
 def main() -> None:
     """Entry point: load config/state, process updates, run all scheduled checks, save."""
     telegram_token = os.environ.get("TELEGRAM_BOT_TOKEN", "")
@@ -5115,13 +5364,10 @@ def main() -> None:
     print(f"Tracking {len(bot_state.get('topics', {}))} topics, "
           f"{len(bot_state.get('players', {}))} players")
 
-    # Fetch and process new messages
-    offset = bot_state.get("offset", 0)
-    updates = tg.get_updates(offset)
-    print(f"Received {len(updates)} new updates")
+    now = datetime.now(timezone.utc)
 
-    if updates:
-        bot_state["offset"] = process_updates(updates, config, bot_state)
+    # Fetch and process new messages
+    _drain_updates(config, bot_state)
 
     # Run all scheduled checks (error-isolated)
     _run_checks(config, bot_state)
@@ -5137,6 +5383,10 @@ def main() -> None:
 
     # Always save state, even if checks failed
     state_store.save(bot_state)
+
+    if helpers.LISTEN_MINUTES > 0:
+        deadline = now + timedelta(minutes=helpers.LISTEN_MINUTES)
+        _listen_for_updates(config, bot_state, deadline)
     print("Done")
 
 
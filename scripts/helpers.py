@@ -2,8 +2,11 @@
 
 import json
 import re
-from datetime import datetime, timedelta
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 
 # ------------------------------------------------------------------ #
 #  Paths
@@ -26,6 +29,7 @@ COMBAT_PING_HOURS = 4
 RECRUITMENT_INTERVAL_DAYS = 14
 REQUIRED_PLAYERS = 6
 POST_SESSION_MINUTES = 10
+LISTEN_MINUTES = 0
 
 MECHANICAL_BOONS = [
     "+1 circumstance bonus on your next skill check.",
@@ -50,6 +54,25 @@ def load_config() -> dict:
         return json.load(f)
 
 
+_FALLBACK_BOONS = ["Something mildly beneficial happens to you today."]
+_boons_cache = (None, None)  # (path, boons list)
+
+
+def load_boons() -> list[str]:
+    """Load the flavour boon list from boons.json. Cached per path for the run."""
+    global _boons_cache
+    if _boons_cache[0] == BOONS_PATH:
+        return _boons_cache[1]
+    try:
+        with open(BOONS_PATH) as f:
+            boons = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not load boons: {e}")
+        boons = list(_FALLBACK_BOONS)
+    _boons_cache = (BOONS_PATH, boons)
+    return boons
+
+
 _SETTINGS_MAP = {
     "player_warn_weeks": "PLAYER_WARN_WEEKS",
     "player_remove_weeks": "PLAYER_REMOVE_WEEKS",
@@ -62,6 +85,7 @@ _SETTINGS_MAP = {
     "recruitment_interval_days": "RECRUITMENT_INTERVAL_DAYS",
     "required_players": "REQUIRED_PLAYERS",
     "post_session_minutes": "POST_SESSION_MINUTES",
+    "listen_minutes": "LISTEN_MINUTES",
 }
 
 
@@ -84,8 +108,13 @@ def pace_split(topic_ts: dict[str, list[str]], gm_ids: set[str],
     two_weeks_ago = now - timedelta(days=14)
     gm_this = gm_last = player_this = player_last = 0
     for uid, timestamps in topic_ts.items():
-        this_count = len(timestamps_in_window(timestamps, week_ago))
-        last_count = len(timestamps_in_window(timestamps, two_weeks_ago, week_ago))
+        this_count = last_count = 0
+        for ts in timestamps:
+            dt = parse_ts(ts)
+            if dt >= week_ago:
+                this_count += 1
+            elif dt >= two_weeks_ago:
+                last_count += 1
         if uid in gm_ids:
             gm_this += this_count
             gm_last += last_count
@@ -178,39 +207,74 @@ def validate_config(config: dict) -> list[str]:
     return issues
 
 
-def gm_id_set(config: dict) -> set:
-    """Return global GM user IDs as a set of strings."""
-    return set(str(uid) for uid in config.get("gm_user_ids", []))
+def gm_id_set(config: dict) -> frozenset:
+    """Return global GM user IDs as a frozenset of strings."""
+    return frozenset(str(uid) for uid in config.get("gm_user_ids", []))
+
+
+_gm_ids_cache = (None, {}, frozenset())  # (config, {topic_id: frozenset}, global)
 
 
-def gm_ids_for_campaign(config: dict, pid: str) -> set:
+def gm_ids_for_campaign(config: dict, pid: str) -> frozenset:
     """Return GM IDs for a specific campaign.
 
     If the campaign's topic_pair has its own ``gm_user_ids``, use that
     (replacing the global list). Otherwise fall back to the global list.
+    The table for every topic ID is built in one pass over topic_pairs and
+    cached per config object, since config does not change during a run.
     """
-    for pair in config.get("topic_pairs", []):
-        all_ids = [str(pair.get("chat_topic_id", ""))] + [str(x) for x in pair.get("pbp_topic_ids", [])]
-        if pid in all_ids:
+    global _gm_ids_cache
+    if _gm_ids_cache[0] is not config:
+        global_ids = gm_id_set(config)
+        table = {}
+        for pair in config.get("topic_pairs", []):
             if "gm_user_ids" in pair:
-                return set(str(uid) for uid in pair["gm_user_ids"])
-            break
-    return gm_id_set(config)
+                ids = frozenset(str(uid) for uid in pair["gm_user_ids"])
+            else:
+                ids = global_ids
+            # First matching pair wins, as topic IDs are looked up in order
+            table.setdefault(str(pair.get("chat_topic_id", "")), ids)
+            for tid in pair.get("pbp_topic_ids", []):
+                table.setdefault(str(tid), ids)
+        _gm_ids_cache = (config, table, global_ids)
+    return _gm_ids_cache[1].get(pid, _gm_ids_cache[2])
+
+
+_disabled_features_cache = (None, {})  # (config, {pid: frozenset})
 
 
 def feature_enabled(config: dict, pid: str, feature: str) -> bool:
-    """Return True unless the campaign has this feature in its disabled_features list."""
-    for pair in config.get("topic_pairs", []):
-        if str(pair["pbp_topic_ids"][0]) == pid:
-            return feature not in pair.get("disabled_features", [])
-    return True
+    """Return True unless the campaign has this feature in its disabled_features list.
+
+    The per-campaign disabled sets are built once per config object, so
+    checks inside per-campaign loops don't rescan topic_pairs each time.
+    """
+    global _disabled_features_cache
+    if _disabled_features_cache[0] is not config:
+        table = {}
+        for pair in config.get("topic_pairs", []):
+            table.setdefault(str(pair["pbp_topic_ids"][0]),
+                             frozenset(pair.get("disabled_features", [])))
+        _disabled_features_cache = (config, table)
+    disabled = _disabled_features_cache[1].get(pid)
+    return disabled is None or feature not in disabled
 
 
 def interval_elapsed(last_iso: str | None, interval_days: float, now: datetime) -> bool:
     """Return True if enough time has passed since last_iso, or if last_iso is None."""
     if not last_iso:
         return True
-    return days_since(now, datetime.fromisoformat(last_iso)) >= interval_days
+    return days_since(now, parse_ts(last_iso)) >= interval_days
+
+
+@lru_cache(maxsize=None)
+def parse_ts(ts: str) -> datetime:
+    """Parse an ISO timestamp string, memoised for the run.
+
+    The same post timestamps are parsed by most scheduled checks; datetimes
+    are immutable, so sharing one parsed object per string is safe.
+    """
+    return datetime.fromisoformat(ts)
 
 
 def timestamps_in_window(raw_timestamps: list[str], after: datetime,
@@ -219,21 +283,41 @@ def timestamps_in_window(raw_timestamps: list[str], after: datetime,
 
     Returns datetimes where: after <= dt (and dt < before, if given).
     """
-    results = []
-    for ts in raw_timestamps:
-        dt = datetime.fromisoformat(ts)
-        if dt >= after and (before is None or dt < before):
-            results.append(dt)
-    return results
+    if before is None:
+        return [dt for dt in map(parse_ts, raw_timestamps) if dt >= after]
+    return [dt for dt in map(parse_ts, raw_timestamps) if after <= dt < before]
+
 
+def count_in_window(raw_timestamps: list[str], after: datetime,
+                    before: datetime | None = None) -> int:
+    """Count ISO timestamps within the window, like len(timestamps_in_window(...))."""
+    if before is None:
+        return sum(1 for ts in raw_timestamps if parse_ts(ts) >= after)
+    return sum(1 for ts in raw_timestamps if after <= parse_ts(ts) < before)
 
-def avg_gap_hours(sorted_times: list[datetime]) -> float | None:
-    """Return average gap in hours between sorted datetimes, or None if < 2 entries."""
-    if len(sorted_times) < 2:
+
+def bucket_counts(raw_timestamps: list[str], edges: list[datetime]) -> list[int]:
+    """Count ISO timestamps per bucket [edges[i], edges[i+1]).
+
+    ``edges`` must be ascending; timestamps outside [edges[0], edges[-1]) are ignored.
+    The timestamps are sorted once (near-linear, as they're appended in order)
+    and each edge is then a single binary search.
+    """
+    times = sorted(map(parse_ts, raw_timestamps))
+    idxs = [bisect_left(times, edge) for edge in edges]
+    return [idxs[i + 1] - idxs[i] for i in range(len(edges) - 1)]
+
+
+def avg_gap_hours(times: list[datetime]) -> float | None:
+    """Return average gap in hours between consecutive datetimes, or None if < 2 entries.
+
+    Input order doesn't matter: the consecutive gaps of the sorted times
+    telescope to latest - earliest, so no sort is needed.
+    """
+    if len(times) < 2:
         return None
-    gaps = [(sorted_times[i] - sorted_times[i - 1]).total_seconds() / 3600
-            for i in range(1, len(sorted_times))]
-    return sum(gaps) / len(gaps)
+    span = (max(times) - min(times)).total_seconds() / 3600
+    return span / (len(times) - 1)
 
 
 def fmt_brief_relative(now: datetime, then: datetime | None) -> tuple[str, float]:
@@ -254,18 +338,19 @@ def fmt_brief_relative(now: datetime, then: datetime | None) -> tuple[str, float
         return f"{int(d)}d ago", d
 
 
+TREND_UP_RATIO = 1.15    # recent above previous * this counts as rising
+TREND_DOWN_RATIO = 0.85  # recent below previous * this counts as falling
+
+
 def trend_icon(recent: int, previous: int) -> str:
     """Return trend emoji comparing recent vs previous period post counts."""
-    if previous == 0 and recent == 0:
-        return "💤"
-    elif previous == 0:
-        return "🆕"
-    elif recent > previous * 1.15:
+    if not previous:
+        return "🆕" if recent else "💤"
+    if recent > previous * TREND_UP_RATIO:
         return "📈"
-    elif recent < previous * 0.85:
+    if recent < previous * TREND_DOWN_RATIO:
         return "📉"
-    else:
-        return "➡️"
+    return "➡️"
 
 
 def players_by_campaign(state: dict) -> dict:
@@ -300,12 +385,28 @@ def rank_icon(index: int) -> str:
 # ------------------------------------------------------------------ #
 def fmt_date(dt: datetime) -> str:
     """Format a datetime as YYYY-MM-DD (Wn)."""
-    _, week, _ = dt.isocalendar()
-    return f"{dt.strftime('%Y-%m-%d')} (W{week})"
+    return _fmt_day(dt.date())
+
+
+@lru_cache(maxsize=512)
+def _fmt_day(day: date) -> str:
+    """Memoised body of fmt_date, keyed on the calendar day.
+
+    Keyed on the date rather than the datetime: reporters format many
+    different times that fall on the same few days.
+    """
+    _, week, _ = day.isocalendar()
+    return f"{day.isoformat()} (W{week})"
 
 
 def html_escape(text: str) -> str:
-    """Escape HTML special characters for Telegram HTML parse mode."""
+    """Escape HTML special characters for Telegram HTML parse mode.
+
+    Clean strings (the common case) are returned as-is after three substring
+    checks, which beat both the replace chain and a set-intersection test.
+    """
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
     return (
         text.replace("&", "&amp;")
         .replace("<", "&lt;")
@@ -372,20 +473,27 @@ def deduplicate_posts(timestamps: list[datetime]) -> list[datetime]:
 
     Returns the timestamp of the first post in each session.
     """
-    if not timestamps:
-        return []
+    if len(timestamps) < 2:
+        return list(timestamps)
+    window = timedelta(minutes=POST_SESSION_MINUTES)
     sorted_ts = sorted(timestamps)
-    sessions = [sorted_ts[0]]
-    for ts in sorted_ts[1:]:
-        if (ts - sessions[-1]).total_seconds() > POST_SESSION_MINUTES * 60:
+    session_start = sorted_ts[0]
+    sessions = [session_start]
+    for ts in sorted_ts:
+        if ts - session_start > window:
+            session_start = ts
             sessions.append(ts)
     return sessions
 
 
 def calc_avg_gap_str(timestamps_iso: list[str]) -> str:
     """Calculate deduped average gap from ISO timestamp strings. Returns formatted string."""
-    all_posts = sorted(datetime.fromisoformat(ts) for ts in timestamps_iso)
-    sessions = deduplicate_posts(all_posts)
+    all_posts = sorted(parse_ts(ts) for ts in timestamps_iso)
+    return fmt_avg_gap(deduplicate_posts(all_posts))
+
+
+def fmt_avg_gap(sessions: list[datetime]) -> str:
+    """Format the average gap between already-deduplicated posting sessions."""
     avg = avg_gap_hours(sessions)
     if avg is None:
         return "N/A"
@@ -398,23 +506,27 @@ def calc_avg_gap_str(timestamps_iso: list[str]) -> str:
 #  Topic mapping (multi-topic campaign support)
 # ------------------------------------------------------------------ #
 class TopicMaps:
-    """Lookup container for campaign topic ID mappings."""
+    """Lookup container for campaign topic ID mappings.
+
+    Built once per config and shared by every caller, so the mappings are
+    exposed read-only.
+    """
     __slots__ = ("to_canonical", "to_chat", "to_name", "all_pbp_ids")
 
     def __init__(self, to_canonical, to_chat, to_name, all_pbp_ids):
         self.to_canonical = to_canonical  # any pbp_topic_id (str) -> canonical pid
         self.to_chat = to_chat            # canonical pid -> chat_topic_id
         self.to_name = to_name            # canonical pid -> campaign name
-        self.all_pbp_ids = all_pbp_ids    # set of all pbp topic id strings
+        self.all_pbp_ids = all_pbp_ids    # frozenset of all pbp topic id strings
 
 
-_topic_maps_cache = (None, None)  # (config_id, TopicMaps)
+_topic_maps_cache = (None, None)  # (config, TopicMaps)
 
 
 def build_topic_maps(config: dict) -> TopicMaps:
     """Build lookup dicts from config's topic_pairs. Cached per config object."""
     global _topic_maps_cache
-    if _topic_maps_cache[0] == id(config):
+    if _topic_maps_cache[0] is config:
         return _topic_maps_cache[1]
 
     to_canonical = {}
@@ -430,11 +542,50 @@ def build_topic_maps(config: dict) -> TopicMaps:
             tid_str = str(tid)
             to_canonical[tid_str] = canonical
             all_pbp_ids.add(tid_str)
-    result = TopicMaps(to_canonical, to_chat, to_name, all_pbp_ids)
-    _topic_maps_cache = (id(config), result)
+    result = TopicMaps(MappingProxyType(to_canonical), MappingProxyType(to_chat),
+                       MappingProxyType(to_name), frozenset(all_pbp_ids))
+    _topic_maps_cache = (config, result)
     return result
 
 
+class TopicStats:
+    """Per-campaign aggregates shared by the scheduled checks within one run."""
+    __slots__ = ("players", "by_uid", "gm_ids", "timestamps", "last_message_time")
+
+    def __init__(self, players, by_uid, gm_ids, timestamps, last_message_time):
+        self.players = players                      # [player_dict, ...] active in this campaign
+        self.by_uid = by_uid                        # {uid: player_dict}, as get_player() would find
+        self.gm_ids = gm_ids                        # frozenset of GM user id strings
+        self.timestamps = timestamps                # {uid: [iso_str, ...]}
+        self.last_message_time = last_message_time  # datetime of last PBP post, or None
+
+
+def build_topic_stats(config: dict, state: dict, maps: TopicMaps | None = None) -> dict[str, TopicStats]:
+    """Walk state once and return {canonical pid: TopicStats} for every configured campaign."""
+    maps = maps or build_topic_maps(config)
+    # One pass over the flat "pid:uid" player table builds both per-campaign
+    # views: the player list (as players_by_campaign) and the uid index.
+    campaigns = {}
+    by_uid = {}
+    for player_key, player in state.get("players", {}).items():
+        campaigns.setdefault(player["pbp_topic_id"], []).append(player)
+        key_pid, _, uid = player_key.partition(":")
+        by_uid.setdefault(key_pid, {})[uid] = player
+    topics = state.get("topics", {})
+    stats = {}
+    for pid in maps.to_chat:
+        topic_state = topics.get(pid)
+        last_time = parse_ts(topic_state["last_message_time"]) if topic_state else None
+        stats[pid] = TopicStats(
+            campaigns.get(pid, []),
+            by_uid.get(pid, {}),
+            gm_ids_for_campaign(config, pid),
+            get_topic_timestamps(state, pid),
+            last_time,
+        )
+    return stats
+
+
 def get_characters(config: dict, pid: str) -> dict:
     """Return {user_id_str: character_name} for a campaign, or empty dict."""
     for pair in config.get("topic_pairs", []):
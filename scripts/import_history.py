@@ -47,13 +47,13 @@ def build_thread_map(config: dict) -> dict:
 
 
 def build_gm_map(config: dict) -> dict:
-    """Map campaign name → set of GM user ID strings."""
-    global_gms = set(str(uid) for uid in config.get("gm_user_ids", []))
+    """Map campaign name → frozenset of GM user ID strings."""
+    global_gms = frozenset(str(uid) for uid in config.get("gm_user_ids", []))
     gm_map = {}
     for pair in config.get("topic_pairs", []):
         name = pair["name"]
         if "gm_user_ids" in pair:
-            gm_map[name] = set(str(uid) for uid in pair["gm_user_ids"])
+            gm_map[name] = frozenset(str(uid) for uid in pair["gm_user_ids"])
         else:
             gm_map[name] = global_gms
     return gm_map
@@ -221,7 +221,7 @@ def import_messages(export_path: str, *, dry_run: bool = False) -> dict:
     for campaign_name, msgs in sorted(pbp_messages.items()):
         dir_name = sanitize_dirname(campaign_name)
         campaign_dir = LOGS_DIR / dir_name
-        gm_ids = gm_map.get(campaign_name, set())
+        gm_ids = gm_map.get(campaign_name, frozenset())
 
         if not dry_run:
             campaign_dir.mkdir(parents=True, exist_ok=True)
@@ -1,11 +1,23 @@
 """Gist-based state persistence."""
 
 import json
+import sys
 import requests
 
 GIST_TOKEN = ""
 GIST_API = ""
 STATE_FILENAME = "pbp_state.json"
+TIMELINE_FILENAME = "pbp_timeline.json"
+
+# State keys stored in their own gist file. Most of the main state (offset,
+# topics, message and activity counts) changes with every post as well, so a
+# run with new messages uploads both files. The split helps quiet runs: when
+# cleanup only prunes old timestamps, the main file is not re-uploaded.
+# Timestamps are UTC ISO-8601 strings; cleanup_timestamps bisects on their order.
+_TIMELINE_KEYS = ("post_timestamps",)
+
+# Gist file contents as last loaded/saved, used to upload only changed files.
+_remote_content: dict[str, str] = {}
 
 DEFAULT_STATE = {
     "offset": 0,
@@ -61,22 +73,72 @@ def load() -> dict:
 
     if STATE_FILENAME in files:
         content = files[STATE_FILENAME]["content"]
+        _remote_content[STATE_FILENAME] = content
         state = json.loads(content)
+        if TIMELINE_FILENAME in files:
+            timeline_content = files[TIMELINE_FILENAME]["content"]
+            _remote_content[TIMELINE_FILENAME] = timeline_content
+            state.update(json.loads(timeline_content))
         # Backwards compat: ensure all keys exist
         for key, default in DEFAULT_STATE.items():
             if key not in state:
                 state[key] = default
+        _intern_player_fields(state)
         return state
 
     return dict(DEFAULT_STATE)
 
 
+# Player fields repeated across every record of a campaign. json.loads
+# only shares key strings, so values are interned to keep one copy each.
+_INTERNED_PLAYER_FIELDS = ("campaign_name", "pbp_topic_id", "username")
+
+
+def _intern_player_fields(state: dict) -> None:
+    """Intern repeated string fields in player and removed-player records."""
+    for section in ("players", "removed_players"):
+        for record in state.get(section, {}).values():
+            for field in _INTERNED_PLAYER_FIELDS:
+                value = record.get(field)
+                if isinstance(value, str):
+                    record[field] = sys.intern(value)
+
+
+def _serialize(state: dict) -> dict[str, str]:
+    """Split state into {gist_filename: json_content}.
+
+    Keys starting with an underscore are per-run indices and never persisted.
+    """
+    main = {k: v for k, v in state.items()
+            if k not in _TIMELINE_KEYS and not k.startswith("_")}
+    timeline = {k: state.get(k, {}) for k in _TIMELINE_KEYS}
+    # The timeline is written compact: json only uses its C encoder when
+    # indent is None, and this file is the largest and least hand-read.
+    return {
+        STATE_FILENAME: json.dumps(main, indent=2),
+        TIMELINE_FILENAME: json.dumps(timeline, separators=(",", ":")),
+    }
+
+
+def changed_files(state: dict) -> dict[str, str]:
+    """Return only the serialized gist files whose content differs from the remote copy."""
+    return {
+        name: content for name, content in _serialize(state).items()
+        if _remote_content.get(name) != content
+    }
+
+
 def save(state: dict) -> None:
     """Persist bot state to GitHub Gist."""
     if not GIST_API or not GIST_TOKEN:
         print("Warning: No GIST_ID or GIST_TOKEN set, cannot save state")
         return
 
+    files = changed_files(state)
+    if not files:
+        print("State unchanged, skipping gist save")
+        return
+
     try:
         resp = requests.patch(
             GIST_API,
@@ -86,9 +148,7 @@ def save(state: dict) -> None:
             },
             json={
                 "files": {
-                    STATE_FILENAME: {
-                        "content": json.dumps(state, indent=2)
-                    }
+                    name: {"content": content} for name, content in files.items()
                 }
             },
             timeout=30,
@@ -98,6 +158,7 @@ def save(state: dict) -> None:
         return
 
     if resp.status_code == 200:
-        print("State saved to gist")
+        _remote_content.update(files)
+        print(f"State saved to gist ({', '.join(sorted(files))})")
     else:
         print(f"Warning: Failed to save state (HTTP {resp.status_code})")
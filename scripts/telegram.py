@@ -1,10 +1,15 @@
 """Telegram Bot API helpers."""
 
 import json
+import time
 import requests
 
 TELEGRAM_API = ""
 
+# One pooled connection for the whole run: every call after the first reuses
+# the open TLS socket instead of paying a fresh handshake per request.
+_session = requests.Session()
+
 
 def init(token: str) -> None:
     """Set the API base URL from bot token."""
@@ -12,10 +17,25 @@ def init(token: str) -> None:
     TELEGRAM_API = f"https://api.telegram.org/bot{token}"
 
 
+# Longest flood-control wait (seconds) honoured before giving up on a call.
+_MAX_RETRY_AFTER = 30
+
+
 def _post(method: str, payload: dict, label: str = "request") -> dict | None:
-    """POST to Telegram API, return parsed result on success or None on failure."""
+    """POST to Telegram API, return parsed result on success or None on failure.
+
+    Calls are sent one at a time: every bot message goes to the same group
+    chat, which Telegram rate-limits per chat, so concurrent sends would only
+    trip flood control. A 429 is retried once after the requested wait.
+    """
     try:
-        resp = requests.post(f"{TELEGRAM_API}/{method}", json=payload, timeout=30)
+        resp = _session.post(f"{TELEGRAM_API}/{method}", json=payload, timeout=30)
+        if resp.status_code == 429:
+            retry_after = _retry_after(resp)
+            if retry_after is not None and retry_after <= _MAX_RETRY_AFTER:
+                print(f"Telegram {label} rate limited, retrying in {retry_after}s")
+                time.sleep(retry_after)
+                resp = _session.post(f"{TELEGRAM_API}/{method}", json=payload, timeout=30)
         if resp.status_code == 200:
             data = resp.json()
             if data.get("ok"):
@@ -26,18 +46,30 @@ def _post(method: str, payload: dict, label: str = "request") -> dict | None:
     return None
 
 
-def get_updates(offset: int) -> list:
-    """Fetch new messages and callbacks from Telegram Bot API."""
+def _retry_after(resp) -> int | None:
+    """Return the flood-control wait from a 429 response, or None if absent."""
+    try:
+        return int(resp.json()["parameters"]["retry_after"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def get_updates(offset: int, timeout: int = 5) -> list:
+    """Fetch new messages and callbacks from Telegram Bot API.
+
+    ``timeout`` is the long-poll wait in seconds: Telegram holds the request
+    open until an update arrives or the timeout passes.
+    """
     try:
-        resp = requests.get(
+        resp = _session.get(
             f"{TELEGRAM_API}/getUpdates",
             params={
                 "offset": offset,
                 "limit": 100,
-                "timeout": 5,
+                "timeout": timeout,
                 "allowed_updates": json.dumps(["message", "callback_query"]),
             },
-            timeout=30,
+            timeout=timeout + 25,
         )
     except requests.RequestException as e:
         print(f"Error fetching updates: {e}")
@@ -145,6 +145,11 @@ def test_format_boon_result_html_escapes():
     assert "Test &amp; Win" in result
 
 
+def test_render_boon_block_layout():
+    block = checker._render_boon_block(["A", "B"], 0)
+    assert block == "\n1. A ✓\n\n<s>2. B</s>\n"
+
+
 def test_roster_user_stats():
     now = _utc(2026, 2, 20, 12, 0)
     # 4 posts: now, 6h ago, 2d ago, 10d ago
@@ -162,6 +167,15 @@ def test_roster_user_stats():
     assert "today" in stats["last_post_str"]
 
 
+def test_roster_user_stats_dormant_player():
+    now = _utc(2026, 2, 20, 12, 0)
+    timestamps = [(now - timedelta(days=20)).isoformat()]
+    stats = checker._roster_user_stats(timestamps, 1, now)
+    assert stats["sessions"] == 1
+    assert stats["week_count"] == 0
+    assert stats["avg_gap_str"] == "N/A"
+
+
 def test_roster_block():
     stats = {
         "total": 15,
@@ -187,7 +201,32 @@ def test_roster_block_no_username():
     assert "1 posting session." in block  # Singular
 
 
-def test_gather_potw_candidates():
+def test_post_roster_summary_posts_every_due_campaign():
+    _reset()
+    now = _utc(2026, 2, 20, 12, 0)
+    config = _make_config(pairs=[
+        {"name": "First", "chat_topic_id": 200, "pbp_topic_ids": [100]},
+        {"name": "Second", "chat_topic_id": 201, "pbp_topic_ids": [101]},
+    ])
+    state = _make_state()
+    for pid, name in (("100", "First"), ("101", "Second")):
+        state["players"][f"{pid}:42"] = {
+            "user_id": "42", "first_name": "Alice", "last_name": "",
+            "username": "", "campaign_name": name,
+            "pbp_topic_id": pid, "last_post_time": now.isoformat(),
+            "last_warned_week": 0,
+        }
+        state["message_counts"][pid] = {"42": 3}
+        state["post_timestamps"][pid] = {
+            "42": [(now - timedelta(hours=h)).isoformat() for h in (1, 5, 9)],
+        }
+
+    checker.post_roster_summary(config, state, now=now)
+    roster_msgs = [m for m in _sent_messages if m["text"].startswith("Party roster")]
+    assert [m["topic_id"] for m in roster_msgs] == [200, 201]
+
+
+def test_pick_potw_winner():
     now = _utc(2026, 2, 20, 12, 0)
     week_ago = now - timedelta(days=7)
     # Player with 6 sessions this week
@@ -201,14 +240,14 @@ def test_gather_potw_candidates():
         "pbp_topic_id": "100", "user_id": "player1", "campaign_name": "Test",
         "last_post_time": now.isoformat(), "last_warned_week": 0,
     }
-    candidates = checker._gather_potw_candidates(timestamps, {"gm999"}, week_ago, "100", state)
-    assert len(candidates) == 1
-    assert candidates[0]["user_id"] == "player1"
-    assert candidates[0]["first_name"] == "Alice"
-    assert candidates[0]["avg_gap_hours"] > 0
+    winner = checker._pick_potw_winner(timestamps, {"gm999"}, week_ago, "100", state)
+    assert winner["user_id"] == "player1"
+    assert winner["first_name"] == "Alice"
+    assert winner["post_count"] == 6
+    assert winner["avg_gap_hours"] > 0
 
 
-def test_gather_potw_excludes_low_posts():
+def test_pick_potw_winner_excludes_low_posts():
     now = _utc(2026, 2, 20, 12, 0)
     week_ago = now - timedelta(days=7)
     # Only 2 posts (below default POTW_MIN_POSTS of 5)
@@ -221,8 +260,38 @@ def test_gather_potw_excludes_low_posts():
         "pbp_topic_id": "100", "user_id": "player1", "campaign_name": "Test",
         "last_post_time": now.isoformat(), "last_warned_week": 0,
     }
-    candidates = checker._gather_potw_candidates(timestamps, set(), week_ago, "100", state)
-    assert len(candidates) == 0
+    assert checker._pick_potw_winner(timestamps, set(), week_ago, "100", state) is None
+
+
+def test_pick_potw_winner_smallest_gap():
+    now = _utc(2026, 2, 20, 12, 0)
+    week_ago = now - timedelta(days=7)
+    timestamps = {
+        "slow": [(now - timedelta(hours=h)).isoformat() for h in [2, 26, 50, 74, 98]],
+        "fast": [(now - timedelta(hours=h)).isoformat() for h in [2, 8, 14, 20, 26]],
+    }
+    winner = checker._pick_potw_winner(timestamps, set(), week_ago, "100", _make_state())
+    assert winner["user_id"] == "fast"
+    assert winner["first_name"] == "Unknown"  # Not in players table
+
+
+def test_player_of_the_week_boons_stable_across_reruns():
+    now = _utc(2026, 2, 20, 12, 0)
+    state = _make_state()
+    state["post_timestamps"]["100"] = {
+        "42": [(now - timedelta(hours=h)).isoformat() for h in [2, 14, 26, 38, 50, 62]],
+    }
+    state["players"]["100:42"] = {
+        "first_name": "Alice", "last_name": "", "username": "alice",
+        "pbp_topic_id": "100", "user_id": "42", "campaign_name": "TestCampaign",
+        "last_post_time": now.isoformat(), "last_warned_week": 0,
+    }
+    checker.player_of_the_week(_make_config(), state, now=now)
+    first = state["pending_potw_boons"]["100"]["boons"]
+    state["last_potw"] = {}
+    checker.player_of_the_week(_make_config(), state, now=now)
+    assert state["pending_potw_boons"]["100"]["boons"] == first
+    assert len(first) == 4
 
 
 def test_cleanup_timestamps_prunes_old():
@@ -244,6 +313,28 @@ def test_cleanup_timestamps_prunes_old():
     assert "user2" not in state["post_timestamps"]["100"]
 
 
+def test_cleanup_timestamps_keeps_recent_in_order():
+    now = datetime.now(timezone.utc)
+    state = _make_state()
+    keep = [(now - timedelta(days=d)).isoformat() for d in (10, 3, 1)]
+    timestamps = [(now - timedelta(days=d)).isoformat() for d in (40, 16)] + keep
+    state["post_timestamps"] = {"100": {"user1": timestamps}}
+    checker.cleanup_timestamps(state)
+    assert state["post_timestamps"]["100"]["user1"] == keep
+
+
+def test_cleanup_timestamps_caps_per_user():
+    now = datetime.now(timezone.utc)
+    state = _make_state()
+    cap = checker._MAX_TIMESTAMPS_PER_USER
+    timestamps = [(now - timedelta(minutes=i)).isoformat() for i in range(cap + 50)]
+    state["post_timestamps"] = {"100": {"user1": list(timestamps)}}
+    checker.cleanup_timestamps(state)
+    kept = state["post_timestamps"]["100"]["user1"]
+    assert len(kept) == cap
+    assert kept == sorted(timestamps)[-cap:]
+
+
 def test_cleanup_timestamps_empty_state():
     state = _make_state()
     checker.cleanup_timestamps(state)  # Should not crash
@@ -341,6 +432,44 @@ def test_process_updates_ignores_other_groups():
     assert "100" not in state["topics"]
 
 
+def test_process_updates_skips_service_messages():
+    _reset()
+    config = _make_config()
+    state = _make_state()
+
+    updates = [{
+        "update_id": 2101,
+        "message": {
+            "chat": {"id": -100},
+            "message_thread_id": 100,
+            "from": {"id": 42, "first_name": "Test"},
+            "date": int(datetime.now(timezone.utc).timestamp()),
+            "pinned_message": {"message_id": 7, "text": "Session notes"},
+        },
+    }]
+
+    new_offset = checker.process_updates(updates, config, state)
+    assert new_offset == 2102
+    assert "100" not in state["topics"]
+    assert "100" not in state["message_counts"]
+
+
+def test_process_updates_skips_already_seen_updates():
+    _reset()
+    config = _make_config()
+    state = _make_state()
+    state["offset"] = 3002
+
+    updates = [
+        _make_msg(3001, 100, "Old post", user_id=42),
+        _make_msg(3002, 100, "New post", user_id=42),
+    ]
+
+    new_offset = checker.process_updates(updates, config, state)
+    assert new_offset == 3003
+    assert state["message_counts"]["100"]["42"] == 1
+
+
 def test_process_updates_skips_gm_player_tracking():
     _reset()
     config = _make_config(gm_ids=[42])
@@ -869,6 +998,32 @@ def test_check_player_activity_respects_toggle():
     assert len(_sent_messages) == 0  # No warning sent
 
 
+def test_check_player_activity_skips_paused_campaign_only():
+    _reset()
+    config = _make_config(pairs=[
+        {"name": "Paused", "chat_topic_id": 200, "pbp_topic_ids": [100]},
+        {"name": "Running", "chat_topic_id": 201, "pbp_topic_ids": [101]},
+    ])
+    state = _make_state()
+    state["paused_campaigns"] = {"100": {"paused_at": "2026-01-01T00:00:00+00:00"}}
+    now = datetime.now(timezone.utc)
+    old_post = (now - timedelta(days=8)).isoformat()
+
+    for pid, name in (("100", "Paused"), ("101", "Running")):
+        state["players"][f"{pid}:42"] = {
+            "user_id": "42", "first_name": "Alice", "last_name": "",
+            "username": "", "campaign_name": name,
+            "pbp_topic_id": pid, "last_post_time": old_post,
+            "last_warned_week": 0,
+        }
+
+    checker.check_player_activity(config, state, now=now)
+    warn_msgs = [m for m in _sent_messages if "hasn't posted" in m.get("text", "")]
+    assert [m["topic_id"] for m in warn_msgs] == [201]
+    assert state["players"]["100:42"]["last_warned_week"] == 0
+    assert state["players"]["101:42"]["last_warned_week"] == 1
+
+
 # ------------------------------------------------------------------ #
 #  _gather_leaderboard_stats tests
 # ------------------------------------------------------------------ #
@@ -900,6 +1055,32 @@ def test_gather_leaderboard_stats_basic():
     assert global_players["42"]["full_name"] == "Alice B"
 
 
+def test_gather_leaderboard_stats_trend_and_last_post():
+    now = _utc(2026, 2, 20, 12, 0)
+    config = _make_config()
+    state = _make_state()
+    # 1 post in the last 3 days, 3 in days 3-6, 1 older than a week
+    state["post_timestamps"]["100"] = {
+        "42": [(now - timedelta(hours=h)).isoformat() for h in [200, 100, 90, 80]],
+        "43": [(now - timedelta(hours=30)).isoformat()],
+    }
+    stats, _, _ = checker._gather_leaderboard_stats(config, state, now)
+    assert stats[0]["trend_icon"] == "📉"
+    assert stats[0]["player_7d"] == 4
+    assert stats[0]["last_post_str"] == "yesterday"
+
+
+def test_gather_leaderboard_stats_skips_empty_users():
+    now = _utc(2026, 2, 20, 12, 0)
+    state = _make_state()
+    state["players"]["100:42"] = {"user_id": "42", "first_name": "Alice", "pbp_topic_id": "100"}
+    state["post_timestamps"]["100"] = {"42": []}
+    stats, global_players, streaks = checker._gather_leaderboard_stats(_make_config(), state, now)
+    assert stats[0]["total_7d"] == 0
+    assert stats[0]["last_post_str"] == "never"
+    assert global_players == {} and streaks == []
+
+
 def test_gather_leaderboard_stats_empty():
     _reset()
     now = datetime.now(timezone.utc)
@@ -1214,6 +1395,28 @@ def test_calc_streak_empty():
     assert checker._calc_streak([], now) == 0
 
 
+def test_calc_streak_memoised_until_new_post():
+    now = datetime(2025, 3, 15, 14, 0, 0, tzinfo=timezone.utc)
+    timestamps = [(now - timedelta(days=d)).isoformat() for d in (2, 1)]
+    checker._streak_for.cache_clear()
+    assert checker._calc_streak(timestamps, now) == 2
+    assert checker._calc_streak(timestamps, now) == 2
+    assert checker._streak_for.cache_info().hits == 1
+    timestamps.append(now.isoformat())  # New post changes the key
+    assert checker._calc_streak(timestamps, now) == 3
+
+
+def test_calc_streak_unsorted_from_yesterday():
+    now = datetime(2025, 3, 15, 14, 0, 0, tzinfo=timezone.utc)
+    timestamps = [
+        (now - timedelta(days=2)).isoformat(),
+        (now - timedelta(days=5)).isoformat(),
+        (now - timedelta(days=1)).isoformat(),
+        (now - timedelta(days=3)).isoformat(),
+    ]
+    assert checker._calc_streak(timestamps, now) == 3
+
+
 # ------------------------------------------------------------------ #
 #  /whosturn tests
 # ------------------------------------------------------------------ #
@@ -1452,6 +1655,31 @@ def test_build_weekly_digest_basic():
     assert "Alice" in result
 
 
+def test_build_weekly_digest_multiple_campaigns():
+    _reset()
+    now = datetime.now(timezone.utc)
+    config = _make_config(pairs=[
+        {"name": "First", "chat_topic_id": 200, "pbp_topic_ids": [100]},
+        {"name": "Second", "chat_topic_id": 201, "pbp_topic_ids": [101]},
+    ])
+    state = _make_state()
+
+    for pid, name, first in (("100", "First", "Alice"), ("101", "Second", "Bob")):
+        state["players"][f"{pid}:42"] = {
+            "user_id": "42", "first_name": first, "last_name": "",
+            "username": "", "campaign_name": name,
+            "pbp_topic_id": pid, "last_post_time": now.isoformat(),
+            "last_warned_week": 0,
+        }
+        state["post_timestamps"][pid] = {
+            "42": [(now - timedelta(hours=h)).isoformat() for h in range(1, 6)],
+        }
+
+    result = checker._build_weekly_digest(config, state, now)
+    assert "MVP: Alice" in result
+    assert "MVP: Bob" in result
+
+
 def test_build_weekly_digest_health_icons():
     assert checker._health_icon(25) == "🟢"
     assert checker._health_icon(15) == "🟡"
@@ -1557,6 +1785,10 @@ def test_sparkline_all_zeros():
     assert result == "▁▁▁"
 
 
+def test_sparkline_empty():
+    assert checker._sparkline([]) == ""
+
+
 def test_sparkline_uniform():
     result = checker._sparkline([5, 5, 5])
     assert all(c == "█" for c in result)
@@ -1751,6 +1983,8 @@ def test_sanitize_dirname():
     assert checker._sanitize_dirname("Doomsday Funtime") == "Doomsday_Funtime"
     assert checker._sanitize_dirname("Test/Bad:Name!") == "TestBadName"
     assert checker._sanitize_dirname("  Spaces  ") == "Spaces"
+    # Non-ASCII letters are kept so existing transcript folders don't move
+    assert checker._sanitize_dirname("Café Noir!") == "Café_Noir"
 
 
 def test_format_log_entry_text():
@@ -1830,6 +2064,25 @@ def test_append_to_transcript():
     shutil.rmtree(test_dir)
 
 
+def test_update_transcript_index_counts_entries():
+    import shutil
+    test_dir = checker._LOGS_DIR / "index_test"
+    if test_dir.exists():
+        shutil.rmtree(test_dir)
+    test_dir.mkdir(parents=True)
+    (test_dir / "2026-01.md").write_text("**Alice** (x): hi\n\n**Bob** (y): yo\n")
+    (test_dir / "2026-02.md").write_text("# Header\n\n**Alice** (z): later\nnot **bold\n")
+
+    checker.update_transcript_index({"topic_pairs": []})
+    index = (checker._LOGS_DIR / "README.md").read_text()
+    assert "*3 messages across 2 months*" in index
+    assert "[2026-01](index_test/2026-01.md) (2 messages)" in index
+    assert "[2026-02](index_test/2026-02.md) (1 messages)" in index
+
+    shutil.rmtree(test_dir)
+    (checker._LOGS_DIR / "README.md").unlink()
+
+
 def test_transcript_week_headers():
     """Transcript inserts week headers when ISO week changes."""
     import shutil
@@ -2602,6 +2855,32 @@ def test_archive_includes_player_breakdown():
     assert alice_entries[0]["avg_gap_h"] is not None
 
 
+def test_archive_rerun_leaves_unchanged_file_alone():
+    import json
+    _reset()
+    config = _make_config()
+    now = datetime(2026, 2, 20, 12, 0, tzinfo=timezone.utc)
+    state = _make_state()
+    week_start = now - timedelta(days=now.weekday() + 7)
+    state["post_timestamps"]["100"] = {
+        "42": [(week_start + timedelta(hours=2)).isoformat()],
+    }
+
+    archive_path = helpers.ARCHIVE_PATH
+    if archive_path.exists():
+        archive_path.unlink()
+    checker.archive_weekly_data(config, state, now=now)
+
+    # Same content, different formatting: a rewrite would re-indent it
+    compact = json.dumps(json.loads(archive_path.read_text()))
+    archive_path.write_text(compact)
+    del state["last_archived_week"]
+    checker.archive_weekly_data(config, state, now=now)
+
+    assert archive_path.read_text() == compact
+    assert state["last_archived_week"] == "2026-W07"
+
+
 # ------------------------------------------------------------------ #
 #  Smart alerts: pace drop
 # ------------------------------------------------------------------ #
@@ -3466,6 +3745,53 @@ def test_recap_command():
     assert len(recap_msgs) >= 1, "Should send recap message"
 
 
+def test_process_updates_buffers_transcript_until_command():
+    """Posts in a batch are written once per file, and flushed before commands read them."""
+    import shutil
+    _reset()
+    test_dir = checker._LOGS_DIR / "BufferTest"
+    if test_dir.exists():
+        shutil.rmtree(test_dir)
+    config = _make_config(pairs=[
+        {"name": "BufferTest", "chat_topic_id": 200, "pbp_topic_ids": [100]},
+    ])
+    updates = [
+        _make_msg(1, 100, "First post", user_id=42, first_name="Alice"),
+        _make_msg(2, 100, "Second post", user_id=43, first_name="Bob"),
+        _make_msg(3, 100, "/recap", user_id=42, first_name="Alice"),
+    ]
+    checker.process_updates(updates, config, _make_state())
+
+    recap_msgs = [m for m in _sent_messages if "📜" in m["text"]]
+    assert len(recap_msgs) == 1
+    assert "First post" in recap_msgs[0]["text"]
+    assert "Second post" in recap_msgs[0]["text"]
+    assert checker._transcript_buffer is None
+    month_files = list(test_dir.glob("*.md"))
+    assert len(month_files) == 1
+    assert month_files[0].read_text().count("# BufferTest") == 1
+
+    shutil.rmtree(test_dir)
+
+
+def test_process_updates_stops_buffering_when_flush_fails():
+    _reset()
+    original_flush = checker._flush_transcripts
+
+    def failing_flush():
+        raise OSError("disk full")
+
+    checker._flush_transcripts = failing_flush
+    try:
+        try:
+            checker.process_updates([], _make_config(), _make_state())
+        except OSError:
+            pass
+    finally:
+        checker._flush_transcripts = original_flush
+    assert checker._transcript_buffer is None
+
+
 def test_recap_with_count():
     """/recap 5 limits to 5 entries."""
     import pathlib
@@ -5020,6 +5346,73 @@ def test_parse_timer_invalid():
     assert deadline is None
 
 
+# ------------------------------------------------------------------ #
+#  Listen mode
+# ------------------------------------------------------------------ #
+def test_drain_updates_fetches_until_short_batch():
+    _reset()
+    state = _make_state()
+    # Unmonitored topic: only the offset bookkeeping matters here
+    full = [_make_msg(i, 555, "Hi") for i in range(1, 101)]
+    batches = [full, [_make_msg(101, 555, "Last")], [_make_msg(200, 555, "Unreached")]]
+    offsets = []
+
+    def fake_get_updates(offset, timeout=5):
+        offsets.append(offset)
+        return batches.pop(0)
+
+    original_get = _mock_tg.get_updates
+    _mock_tg.get_updates = fake_get_updates
+    try:
+        checker._drain_updates(_make_config(), state)
+    finally:
+        _mock_tg.get_updates = original_get
+    assert offsets == [0, 101]
+    assert state["offset"] == 102
+
+
+def test_listen_for_updates_processes_batches():
+    _reset()
+    config = _make_config()
+    state = _make_state()
+    batches = [[_make_msg(5, 100, "Hello")], [], [_make_msg(6, 100, "Again")]]
+    calls = []
+
+    class _Done(Exception):
+        pass
+
+    def fake_get_updates(offset, timeout=5):
+        calls.append((offset, timeout))
+        if not batches:
+            raise _Done
+        return batches.pop(0)
+
+    original_get, original_sleep = _mock_tg.get_updates, checker.time.sleep
+    _mock_tg.get_updates = fake_get_updates
+    checker.time.sleep = lambda s: None
+    try:
+        checker._listen_for_updates(config, state, _utc(2999, 1, 1, 0, 0))
+    except _Done:
+        pass
+    finally:
+        _mock_tg.get_updates = original_get
+        checker.time.sleep = original_sleep
+    assert state["offset"] == 7
+    assert calls == [(0, 50), (6, 50), (6, 50), (7, 50)]
+    assert state["message_counts"]["100"]["42"] == 2
+
+
+def test_listen_for_updates_stops_at_deadline():
+    calls = []
+    original_get = _mock_tg.get_updates
+    _mock_tg.get_updates = lambda offset, timeout=5: calls.append(offset) or []
+    try:
+        checker._listen_for_updates(_make_config(), _make_state(), _utc(2020, 1, 1, 0, 0))
+    finally:
+        _mock_tg.get_updates = original_get
+    assert calls == []
+
+
 # ------------------------------------------------------------------ #
 #  Runner
 # ------------------------------------------------------------------ #
@@ -45,6 +45,13 @@ def test_interval_elapsed_stale():
 # ------------------------------------------------------------------ #
 #  Timestamp filtering
 # ------------------------------------------------------------------ #
+def test_parse_ts_memoised():
+    ts = "2025-03-01T12:00:00+00:00"
+    dt = helpers.parse_ts(ts)
+    assert dt == datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+    assert helpers.parse_ts(ts) is dt
+
+
 def test_timestamps_in_window_after_only():
     now = _utc(2026, 1, 10, 12, 0)
     cutoff = now - timedelta(hours=24)
@@ -68,6 +75,24 @@ def test_timestamps_in_window_bounded():
     assert len(result) == 1
 
 
+def test_count_in_window_matches_timestamps_in_window():
+    base = _utc(2026, 1, 10, 0, 0)
+    raw = [(base + timedelta(hours=h)).isoformat() for h in (-5, 0, 3, 12, 30)]
+    after, before = base, base + timedelta(hours=12)
+    assert helpers.count_in_window(raw, after) == len(helpers.timestamps_in_window(raw, after)) == 4
+    assert helpers.count_in_window(raw, after, before) == len(helpers.timestamps_in_window(raw, after, before)) == 2
+    assert helpers.count_in_window([], after) == 0
+
+
+def test_bucket_counts():
+    base = _utc(2026, 1, 10, 0, 0)
+    edges = [base + timedelta(days=d) for d in range(4)]
+    raw = [(base + timedelta(days=d, hours=1)).isoformat() for d in (-1, 0, 0, 2, 3)]
+    raw.append(edges[1].isoformat())  # Lower edge belongs to its bucket
+    assert helpers.bucket_counts(raw, edges) == [2, 1, 1]
+    assert helpers.bucket_counts([], edges) == [0, 0, 0]
+
+
 def test_timestamps_in_window_empty():
     assert helpers.timestamps_in_window([], _utc(2026, 1, 1, 0, 0)) == []
 
@@ -84,6 +109,18 @@ def test_avg_gap_hours_basic():
     assert helpers.avg_gap_hours(times) == 6.0
 
 
+def test_avg_gap_hours_uneven():
+    times = [
+        _utc(2026, 1, 10, 0, 0),
+        _utc(2026, 1, 10, 1, 0),
+        _utc(2026, 1, 10, 9, 0),
+        _utc(2026, 1, 11, 0, 0),
+    ]
+    # Gaps 1h, 8h, 15h -> mean 8h
+    assert helpers.avg_gap_hours(times) == 8.0
+    assert helpers.avg_gap_hours(list(reversed(times))) == 8.0
+
+
 def test_avg_gap_hours_insufficient():
     assert helpers.avg_gap_hours([_utc(2026, 1, 10, 0, 0)]) is None
     assert helpers.avg_gap_hours([]) is None
@@ -104,6 +141,12 @@ def test_calc_avg_gap_str_insufficient():
     assert helpers.calc_avg_gap_str([_utc(2026, 1, 1, 0, 0).isoformat()]) == "N/A"
 
 
+def test_fmt_avg_gap_takes_sessions():
+    start = _utc(2026, 1, 10, 12, 0)
+    assert helpers.fmt_avg_gap([start, start + timedelta(minutes=30)]) == "30 minutes"
+    assert helpers.fmt_avg_gap([start]) == "N/A"
+
+
 # ------------------------------------------------------------------ #
 #  Post deduplication
 # ------------------------------------------------------------------ #
@@ -130,6 +173,15 @@ def test_deduplicate_posts_across_sessions():
     assert len(sessions) == 3
 
 
+def test_deduplicate_posts_unsorted_input_untouched():
+    base = _utc(2026, 1, 10, 12, 0)
+    posts = [base + timedelta(minutes=30), base, base + timedelta(minutes=10)]
+    original = list(posts)
+    # Exactly POST_SESSION_MINUTES after the session start stays in that session
+    assert helpers.deduplicate_posts(posts) == [base, base + timedelta(minutes=30)]
+    assert posts == original
+
+
 def test_deduplicate_posts_empty():
     assert helpers.deduplicate_posts([]) == []
 
@@ -183,6 +235,11 @@ def test_trend_icon():
     assert helpers.trend_icon(20, 10) == "📈"
     assert helpers.trend_icon(5, 10) == "📉"
     assert helpers.trend_icon(10, 10) == "➡️"
+    # Within +/-15% is steady
+    assert helpers.trend_icon(114, 100) == "➡️"
+    assert helpers.trend_icon(86, 100) == "➡️"
+    assert helpers.trend_icon(116, 100) == "📈"
+    assert helpers.trend_icon(84, 100) == "📉"
 
 
 def test_fmt_relative_date():
@@ -247,6 +304,30 @@ def test_gm_ids_for_campaign_per_campaign_override():
     assert "111" not in helpers.gm_ids_for_campaign(config, "200")
 
 
+def test_gm_ids_for_campaign_chat_topic_and_empty_override():
+    config = {
+        "gm_user_ids": [111],
+        "topic_pairs": [
+            {"name": "A", "chat_topic_id": 10, "pbp_topic_ids": [100, 101], "gm_user_ids": []},
+        ],
+    }
+    # Chat topic and secondary pbp IDs share the campaign's (empty) override
+    assert helpers.gm_ids_for_campaign(config, "10") == frozenset()
+    assert helpers.gm_ids_for_campaign(config, "101") == frozenset()
+
+
+def test_feature_enabled_per_config():
+    config = {"topic_pairs": [
+        {"name": "A", "chat_topic_id": 10, "pbp_topic_ids": [100], "disabled_features": ["alerts"]},
+    ]}
+    assert not helpers.feature_enabled(config, "100", "alerts")
+    assert helpers.feature_enabled(config, "100", "roster")
+    assert helpers.feature_enabled(config, "999", "alerts")  # Unknown campaign
+    # A different config object is not served from the cache
+    other = {"topic_pairs": [{"name": "A", "chat_topic_id": 10, "pbp_topic_ids": [100]}]}
+    assert helpers.feature_enabled(other, "100", "alerts")
+
+
 def test_gm_ids_for_campaign_unknown_pid():
     config = {
         "gm_user_ids": [111],
@@ -258,6 +339,15 @@ def test_gm_ids_for_campaign_unknown_pid():
     assert helpers.gm_ids_for_campaign(config, "999") == {"111"}
 
 
+def test_gm_ids_for_campaign_cached_per_config():
+    config = {"gm_user_ids": [111], "topic_pairs": []}
+    first = helpers.gm_ids_for_campaign(config, "100")
+    assert isinstance(first, frozenset)
+    assert helpers.gm_ids_for_campaign(config, "100") is first
+    # A different config object is not served from the cache
+    assert helpers.gm_ids_for_campaign({"gm_user_ids": [222]}, "100") == {"222"}
+
+
 def test_players_by_campaign():
     state = {"players": {
         "A:1": {"pbp_topic_id": "A", "name": "p1"},
@@ -308,6 +398,52 @@ def test_build_topic_maps_caching():
     m1 = helpers.build_topic_maps(config)
     m2 = helpers.build_topic_maps(config)
     assert m1 is m2
+    # Shared cached maps are read-only
+    try:
+        m1.to_name["1"] = "Changed"
+        assert False, "expected TypeError"
+    except TypeError:
+        pass
+    assert m1.to_name["1"] == "Test"
+
+
+def test_build_topic_stats():
+    config = {"gm_user_ids": [9], "topic_pairs": [
+        {"pbp_topic_ids": [100], "chat_topic_id": 200, "name": "A"},
+        {"pbp_topic_ids": [300], "chat_topic_id": 400, "name": "B"},
+    ]}
+    state = {
+        "players": {"100:1": {"user_id": "1", "pbp_topic_id": "100"}},
+        "topics": {"100": {"last_message_time": "2025-03-01T12:00:00+00:00"}},
+        "post_timestamps": {"100": {"1": ["2025-03-01T12:00:00+00:00"]}},
+    }
+    stats = helpers.build_topic_stats(config, state)
+    assert set(stats) == {"100", "300"}
+    assert [p["user_id"] for p in stats["100"].players] == ["1"]
+    assert stats["100"].by_uid["1"] is state["players"]["100:1"]
+    assert stats["300"].by_uid == {}
+    assert stats["100"].gm_ids == {"9"}
+    assert stats["100"].last_message_time == datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+    assert stats["300"].players == []
+    assert stats["300"].last_message_time is None
+
+
+def test_load_boons_cached_per_path():
+    import tempfile
+    from pathlib import Path
+    original = helpers.BOONS_PATH
+    tmp = Path(tempfile.mkdtemp()) / "boons.json"
+    tmp.write_text('["Boon A", "Boon B"]')
+    try:
+        helpers.BOONS_PATH = tmp
+        b1 = helpers.load_boons()
+        b2 = helpers.load_boons()
+        assert b1 == ["Boon A", "Boon B"]
+        assert b1 is b2
+        helpers.BOONS_PATH = tmp.parent / "missing.json"
+        assert helpers.load_boons() == helpers._FALLBACK_BOONS
+    finally:
+        helpers.BOONS_PATH = original
 
 
 def test_pace_split():
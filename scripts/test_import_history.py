@@ -270,6 +270,21 @@ def test_build_thread_map():
     assert 10 not in m  # Chat topics not included
 
 
+def test_build_gm_map_shares_global_set():
+    config = {
+        "gm_user_ids": [1],
+        "topic_pairs": [
+            {"name": "A", "pbp_topic_ids": [10]},
+            {"name": "B", "pbp_topic_ids": [20]},
+            {"name": "C", "pbp_topic_ids": [30], "gm_user_ids": [2]},
+        ],
+    }
+    gm_map = import_history.build_gm_map(config)
+    assert gm_map["A"] == frozenset({"1"})
+    assert gm_map["A"] is gm_map["B"]
+    assert gm_map["C"] == frozenset({"2"})
+
+
 def test_import_desktop_export_format():
     """Test import with Telegram Desktop export format (reply_to_message_id, text_entities)."""
     tmp = tempfile.mkdtemp()
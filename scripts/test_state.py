@@ -0,0 +1,243 @@
+"""Tests for state.py gist persistence.
+
+Uses a lightweight mock for the requests module so no real API calls are made.
+"""
+
+import json
+import sys
+import types
+
+# ------------------------------------------------------------------ #
+#  Mock requests module before importing state
+# ------------------------------------------------------------------ #
+_requests = []
+_responses = []
+_mock_requests = types.ModuleType("requests")
+
+
+class _MockRequestException(Exception):
+    pass
+
+
+class _FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def _mock_get(url, headers=None, timeout=None):
+    _requests.append({"method": "GET", "url": url})
+    return _responses.pop(0)
+
+
+def _mock_patch(url, headers=None, json=None, timeout=None):
+    _requests.append({"method": "PATCH", "url": url, "json": json})
+    return _responses.pop(0)
+
+
+_mock_requests.RequestException = _MockRequestException
+_mock_requests.get = _mock_get
+_mock_requests.patch = _mock_patch
+sys.modules["requests"] = _mock_requests
+
+import state
+
+
+def _reset():
+    _requests.clear()
+    _responses.clear()
+    state._remote_content.clear()
+    state.init("token", "abc123")
+
+
+def _gist(files):
+    """Queue a gist GET response holding {filename: content}."""
+    _responses.append(_FakeResponse(200, {
+        "files": {name: {"content": content} for name, content in files.items()},
+    }))
+
+
+def _patches():
+    return [r for r in _requests if r["method"] == "PATCH"]
+
+
+def _patched_files(request):
+    return {name: f["content"] for name, f in request["json"]["files"].items()}
+
+
+_TIMESTAMPS = {"100": {"42": ["2026-02-19T10:00:00+00:00", "2026-02-20T10:00:00+00:00"]}}
+
+
+def _load_split(**overrides):
+    """Load a gist already in the split layout, serialized the way save() writes it."""
+    base = dict(state.DEFAULT_STATE, offset=7, post_timestamps=_TIMESTAMPS)
+    base.update(overrides)
+    _gist(state._serialize(base))
+    return state.load()
+
+
+# ------------------------------------------------------------------ #
+#  Load
+# ------------------------------------------------------------------ #
+def test_load_legacy_single_file():
+    _reset()
+    _gist({state.STATE_FILENAME: json.dumps({"offset": 7, "post_timestamps": _TIMESTAMPS})})
+    loaded = state.load()
+    assert loaded["offset"] == 7
+    assert loaded["post_timestamps"] == _TIMESTAMPS
+    assert loaded["players"] == {}  # Missing keys filled from defaults
+    assert set(state._remote_content) == {state.STATE_FILENAME}
+
+
+def test_load_split_gist():
+    _reset()
+    _gist({
+        state.STATE_FILENAME: json.dumps({"offset": 7}),
+        state.TIMELINE_FILENAME: json.dumps({"post_timestamps": _TIMESTAMPS}),
+    })
+    loaded = state.load()
+    assert loaded["offset"] == 7
+    assert loaded["post_timestamps"] == _TIMESTAMPS
+    assert set(state._remote_content) == {state.STATE_FILENAME, state.TIMELINE_FILENAME}
+
+
+def test_load_interns_player_fields():
+    _reset()
+    record = {"user_id": "42", "campaign_name": "Curse of Strahd",
+              "pbp_topic_id": "100", "username": "alice"}
+    _gist({state.STATE_FILENAME: json.dumps({
+        "players": {"100:42": record, "100:43": dict(record, user_id="43")},
+        "removed_players": {"100:44": dict(record, user_id="44")},
+    })})
+    loaded = state.load()
+    records = list(loaded["players"].values()) + list(loaded["removed_players"].values())
+    for field in ("campaign_name", "pbp_topic_id", "username"):
+        assert all(r[field] is records[0][field] for r in records)
+    assert records[0]["campaign_name"] is sys.intern("Curse of Strahd")
+
+
+def test_load_intern_skips_non_string_fields():
+    _reset()
+    _gist({state.STATE_FILENAME: json.dumps({
+        "players": {"100:42": {"user_id": "42", "pbp_topic_id": 100, "username": None}},
+    })})
+    player = state.load()["players"]["100:42"]
+    assert player["pbp_topic_id"] == 100
+    assert player["username"] is None
+
+
+def test_load_http_error_returns_defaults():
+    _reset()
+    _responses.append(_FakeResponse(500))
+    loaded = state.load()
+    assert loaded == state.DEFAULT_STATE
+    assert state._remote_content == {}
+
+
+# ------------------------------------------------------------------ #
+#  Save
+# ------------------------------------------------------------------ #
+def test_save_migrates_legacy_gist():
+    _reset()
+    _gist({state.STATE_FILENAME: json.dumps({"offset": 7, "post_timestamps": _TIMESTAMPS})})
+    loaded = state.load()
+    _responses.append(_FakeResponse(200))
+    state.save(loaded)
+    patches = _patches()
+    assert len(patches) == 1
+    files = _patched_files(patches[0])
+    assert set(files) == {state.STATE_FILENAME, state.TIMELINE_FILENAME}
+    assert "post_timestamps" not in json.loads(files[state.STATE_FILENAME])
+    assert json.loads(files[state.TIMELINE_FILENAME]) == {"post_timestamps": _TIMESTAMPS}
+
+
+def test_save_skips_unchanged_state():
+    _reset()
+    loaded = _load_split()
+    state.save(loaded)
+    assert _patches() == []
+
+
+def test_save_patches_only_main_file():
+    _reset()
+    loaded = _load_split()
+    loaded["offset"] = 8
+    _responses.append(_FakeResponse(200))
+    state.save(loaded)
+    patches = _patches()
+    assert len(patches) == 1
+    assert set(_patched_files(patches[0])) == {state.STATE_FILENAME}
+
+
+def test_save_patches_only_timeline_file():
+    _reset()
+    loaded = _load_split()
+    loaded["post_timestamps"]["100"]["42"].append("2026-02-21T10:00:00+00:00")
+    _responses.append(_FakeResponse(200))
+    state.save(loaded)
+    patches = _patches()
+    assert len(patches) == 1
+    assert set(_patched_files(patches[0])) == {state.TIMELINE_FILENAME}
+
+
+def test_save_never_uploads_underscore_keys():
+    _reset()
+    loaded = _load_split()
+    loaded["_stats"] = object()  # Not JSON-serializable: must never be dumped
+    state.save(loaded)
+    assert _patches() == []
+    loaded["offset"] = 8
+    _responses.append(_FakeResponse(200))
+    state.save(loaded)
+    for content in _patched_files(_patches()[0]).values():
+        assert "_stats" not in json.loads(content)
+
+
+def test_save_success_updates_remote_content():
+    _reset()
+    loaded = _load_split()
+    loaded["offset"] = 8
+    _responses.append(_FakeResponse(200))
+    state.save(loaded)
+    assert state._remote_content[state.STATE_FILENAME] == _patched_files(_patches()[0])[state.STATE_FILENAME]
+    state.save(loaded)  # Second save has nothing new to upload
+    assert len(_patches()) == 1
+
+
+def test_save_failure_keeps_remote_content():
+    _reset()
+    loaded = _load_split()
+    before = dict(state._remote_content)
+    loaded["offset"] = 8
+    _responses.append(_FakeResponse(500))
+    state.save(loaded)
+    assert state._remote_content == before
+    _responses.append(_FakeResponse(200))
+    state.save(loaded)  # Retried on the next save
+    assert len(_patches()) == 2
+
+
+# ------------------------------------------------------------------ #
+#  Runner
+# ------------------------------------------------------------------ #
+def _run_all():
+    """Find and run all test_ functions, report results."""
+    tests = [(name, obj) for name, obj in globals().items()
+             if name.startswith("test_") and callable(obj)]
+    passed = failed = 0
+    for name, func in sorted(tests):
+        try:
+            func()
+            passed += 1
+        except Exception as e:
+            failed += 1
+            print(f"  FAIL: {name}: {e}")
+    print(f"\n{passed} passed, {failed} failed out of {passed + failed}")
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(_run_all())
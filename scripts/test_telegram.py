@@ -0,0 +1,99 @@
+"""Tests for telegram.py flood-control handling."""
+
+import sys
+
+import telegram
+
+
+class _FakeResponse:
+    def __init__(self, status_code, data=None, text=""):
+        self.status_code = status_code
+        self._data = data
+        self.text = text
+
+    def json(self):
+        if self._data is None:
+            raise ValueError("No JSON body")
+        return self._data
+
+
+def _run_post(responses):
+    """Call telegram._post against canned responses; return (result, posts, sleeps)."""
+    posts = []
+    sleeps = []
+    queue = list(responses)
+
+    def fake_post(url, json=None, timeout=None):
+        posts.append((url, json))
+        return queue.pop(0)
+
+    original_post = telegram._session.post
+    original_sleep = telegram.time.sleep
+    telegram._session.post = fake_post
+    telegram.time.sleep = sleeps.append
+    try:
+        result = telegram._post("sendMessage", {"text": "hi"}, "send")
+    finally:
+        telegram._session.post = original_post
+        telegram.time.sleep = original_sleep
+    return result, posts, sleeps
+
+
+def _flood(retry_after):
+    return _FakeResponse(429, {"ok": False, "parameters": {"retry_after": retry_after}},
+                         "Too Many Requests")
+
+
+# ------------------------------------------------------------------ #
+#  Flood control
+# ------------------------------------------------------------------ #
+def test_post_retries_once_after_429():
+    ok = _FakeResponse(200, {"ok": True, "result": {"message_id": 7}})
+    result, posts, sleeps = _run_post([_flood(3), ok])
+    assert result == {"message_id": 7}
+    assert len(posts) == 2
+    assert sleeps == [3]
+
+
+def test_post_gives_up_when_retry_after_too_long():
+    result, posts, sleeps = _run_post([_flood(telegram._MAX_RETRY_AFTER + 1)])
+    assert result is None
+    assert len(posts) == 1
+    assert sleeps == []
+
+
+def test_post_gives_up_without_retry_after():
+    result, posts, sleeps = _run_post([_FakeResponse(429, text="Too Many Requests")])
+    assert result is None
+    assert len(posts) == 1
+    assert sleeps == []
+
+
+def test_post_ignores_malformed_retry_after():
+    result, posts, sleeps = _run_post([_flood("soon")])
+    assert result is None
+    assert len(posts) == 1
+    assert sleeps == []
+
+
+# ------------------------------------------------------------------ #
+#  Runner
+# ------------------------------------------------------------------ #
+def _run_all():
+    """Find and run all test_ functions, report results."""
+    tests = [(name, obj) for name, obj in globals().items()
+             if name.startswith("test_") and callable(obj)]
+    passed = failed = 0
+    for name, func in sorted(tests):
+        try:
+            func()
+            passed += 1
+        except Exception as e:
+            failed += 1
+            print(f"  FAIL: {name}: {e}")
+    print(f"\n{passed} passed, {failed} failed out of {passed + failed}")
+    return failed
+
+
+if __name__ == "__main__":
+    sys.exit(_run_all())